@@ -1,4 +1,3 @@
-```python
 import sys
 import os
 
@@ -29,7 +28,8 @@ except Exception as e:
     raise
 
 if __name__ == '__main__':
+    # necessário para o pool de processos (gerar_jogos(workers=N)) no exe congelado
+    import multiprocessing
+    multiprocessing.freeze_support()
     app = CartelaApp()
     app.mainloop()
-
-```
\ No newline at end of file
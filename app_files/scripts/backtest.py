@@ -0,0 +1,43 @@
+"""
+backtest.py
+Backtest walk-forward das estratégias de pontuação sobre o histórico em cache
+(ver src/core/backtest.py). Grava a distribuição de acertos em CSV ou JSON.
+
+Uso:
+  python scripts/backtest.py
+  python scripts/backtest.py -e frequencia -e "combinado:recent_n=50|100|200,alpha=0.4|0.6" --workers 4
+  python scripts/backtest.py -e gerado:jogos=20 --inicio 500 --saida data/backtest.json
+"""
+import argparse
+import os
+import sys
+
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def main():
+    sys.path.insert(0, BASE)
+    from src.core import engine
+    from src.core import backtest as bt
+
+    ap = argparse.ArgumentParser(description='Backtest walk-forward das estratégias de pontuação')
+    ap.add_argument('-e', '--estrategia', action='append',
+                    help="especificação (repetível), ex.: 'combinado:recent_n=50|100,decay=exp'; padrão: "
+                         + ', '.join(bt.PADRAO))
+    ap.add_argument('-k', type=int, default=6, help='quantas dezenas do topo cada estratégia aposta')
+    ap.add_argument('--inicio', type=int, default=100, help='concursos iniciais usados só como histórico')
+    ap.add_argument('--workers', type=int, default=None, help='processos (uma estratégia por vez em cada)')
+    ap.add_argument('--seed', type=int, default=0, help="semente da estratégia 'gerado'")
+    ap.add_argument('--saida', default='backtest.csv', help='arquivo .csv ou .json')
+    args = ap.parse_args()
+
+    especificacoes = [s for e in (args.estrategia or bt.PADRAO) for s in bt.expande(e)]
+    resultados = engine.backtest(especificacoes, k=args.k, inicio=args.inicio, workers=args.workers, seed=args.seed)
+    for r in sorted(resultados, key=lambda r: -r['media_acertos']):
+        print(f"{r['estrategia']:<60} {r['passos']:>7} passos  média {r['media_acertos']:.4f}")
+    bt.salva(resultados, args.saida)
+    print('Resultados salvos em', args.saida)
+
+
+if __name__ == '__main__':
+    main()
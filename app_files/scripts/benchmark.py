@@ -0,0 +1,284 @@
+"""
+benchmark.py
+Mede os pontos quentes do motor (src/core/engine.py) com históricos sintéticos.
+
+Para cada escala (nº de concursos) gera um histórico aleatório e arquivos de
+entrada CSV/XLSX, aponta o motor para um diretório temporário (CARTELA_DATA_DIR)
+e cronometra filtros_ok, gerar_jogos, recomendar_numeros, combined_scores,
+top_dezenas_params e carregar_arquivo_local; no XLSX compara ainda a leitura
+coluna a coluna de `ingest.le_xlsx` com a linha a linha de
+`ingest.historico_de_linhas`. Cada caso reporta a taxa
+(jogos/s, linhas/s ou chamadas/s) e o pico de memória (tracemalloc, em uma
+segunda execução para não distorcer o tempo). O resultado vai para um JSON
+que pode ser comparado com o de outro commit via --comparar.
+
+Uso:
+  python scripts/benchmark.py
+  python scripts/benchmark.py --escalas 3000,100000,1000000 --saida data/bench
+  python scripts/benchmark.py --escalas 3000 --comparar data/bench/bench_anterior.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from contextlib import closing
+from itertools import chain
+from xml.sax.saxutils import escape
+
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ESCALAS = (3_000, 100_000, 1_000_000)
+
+
+def historico_sintetico(n, seed=0):
+    rnd = random.Random(seed)
+    dezenas = range(1, 61)
+    inicio = datetime.date(1996, 3, 11)
+    linhas = []
+    for i in range(n):
+        data = inicio + datetime.timedelta(days=(3 * i) % 40000)
+        linhas.append((i + 1, f'{data:%d/%m/%Y}', sorted(rnd.sample(dezenas, 6))))
+    return linhas
+
+
+def escreve_csv(caminho, linhas):
+    with open(caminho, 'w', encoding='utf8') as f:
+        f.write('Concurso;Data Sorteio;Bola1;Bola2;Bola3;Bola4;Bola5;Bola6\n')
+        for num, data, dz in linhas:
+            f.write(f'{num};{data};' + ';'.join(map(str, dz)) + '\n')
+
+
+_CABECALHO = ['Concurso', 'Data Sorteio', 'Bola1', 'Bola2', 'Bola3', 'Bola4', 'Bola5', 'Bola6']
+_XLSX_FIXOS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/></Types>'),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/></Relationships>'),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Mega" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/></Relationships>'),
+}
+
+
+def _celula_xml(ref, valor):
+    if isinstance(valor, int):
+        return f'<c r="{ref}"><v>{valor}</v></c>'
+    return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(valor))}</t></is></c>'
+
+
+def escreve_xlsx_minimo(caminho, linhas):
+    """.xlsx de uma planilha (strings inline, sem estilos) só com a biblioteca padrão."""
+    letras = 'ABCDEFGH'
+    with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as z:
+        for nome, conteudo in _XLSX_FIXOS.items():
+            z.writestr(nome, conteudo)
+        with z.open('xl/worksheets/sheet1.xml', 'w') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8"?><worksheet '
+                    b'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            for i, valores in enumerate(chain([_CABECALHO], ([n, d] + dz for n, d, dz in linhas)), 1):
+                celulas = ''.join(_celula_xml(f'{letras[j]}{i}', v) for j, v in enumerate(valores))
+                f.write(f'<row r="{i}">{celulas}</row>'.encode('utf8'))
+            f.write(b'</sheetData></worksheet>')
+    return True
+
+
+def escreve_xlsx(caminho, linhas):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        return escreve_xlsx_minimo(caminho, linhas)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(_CABECALHO)
+    for num, data, dz in linhas:
+        ws.append([num, data] + dz)
+    wb.save(caminho)
+    return True
+
+
+def mede(funcao, memoria=True):
+    """Executa `funcao` e retorna (segundos, unidades processadas, pico em MB ou None)."""
+    gc.collect()
+    t0 = time.perf_counter()
+    unidades = funcao()
+    segundos = time.perf_counter() - t0
+    pico = None
+    if memoria:
+        gc.collect()
+        tracemalloc.start()
+        funcao()
+        pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return segundos, unidades, pico
+
+
+def casos(engine, entradas, quantidade):
+    """Lista de (nome, unidade, função sem argumentos que retorna nº de unidades)."""
+    concursos = engine.carrega_concursos()
+    rnd = random.Random(1)
+    candidatos = [sorted(rnd.sample(range(1, 61), 6)) for _ in range(quantidade)]
+
+    def filtros():
+        for j in candidatos:
+            engine.filtros_ok(j, concursos)
+        return len(candidatos)
+
+    def gerar_seq():
+        return len(engine.gerar_jogos(quantidade // 10))
+
+    def gerar_lote():
+        return len(engine.gerar_jogos(quantidade, lote=50_000, seed=1))
+
+    def recomendar():
+        n = max(1, quantidade // 100)
+        for i in range(n):
+            engine.recomendar_numeros(seed=i)
+        return n
+
+    def combinado():
+        engine.combined_scores(concursos)
+        return len(concursos)
+
+    def params_frio():
+        engine.estado().invalidar()
+        engine.top_dezenas_params(10, recent_n=100, alpha=0.6, decay='exp')
+        return len(concursos)
+
+    def params_quente():
+        engine.top_dezenas_params(10, recent_n=100, alpha=0.6, decay='exp')
+        return 1
+
+    lista = [
+        ('filtros_ok', 'candidatos/s', filtros),
+        ('gerar_jogos', 'jogos/s', gerar_seq),
+        ('recomendar_numeros', 'chamadas/s', recomendar),
+        ('combined_scores', 'linhas/s', combinado),
+        ('top_dezenas_params(frio)', 'linhas/s', params_frio),
+        ('top_dezenas_params(quente)', 'chamadas/s', params_quente),
+    ]
+    try:
+        import numpy  # noqa: F401
+        lista.insert(2, ('gerar_jogos(lote)', 'jogos/s', gerar_lote))
+    except ImportError:
+        pass
+    ingest = engine._core('ingest')
+    for rotulo, caminho in entradas:
+        def carregar(caminho=caminho):
+            return len(engine.carregar_arquivo_local(caminho))
+        lista.append((f'carregar_arquivo_local({rotulo})', 'linhas/s', carregar))
+        if rotulo != 'xlsx':
+            continue
+
+        # leitura coluna a coluna (colunas escolhidas, em blocos) contra a linha a linha de `le_historico`
+        def xlsx_colunas(caminho=caminho):
+            return len(ingest.le_xlsx(caminho))
+
+        def xlsx_linhas(caminho=caminho):
+            header, linhas = ingest.iter_linhas(caminho)
+            with closing(linhas):
+                return len(ingest.historico_de_linhas(header, linhas))
+        lista.append(('ingest.le_xlsx(colunas)', 'linhas/s', xlsx_colunas))
+        lista.append(('ingest.historico_de_linhas(xlsx)', 'linhas/s', xlsx_linhas))
+    return lista
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compara(atual, anterior_path):
+    with open(anterior_path, encoding='utf8') as f:
+        anterior = {(r['caso'], r['escala']): r for r in json.load(f)['resultados']}
+    print(f"\nComparação com {anterior_path}:")
+    for r in atual:
+        a = anterior.get((r['caso'], r['escala']))
+        if a and a['taxa']:
+            print(f"  {r['caso']:<38} {r['escala']:>9}  {r['taxa'] / a['taxa']:6.2f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark dos pontos quentes do motor')
+    ap.add_argument('--escalas', default=','.join(map(str, ESCALAS)), help='nº de concursos sintéticos (separados por vírgula)')
+    ap.add_argument('--quantidade', type=int, default=100_000, help='candidatos/jogos por caso de geração')
+    ap.add_argument('--xlsx-max', type=int, default=100_000, help='maior escala para gerar XLSX (lento de escrever)')
+    ap.add_argument('--sem-memoria', action='store_true', help='não mede pico de memória (metade do tempo)')
+    ap.add_argument('--saida', default=os.path.join(BASE, 'data', 'bench'), help='diretório do JSON de resultados')
+    ap.add_argument('--comparar', help='JSON de uma execução anterior para comparar as taxas')
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='cartela_bench_')
+    os.environ['CARTELA_DATA_DIR'] = os.path.join(tmp, 'data')
+    sys.path.insert(0, BASE)
+    from src.core import engine
+    engine.logging.getLogger().setLevel(engine.logging.WARNING)
+
+    resultados = []
+    for escala in (int(e) for e in args.escalas.split(',') if e.strip()):
+        linhas = historico_sintetico(escala)
+        entradas = []
+        csv_path = os.path.join(tmp, f'hist_{escala}.csv')
+        escreve_csv(csv_path, linhas)
+        entradas.append(('csv', csv_path))
+        if escala <= args.xlsx_max:
+            xlsx_path = os.path.join(tmp, f'hist_{escala}.xlsx')
+            if escreve_xlsx(xlsx_path, linhas):
+                entradas.append(('xlsx', xlsx_path))
+        engine._grava_cache([dz for _, _, dz in linhas], [n for n, _, _ in linhas], [d for _, d, _ in linhas])
+        del linhas
+        for nome, unidade, funcao in casos(engine, entradas, args.quantidade):
+            segundos, unidades, pico = mede(funcao, memoria=not args.sem_memoria)
+            r = {'caso': nome, 'escala': escala, 'segundos': round(segundos, 6), 'unidades': unidades,
+                 'taxa': round(unidades / segundos, 2) if segundos > 0 else None, 'unidade': unidade,
+                 'pico_mb': round(pico, 2) if pico is not None else None}
+            resultados.append(r)
+            pico_txt = f"{r['pico_mb']:9.1f} MB" if pico is not None else ''
+            print(f"{nome:<38} {escala:>9}  {r['taxa'] or 0:>14,.0f} {unidade:<13}{pico_txt}")
+        engine.estado().invalidar()
+
+    relatorio = {
+        'commit': commit_atual(),
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    os.makedirs(args.saida, exist_ok=True)
+    destino = os.path.join(args.saida, f"bench_{datetime.datetime.now():%Y%m%d%H%M%S}_{relatorio['commit'] or 'sem_git'}.json")
+    with open(destino, 'w', encoding='utf8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print('Resultados salvos em', destino)
+    if args.comparar:
+        compara(resultados, args.comparar)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,7 +11,7 @@ if exist .venv\Scripts\activate.bat (
 ) else (
   echo Venv não encontrado ou não ativado. Continue mesmo assim se o pyinstaller estiver global.
 )
-pyinstaller --noconfirm --onefile --name Cartela --windowed --icon "app_files\resources\bingo.ico" --add-data "app_files\\data\\mega_cache.json;." --add-data "app_files;app_files" --add-data "app_files\\resources;resources" app_files\run_app.py
+pyinstaller --noconfirm --onefile --name Cartela --windowed --icon "app_files\resources\bingo.ico" --paths app_files --collect-submodules src.core --add-data "app_files\\data\\mega_cache.json;." --add-data "app_files;app_files" --add-data "app_files\\resources;resources" app_files\run_app.py
 if %errorlevel% equ 0 (
   echo Build concluido. Arquivo em dist\Cartela.exe
 ) else (
@@ -1,6 +1,10 @@
 ```powershell
 # Powershell script to build a single-file exe using PyInstaller
-# Usage: run from repo root: .\app_files\scripts\build_exe.ps1
+# Usage: run from repo root: .\app_files\scripts\build_exe.ps1 [-OneDir]
+#   -OneDir: gera dist\Cartela\Cartela.exe com as dependências ao lado, sem a
+#            extração para uma pasta temporária que o onefile faz a cada execução
+#            (partida bem mais rápida; distribua a pasta inteira)
+param([switch]$OneDir)
 
 $scriptDir = Split-Path -Parent $MyInvocation.MyCommand.Path
 # repo root is two levels up from app_files/scripts
@@ -34,8 +38,11 @@ $adds = @(
 
 # Build: construct argument array to avoid newline/Out-String issues
 $icon = (Join-Path $resourcesDir 'bingo.ico')
-$baseArgs = @('--noconfirm','--onefile','--name','Cartela','--windowed','--icon',$icon)
+$modo = if ($OneDir) { '--onedir' } else { '--onefile' }
+$baseArgs = @('--noconfirm',$modo,'--name','Cartela','--windowed','--icon',$icon)
 $addArgs = @()
+# módulos de src/core são importados sob demanda (importlib) e precisam ser coletados explicitamente
+$addArgs += '--collect-submodules'; $addArgs += 'src.core'
 foreach ($a in $adds) { $addArgs += '--add-data'; $addArgs += $a }
 $args = $baseArgs + $addArgs + @($entry)
 
@@ -43,7 +50,8 @@ Write-Host 'Running pyinstaller with args:' ($args -join ' ')
 & pyinstaller @args
 
 if ($LASTEXITCODE -eq 0) {
-    Write-Host "Build concluído. Verifique dist\Cartela.exe"
+    if ($OneDir) { Write-Host "Build concluído. Verifique dist\Cartela\Cartela.exe" }
+    else { Write-Host "Build concluído. Verifique dist\Cartela.exe" }
 } else {
     Write-Host "Build falhou com código $LASTEXITCODE"
 }
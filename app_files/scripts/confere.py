@@ -0,0 +1,49 @@
+"""
+confere.py
+Confere em massa os bilhetes de CSVs gerados por `salva_csv` contra um sorteio
+novo e/ou contra todo o histórico em cache (ver src/core/checker.py).
+
+Uso:
+  python scripts/confere.py volantes_mega.csv --sorteio 4,8,15,16,23,42
+  python scripts/confere.py a.csv b.csv --sorteio 4,8,15,16,23,42 --saida conferencia.csv --resumo conferencia.json
+  python scripts/confere.py volantes_mega.csv --sem-historico --sorteio 4,8,15,16,23,42
+"""
+import argparse
+import json
+import os
+import sys
+
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def main():
+    sys.path.insert(0, BASE)
+    from src.core import engine
+
+    ap = argparse.ArgumentParser(description='Conferência em massa de bilhetes')
+    ap.add_argument('arquivos', nargs='+', help='CSVs de bilhetes (Numero;D1;D2;...)')
+    ap.add_argument('--sorteio', help='dezenas do sorteio novo, ex.: 4,8,15,16,23,42')
+    ap.add_argument('--sem-historico', action='store_true', help='não confere contra os concursos em cache')
+    ap.add_argument('--saida', default=None, help='CSV com o resultado por bilhete')
+    ap.add_argument('--resumo', default=None, help='JSON com o resultado agregado')
+    args = ap.parse_args()
+
+    sorteio = None
+    if args.sorteio:
+        sorteio = [int(d) for d in args.sorteio.replace(' ', '').split(',') if d]
+        if len(sorteio) != 6 or len(set(sorteio)) != 6 or not all(1 <= d <= 60 for d in sorteio):
+            ap.error('--sorteio precisa de 6 dezenas distintas entre 1 e 60')
+    if sorteio is None and args.sem_historico:
+        ap.error('nada a conferir: informe --sorteio ou remova --sem-historico')
+
+    agregado = engine.confere_bilhetes(args.arquivos, sorteio=sorteio, historico=not args.sem_historico,
+                                       saida=args.saida, resumo=args.resumo)
+    print(json.dumps(agregado, ensure_ascii=False, indent=2))
+    if args.saida:
+        print('Resultado por bilhete salvo em', args.saida)
+    if args.resumo:
+        print('Resumo salvo em', args.resumo)
+
+
+if __name__ == '__main__':
+    main()
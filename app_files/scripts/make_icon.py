@@ -1,4 +1,3 @@
-```python
 from PIL import Image
 import os
 
@@ -17,5 +16,3 @@ sizes = [(256,256),(128,128),(64,64),(48,48),(32,32),(16,16)]
 icon_sizes = [s for s in sizes]
 img.save(OUT, format='ICO', sizes=icon_sizes)
 print('Ícone gerado em', OUT)
-
-```
\ No newline at end of file
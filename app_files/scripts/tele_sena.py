@@ -0,0 +1,57 @@
+"""
+tele_sena.py
+Ranqueia cartelas da Tele Sena (25 dezenas de 1 a 60) por distância de
+Mahalanobis às cartelas típicas (ou a uma cartela alvo), em fluxo com top-k
+limitado (ver src/core/ranking.py).
+
+Uso:
+  python scripts/tele_sena.py                 # top 10 entre 50 mil candidatas
+  python scripts/tele_sena.py 20 --candidatos 50000000 --workers 0 --seed 1
+  python scripts/tele_sena.py 5 --alvo 1,2,3,...,25 --csv top_tele.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def main():
+    sys.path.insert(0, BASE)
+    from src.core import engine
+
+    ap = argparse.ArgumentParser(description='Top-k cartelas da Tele Sena por distância de Mahalanobis')
+    ap.add_argument('k', type=int, nargs='?', default=10, help='quantas cartelas manter')
+    ap.add_argument('--candidatos', type=int, default=50_000, help='quantas cartelas sortear e avaliar')
+    ap.add_argument('--tamanho', type=int, default=25, help='dezenas por cartela')
+    ap.add_argument('--alvo', help='cartela alvo (dezenas separadas por vírgula); padrão: a cartela média')
+    ap.add_argument('--amostra', type=int, default=50_000, help='cartelas da amostra de referência da covariância')
+    ap.add_argument('--workers', type=int, default=None, help='processos (0 = todos os núcleos)')
+    ap.add_argument('--seed', type=int, default=None, help='semente (mesmo top-k para qualquer nº de workers)')
+    ap.add_argument('--csv', help='salva o ranking em CSV')
+    args = ap.parse_args()
+
+    alvo = [int(d) for d in args.alvo.split(',') if d.strip()] if args.alvo else None
+    if alvo is not None and (len(set(alvo)) != len(alvo) or not all(1 <= d <= 60 for d in alvo)):
+        ap.error('--alvo precisa de dezenas distintas entre 1 e 60')
+
+    t = time.perf_counter()
+    top = engine.ranqueia_cartelas(args.k, args.candidatos, args.tamanho, alvo=alvo,
+                                   workers=args.workers, seed=args.seed, amostra=args.amostra)
+    seg = time.perf_counter() - t
+    for i, (cartela, d) in enumerate(top, 1):
+        print(f"{i:02d}: {' '.join(f'{n:02d}' for n in cartela)}  d²={d:.4f}")
+    print(f'{args.candidatos} candidatas em {seg:.2f} s ({args.candidatos / seg:,.0f}/s)', file=sys.stderr)
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf8', newline='') as f:
+            w = csv.writer(f, delimiter=';')
+            w.writerow(['Posicao', 'Distancia2'] + [f'D{i}' for i in range(1, args.tamanho + 1)])
+            for i, (cartela, d) in enumerate(top, 1):
+                w.writerow([i, f'{d:.6f}'] + cartela)
+        print('Ranking salvo em', args.csv)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,26 @@
-```python
 import csv
-import json
-import shutil
 import os
-import datetime
+import sys
 
 BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DATA_DIR = os.path.join(BASE, 'data')
 SRC = os.path.join(DATA_DIR, 'mega_full_from_local.csv')
 CACHE = os.path.join(DATA_DIR, 'mega_cache.json')
+CACHE_BIN = os.path.join(DATA_DIR, 'mega_cache.bin')
 
-now = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-BAK = CACHE + '.bak.' + now
+# o snapshot é trocado atomicamente sob a trava do histórico (src/core/journal.py);
+# a versão anterior fica em data/historico, sem cópia (substitui os antigos .bak)
+sys.path.insert(0, BASE)
+from src.core.journal import Armazem
 
-if os.path.exists(CACHE):
-    shutil.copy(CACHE, BAK)
-    print('Backup criado:', BAK)
-else:
-    print('Arquivo de cache não existe, nenhum backup criado.')
+# cache binário (src/core/cache_bin.py) é opcional: requer numpy
+try:
+    from src.core import cache_bin
+except ImportError:
+    cache_bin = None
 
 out = []
+numeros = []
 with open(SRC, newline='', encoding='utf-8') as f:
     sample = f.readline()
     delim = ';' if ';' in sample else ','
@@ -44,11 +45,21 @@ with open(SRC, newline='', encoding='utf-8') as f:
         except Exception:
             continue
         out.append(nums)
+        numeros.append(int(row[0]) if row[0].strip().isdigit() else None)
 
-os.makedirs(DATA_DIR, exist_ok=True)
-with open(CACHE, 'w', encoding='utf-8') as g:
-    json.dump(out, g, ensure_ascii=False)
+def grava_bin():
+    if cache_bin is None:
+        return
+    try:
+        cache_bin.grava(CACHE_BIN, cache_bin.monta_registros(out, numeros))
+        print('Cache binário atualizado:', CACHE_BIN)
+    except ValueError as e:
+        print('Cache binário não gerado:', e)
 
-print('Escreveu', len(out), 'entradas em', CACHE)
 
-```
\ No newline at end of file
+armazem = Armazem(DATA_DIR)
+havia = os.path.exists(CACHE)
+armazem.grava(out, apos=grava_bin)
+print('Escreveu', len(out), 'entradas em', CACHE)
+if havia:
+    print('Versão anterior guardada em', armazem.versoes()[0])
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+artifacts.py
+Artefatos derivados do histórico (CSV completo padronizado, frequências, resumo),
+gerados em DATA_DIR só quando ficam defasados.
+
+Cada artefato tem uma chave: o hash do conteúdo do histórico de que ele depende
+(o CSV completo depende de nº, data e dezenas; as frequências só das dezenas; as
+recentes só dos últimos `RECENTES` concursos) mais a versão do seu formato. As
+chaves dos artefatos gerados ficam em `mega_artefatos.json`; reimportar o mesmo
+histórico não regrava nada, e um concurso novo não refaz o que não mudou. Os
+defasados são gerados em paralelo (threads: o trabalho é pouco e quase todo
+escrita em disco), cada um em tmp + os.replace, sob uma trava de arquivo para
+que dois processos não misturem manifesto e conteúdo.
+"""
+import csv
+import hashlib
+import json
+import os
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+from .journal import trava
+
+VERSAO = 1
+RECENTES = 100
+MANIFESTO = 'mega_artefatos.json'
+
+
+def _frequencias(concursos):
+    freq = [0] * 61
+    for c in concursos:
+        for d in c:
+            if 1 <= d <= 60:
+                freq[d] += 1
+    return freq
+
+
+def _full(dados, f):
+    concursos, numeros, datas = dados['concursos'], dados['numeros'], dados['datas']
+    w = csv.writer(f, delimiter=';')
+    w.writerow(['Concurso', 'Data', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6'])
+    for num, data, dezenas in zip(numeros, datas, concursos):
+        w.writerow([num if num is not None else '', data if data else ''] + list(dezenas))
+
+
+def _freq(dados, f):
+    freq = _frequencias(dados['concursos'])
+    w = csv.writer(f, delimiter=';')
+    w.writerow(['dezena', 'freq'])
+    w.writerows([d, freq[d]] for d in range(1, 61))
+
+
+def _freq_recente(dados, f):
+    freq = _frequencias(dados['concursos'][-RECENTES:])
+    w = csv.writer(f, delimiter=';')
+    w.writerow(['dezena', 'freq_recent'])
+    w.writerows([d, freq[d]] for d in range(1, 61))
+
+
+def _resumo(dados, f):
+    concursos, numeros, datas = dados['concursos'], dados['numeros'], dados['datas']
+    # top10 pela pontuação combinada (frequência + recência)
+    try:
+        combined = dados['pontua'](concursos, recent_n=RECENTES, alpha=0.6)
+        top10 = sorted(combined.items(), key=lambda x: (-x[1], x[0]))[:10]
+    except Exception:
+        freq = _frequencias(concursos)
+        top10 = sorted([(d, freq[d]) for d in range(1, 61)], key=lambda x: (-x[1], x[0]))[:10]
+    summary = {
+        'total_concursos': len(concursos),
+        'ultima_data': datas[-1] if datas and datas[-1] else None,
+        'ultima_concurso': numeros[-1] if numeros and numeros[-1] else None,
+        'top10': top10
+    }
+    json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+def _hash(*partes):
+    h = hashlib.sha1(str(VERSAO).encode())
+    for p in partes:
+        h.update(p if isinstance(p, bytes) else repr(p).encode('utf8'))
+        h.update(b'\0')
+    return h.hexdigest()[:16]
+
+
+def _bytes_dezenas(concursos):
+    return array('B', chain.from_iterable(concursos)).tobytes()
+
+
+# nome -> (função que escreve no arquivo aberto, chave do conteúdo de que depende)
+ARTEFATOS = {
+    'mega_full_from_local.csv': (
+        _full, lambda d, dz: _hash(dz, array('q', (n or 0 for n in d['numeros'])).tobytes(),
+                                   '\n'.join(x or '' for x in d['datas']))),
+    'mega_freq_from_local.csv': (_freq, lambda d, dz: _hash(dz)),
+    'mega_freq_recent.csv': (_freq_recente, lambda d, dz: _hash(RECENTES, _bytes_dezenas(d['concursos'][-RECENTES:]))),
+    'mega_summary.json': (
+        _resumo, lambda d, dz: _hash(dz, d['numeros'][-1:], d['datas'][-1:])),
+}
+
+
+def _le_manifesto(caminho):
+    try:
+        with open(caminho, encoding='utf8') as f:
+            return json.load(f).get('artefatos', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _gera(caminho, escreve, dados):
+    tmp = f'{caminho}.tmp.{os.getpid()}'
+    with open(tmp, 'w', encoding='utf8', newline='') as f:
+        escreve(dados, f)
+    os.replace(tmp, caminho)
+
+
+def atualiza(data_dir, concursos, numeros=None, datas=None, pontua=None, forcar=False, workers=None):
+    """Gera em `data_dir` os `ARTEFATOS` cuja chave mudou (todos com `forcar`).
+    `pontua(concursos, recent_n, alpha)` -> {dezena: score} alimenta o top10 do resumo.
+    Retorna dict {nome: 'gerado' | 'atual'}."""
+    data_dir = str(data_dir)
+    n = len(concursos)
+    dados = {'concursos': concursos, 'numeros': list(numeros) if numeros is not None else [None] * n,
+             'datas': list(datas) if datas is not None else [None] * n, 'pontua': pontua}
+    dz = _bytes_dezenas(concursos)
+    chaves = {nome: chave(dados, dz) for nome, (_, chave) in ARTEFATOS.items()}
+    manifesto_path = os.path.join(data_dir, MANIFESTO)
+    os.makedirs(data_dir, exist_ok=True)
+    with trava(os.path.join(data_dir, 'mega_artefatos.lock')):
+        manifesto = _le_manifesto(manifesto_path)
+        defasados = [nome for nome in ARTEFATOS
+                     if forcar or manifesto.get(nome) != chaves[nome]
+                     or not os.path.isfile(os.path.join(data_dir, nome))]
+        if not defasados:
+            return {nome: 'atual' for nome in ARTEFATOS}
+        tarefas = [(os.path.join(data_dir, nome), ARTEFATOS[nome][0], dados) for nome in defasados]
+        workers = max(1, min(workers or len(tarefas), len(tarefas)))
+        if workers == 1:
+            for t in tarefas:
+                _gera(*t)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                for _ in ex.map(lambda t: _gera(*t), tarefas):
+                    pass
+        manifesto.update((nome, chaves[nome]) for nome in defasados)
+        tmp = f'{manifesto_path}.tmp.{os.getpid()}'
+        with open(tmp, 'w', encoding='utf8') as f:
+            json.dump({'versao': VERSAO, 'artefatos': manifesto}, f, indent=2)
+        os.replace(tmp, manifesto_path)
+    return {nome: 'gerado' if nome in defasados else 'atual' for nome in ARTEFATOS}
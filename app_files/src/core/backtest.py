@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+backtest.py
+Backtest walk-forward das estratégias de pontuação.
+
+O histórico é reproduzido em ordem: no passo t cada estratégia só conhece os
+concursos 0..t-1, escolhe suas dezenas (top-k do score) ou gera jogos, e é
+pontuada contra o concurso t. Frequência e recência são acumuladores
+atualizados a cada passo (O(60) por concurso), em vez de recalcular
+`pontuar_dezenas`/`combined_scores` sobre o prefixo inteiro (O(N²) no total):
+- frequência: soma das linhas one-hot;
+- recência linear (janela R, peso i - s + 1): S1 - s·S0, com S0 = Σx_i e
+  S1 = Σ(i+1)·x_i mantidas sobre a janela (entra o concurso novo, sai o antigo);
+- recência exp: r ← r·q + x_novo - x_saindo·q^R, com q = e^(-λ).
+Estratégias (ou conjuntos de parâmetros) são independentes e podem rodar em
+processos separados; o resultado é a distribuição de acertos de cada uma.
+
+Especificação de estratégia: 'tipo' ou 'tipo:chave=valor,...', por exemplo
+  frequencia  invertido  combinado:recent_n=50,alpha=0.4,decay=exp,decay_lambda=0.1
+  gerado:jogos=20
+Valores alternativos separados por '|' viram uma grade de parâmetros (`expande`):
+  combinado:recent_n=50|100|200,alpha=0.4|0.6
+"""
+import csv
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+
+from .sampler import AmostradorPonderado
+from .sweep import matriz_sorteios
+
+TIPOS = ('frequencia', 'invertido', 'combinado', 'gerado')
+PADRAO = ('frequencia', 'invertido', 'combinado', 'combinado:decay=exp', 'gerado')
+PARAMS = {
+    'frequencia': {},
+    'invertido': {},
+    'combinado': {'recent_n': 100, 'alpha': 0.6, 'decay': 'linear', 'decay_lambda': 0.05},
+    'gerado': {'jogos': 10},
+}
+
+_CTX = {}
+
+
+def estrategia(spec):
+    """Converte 'tipo:chave=valor,...' (ou dict) em {'tipo', 'params', 'rotulo'}."""
+    if isinstance(spec, dict):
+        tipo, params = spec['tipo'], dict(spec.get('params', {}))
+    else:
+        tipo, _, resto = spec.partition(':')
+        params = {}
+        for item in filter(None, resto.split(',')):
+            chave, _, valor = item.partition('=')
+            params[chave.strip()] = valor.strip()
+    tipo = tipo.strip()
+    if tipo not in PARAMS:
+        raise ValueError(f"Estratégia desconhecida: {tipo} (use {', '.join(TIPOS)})")
+    completos = dict(PARAMS[tipo])
+    for chave, valor in params.items():
+        if chave not in completos:
+            raise ValueError(f"Parâmetro desconhecido para {tipo}: {chave}")
+        padrao = completos[chave]
+        completos[chave] = valor if isinstance(padrao, str) else type(padrao)(valor)
+    rotulo = tipo + ''.join(f' {k}={v}' for k, v in completos.items())
+    return {'tipo': tipo, 'params': completos, 'rotulo': rotulo}
+
+
+def expande(spec):
+    """Lista de especificações: uma por combinação dos valores 'a|b|c' de `spec`."""
+    tipo, _, resto = spec.partition(':')
+    itens = [item.partition('=') for item in filter(None, resto.split(','))]
+    opcoes = [[f'{chave}={v}' for v in valor.split('|')] for chave, _, valor in itens]
+    return [tipo + (':' + ','.join(c) if c else '') for c in product(*opcoes)]
+
+
+def _ordem(scores, k):
+    # score desc, dezena asc (sort estável sobre -score)
+    return np.argsort(-scores, kind='stable')[:k]
+
+
+class _Recencia:
+    """Acumulador da recência de `combined_scores`/`top_dezenas_params` sobre uma janela móvel."""
+
+    def __init__(self, recent_n, decay, decay_lambda):
+        self.janela = recent_n if recent_n > 0 else None  # recent_n=0 => histórico todo
+        self.exp = decay == 'exp'
+        self.q = float(np.exp(-decay_lambda)) if self.exp else None
+        self.qR = self.q ** self.janela if self.exp and self.janela else 0.0
+        self.s0 = np.zeros(60, dtype=np.int64)
+        self.s1 = np.zeros(60, dtype=np.int64)
+        self.r = np.zeros(60, dtype=np.float64)
+        self.inicio = 0
+
+    def adiciona(self, X, t):
+        """Inclui o concurso t (e descarta o que sai da janela)."""
+        x = X[t]
+        sai = t - self.janela if self.janela is not None and t >= self.janela else None
+        if self.exp:
+            self.r *= self.q
+            self.r += x
+            if sai is not None:
+                self.r -= X[sai] * self.qR
+        else:
+            self.s0 += x
+            self.s1 += (t + 1) * x.astype(np.int64)
+            if sai is not None:
+                self.s0 -= X[sai]
+                self.s1 -= (sai + 1) * X[sai].astype(np.int64)
+        if sai is not None:
+            self.inicio = sai + 1
+
+    def bruta(self):
+        if self.exp:
+            return self.r
+        return (self.s1 - self.inicio * self.s0).astype(np.float64)
+
+
+def roda(X, spec, k=6, inicio=100, seed=0, pipeline=None):
+    """Reproduz o histórico X (matriz one-hot de `sweep.matriz_sorteios`) para uma estratégia.
+    Retorna dict com rótulo, parâmetros, nº de passos e a distribuição de acertos
+    (top-k contra o próximo concurso; em 'gerado', acertos de cada jogo)."""
+    est = spec if isinstance(spec, dict) and 'rotulo' in spec else estrategia(spec)
+    tipo, p = est['tipo'], est['params']
+    L = len(X)
+    freq = np.zeros(60, dtype=np.int64)
+    rec = _Recencia(p['recent_n'], p['decay'], p['decay_lambda']) if tipo == 'combinado' else None
+    rng = np.random.default_rng(seed)
+    if tipo == 'gerado' and pipeline is None:
+        from .filters import padrao
+        pipeline = padrao()
+    dist = Counter()
+    passos = 0
+    for t in range(L):
+        if t >= inicio:
+            sorteio = X[t]
+            if tipo == 'gerado':
+                dist.update(_acertos_gerados(freq, sorteio, p['jogos'], rng, pipeline).tolist())
+            else:
+                escolha = _ordem(_scores(tipo, p, freq, rec), k)
+                dist[int(sorteio[escolha].sum())] += 1
+            passos += 1
+        freq += X[t]
+        if rec is not None:
+            rec.adiciona(X, t)
+    total = sum(dist.values()) or 1
+    return {
+        'estrategia': est['rotulo'],
+        'tipo': tipo,
+        'params': p,
+        'k': 6 if tipo == 'gerado' else k,
+        'passos': passos,
+        'distribuicao': {str(h): dist[h] for h in sorted(dist)},
+        'media_acertos': round(sum(h * n for h, n in dist.items()) / total, 6),
+    }
+
+
+def _scores(tipo, p, freq, rec):
+    if tipo == 'frequencia':
+        return freq.astype(np.float64)
+    if tipo == 'invertido':
+        # pesos_invertidos: (total - f) / total, maior para as menos sorteadas
+        return -freq.astype(np.float64)
+    maxf = freq.max()
+    bruta = rec.bruta()
+    max_raw = bruta.max()
+    if maxf == 0 or max_raw == 0:
+        # combined_scores divide por zero e top_dezenas_params cai em pontuar_dezenas
+        return freq.astype(np.float64)
+    a = p['alpha']
+    return a * (freq / maxf) + (1.0 - a) * (bruta / max_raw)
+
+
+def _acertos_gerados(freq, sorteio, jogos, rng, pipeline):
+    """Acertos (0..6) de `jogos` gerados como `gerar_jogos` (pesos invertidos + filtros estáticos)."""
+    total = freq.sum()
+    amostrador = AmostradorPonderado((total - freq) / total if total else None)
+    escolhidos = []
+    falta = jogos
+    while falta > 0:
+        bloco = amostrador.sorteia_lote(rng, max(16, 4 * falta))
+        ok = np.ones(len(bloco), dtype=bool)
+        for _, m in pipeline.regras_mask(bloco):
+            ok &= m
+        bloco = bloco[ok][:falta]
+        escolhidos.append(bloco)
+        falta -= len(bloco)
+    jogos = np.concatenate(escolhidos)
+    return (sorteio[jogos - 1] > 0).sum(axis=1)
+
+
+def _inicia_worker(X, k, inicio, seed, pipeline):
+    _CTX.update(X=X, k=k, inicio=inicio, seed=seed, pipeline=pipeline)
+
+
+def _roda_worker(spec):
+    return roda(_CTX['X'], spec, _CTX['k'], _CTX['inicio'], _CTX['seed'], _CTX['pipeline'])
+
+
+def backtest(concursos, estrategias=PADRAO, k=6, inicio=100, workers=None, seed=0, X=None, pipeline=None):
+    """Roda `estrategias` (especificações de `estrategia`) sobre `concursos`.
+    Com `workers` > 1 cada estratégia vai para um processo (X é enviado uma vez por worker).
+    Retorna lista de resultados de `roda`, na ordem das estratégias."""
+    if X is None:
+        X = matriz_sorteios(concursos)
+    specs = [estrategia(s) for s in estrategias]
+    workers = max(1, min(workers or 1, len(specs) or 1))
+    if workers == 1:
+        return [roda(X, s, k, inicio, seed, pipeline) for s in specs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_inicia_worker,
+                             initargs=(X, k, inicio, seed, pipeline)) as ex:
+        return list(ex.map(_roda_worker, specs))
+
+
+def salva_json(resultados, caminho):
+    with open(caminho, 'w', encoding='utf8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+def salva_csv(resultados, caminho):
+    """Uma linha por (estratégia, nº de acertos): Estrategia;K;Acertos;Quantidade;Fracao."""
+    with open(caminho, 'w', encoding='utf8', newline='') as f:
+        w = csv.writer(f, delimiter=';')
+        w.writerow(['Estrategia', 'K', 'Acertos', 'Quantidade', 'Fracao'])
+        for r in resultados:
+            total = sum(r['distribuicao'].values()) or 1
+            for h, n in r['distribuicao'].items():
+                w.writerow([r['estrategia'], r['k'], h, n, f'{n / total:.6f}'])
+
+
+def salva(resultados, caminho):
+    """Grava em CSV ou JSON conforme a extensão de `caminho`."""
+    if os.path.splitext(caminho)[1].lower() == '.json':
+        salva_json(resultados, caminho)
+    else:
+        salva_csv(resultados, caminho)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+batch.py
+Motor vetorizado (numpy) para geração de jogos em lote.
+
+Sorteia blocos de candidatos como matrizes (N, 6) e aplica as mesmas regras de
+`engine.filtros_ok` como máscaras booleanas sobre todas as linhas de uma vez.
+Uso:
+  from src.core.batch import gerar_jogos_lote
+"""
+import numpy as np
+
+from .filters import PRIMOS, padrao  # noqa: F401 (PRIMOS reexportado)
+from .sampler import AmostradorPonderado
+
+
+def mascaras(jogos):
+    """Codifica cada linha de `jogos` (N, k) como bitmask uint64 (bit d-1 = dezena d)."""
+    jogos = np.asarray(jogos)
+    if jogos.size == 0:
+        return np.zeros(len(jogos), dtype=np.uint64)
+    bits = np.left_shift(np.uint64(1), (jogos - 1).astype(np.uint64))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def mascaras_historico(concursos):
+    """Bitmasks ordenadas (únicas) dos concursos com 6 dezenas distintas.
+    Reaproveita o índice de `history.Concursos` quando disponível."""
+    indice = getattr(concursos, 'indice', None)
+    if indice is not None:
+        return indice.array()
+    validos = [c for c in concursos if len(c) == 6 and len(set(c)) == 6]
+    if not validos:
+        return np.zeros(0, dtype=np.uint64)
+    return np.unique(mascaras(np.array(validos, dtype=np.int64)))
+
+
+def regras_mask(jogos, historico=None, pipeline=None):
+    """Máscaras por regra do `pipeline` (`filters.Pipeline`; padrão: regras clássicas
+    de `filtros_ok`), na ordem atual dele: lista de (nome, array bool (N,), True = aprovado)."""
+    return (pipeline or padrao()).regras_mask(jogos, historico)
+
+
+def filtros_mask(jogos, historico=None, pipeline=None):
+    """Versão vetorizada de `filtros_ok`.
+    `jogos` deve estar ordenado por linha; `historico` é o array de
+    `mascaras_historico`. Retorna array bool (N,) com True para os aprovados.
+    """
+    ok = np.ones(len(jogos), dtype=bool)
+    for _, m in regras_mask(jogos, historico, pipeline):
+        ok &= m
+    return ok
+
+
+def rejeicoes_mask(jogos, historico=None, pipeline=None):
+    """Como `filtros_mask`, mas também retorna {regra: rejeitados}, atribuindo cada
+    rejeição à primeira regra que falhou (como `engine.motivo_rejeicao`)."""
+    ok = np.ones(len(jogos), dtype=bool)
+    contagem = {}
+    for nome, m in regras_mask(jogos, historico, pipeline):
+        contagem[nome] = int(np.count_nonzero(ok & ~m))
+        ok &= m
+    return ok, contagem
+
+
+def sorteia_bloco(rng, n, pesos=None, k=6):
+    """Sorteia `n` jogos de `k` dezenas distintas, ordenados por linha.
+    `pesos` ({dezena: peso}, `AmostradorPonderado` ou None para uniforme).
+    """
+    amostrador = pesos if isinstance(pesos, AmostradorPonderado) else AmostradorPonderado(pesos or None)
+    return amostrador.sorteia_lote(rng, n, k)
+
+
+def iter_blocos_lote(quantidade, concursos, pesos, forcar_filtros=False, lote=50_000, seed=None, stats=None, pipeline=None):
+    """Gera blocos (arrays (m, 6)) de jogos aprovados até somar `quantidade`,
+    sorteando até `lote` candidatos por vez. `quantidade=None` gera sem fim.
+    `stats` (`stats.Estatisticas`) recebe as rejeições por regra de cada bloco;
+    `pipeline` (`filters.Pipeline`) troca as regras padrão."""
+    rng = np.random.default_rng(seed)
+    pipeline = pipeline or padrao()
+    historico = mascaras_historico(concursos) if pipeline.usa_historico else None
+    amostrador = pesos if isinstance(pesos, AmostradorPonderado) else AmostradorPonderado(pesos if concursos else None)
+    falta = quantidade
+    while falta is None or falta > 0:
+        n = lote if falta is None else max(1, min(lote, falta * 4))
+        bloco = amostrador.sorteia_lote(rng, n)
+        candidatos, rejeicoes = len(bloco), None
+        if stats is not None and not forcar_filtros:
+            ok, rejeicoes = rejeicoes_mask(bloco, historico, pipeline)
+            bloco = bloco[ok]
+        elif not forcar_filtros:
+            bloco = bloco[filtros_mask(bloco, historico, pipeline)]
+        aprovados = len(bloco)
+        if falta is not None:
+            bloco = bloco[:falta]
+            falta -= len(bloco)
+        if rejeicoes is not None:
+            # aprovados cortados no último bloco não contam como aceitos
+            stats.avalia_lote(candidatos, rejeicoes, descartados=aprovados - len(bloco))
+        if len(bloco):
+            yield bloco
+
+
+def gerar_jogos_lote(quantidade, concursos, pesos, forcar_filtros=False, lote=50_000, seed=None, pipeline=None):
+    """Gera `quantidade` jogos sorteando blocos de até `lote` candidatos por vez.
+    Retorna lista de listas de inteiros, como `engine.gerar_jogos`.
+    """
+    partes = list(iter_blocos_lote(quantidade, concursos, pesos, forcar_filtros, lote, seed, pipeline=pipeline))
+    if not partes:
+        return []
+    return np.concatenate(partes).tolist()
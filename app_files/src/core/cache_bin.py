@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+cache_bin.py
+Cache binário do histórico, lido por memory-map (numpy.memmap) sem cópia.
+
+Layout (little-endian):
+  cabeçalho de 32 bytes: magic b'MEGACACH', versão (u16), tamanho do cabeçalho (u16),
+  tamanho do registro (u16), reservado (u16), quantidade de registros (u64), 8 bytes livres;
+  registros de 14 bytes: concurso (u4, 0 = desconhecido), data em dias desde
+  1970-01-01 (i4, SEM_DATA = desconhecida) e as 6 dezenas (u1).
+O JSON (`mega_cache.json`) continua sendo o formato de troca: veja `importa_json`/`exporta_json`.
+"""
+import datetime
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+MAGIC = b'MEGACACH'
+VERSAO = 1
+CABECALHO = struct.Struct('<8sHHHHQ8x')
+SEM_DATA = -2 ** 31
+REGISTRO = np.dtype([('concurso', '<u4'), ('data', '<i4'), ('dezenas', 'u1', (6,))])
+
+_EPOCA = datetime.date(1970, 1, 1)
+_RE_BR = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{2,4})$')
+_RE_ISO = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})')
+
+
+class CacheInvalido(ValueError):
+    """Arquivo não é um cache binário reconhecido (ou versão incompatível)."""
+
+
+def data_para_dias(s):
+    """Converte 'dd/mm/aaaa' ou 'aaaa-mm-dd' em dias desde 1970-01-01 (SEM_DATA se inválida)."""
+    if not s:
+        return SEM_DATA
+    s = str(s).strip()
+    try:
+        m = _RE_BR.match(s)
+        if m:
+            d, mes, a = map(int, m.groups())
+            if a < 100:
+                a += 2000 if a < 70 else 1900
+            return (datetime.date(a, mes, d) - _EPOCA).days
+        m = _RE_ISO.match(s)
+        if m:
+            a, mes, d = map(int, m.groups())
+            return (datetime.date(a, mes, d) - _EPOCA).days
+    except ValueError:
+        pass
+    return SEM_DATA
+
+
+def dias_para_data(n):
+    """Inverso de `data_para_dias`: retorna 'dd/mm/aaaa' ou None."""
+    if n == SEM_DATA:
+        return None
+    return f'{_EPOCA + datetime.timedelta(days=int(n)):%d/%m/%Y}'
+
+
+def monta_registros(dezenas, concursos=None, datas=None):
+    """Monta o array estruturado a partir de listas paralelas.
+    `concursos` (int ou None) e `datas` (str ou None) são opcionais.
+    ValueError se algum concurso não tiver exatamente 6 dezenas em 1..60."""
+    n = len(dezenas)
+    ruins = [i for i, c in enumerate(dezenas) if len(c) != 6]
+    if ruins:
+        # o registro só tem lugar para 6: descartar essas linhas desalinharia o cache do JSON
+        raise ValueError(f'{len(ruins)} concurso(s) sem exatamente 6 dezenas '
+                         f'(o primeiro, na posição {ruins[0]}: {list(dezenas[ruins[0]])})')
+    regs = np.zeros(n, dtype=REGISTRO)
+    if n:
+        # valida antes de converter: fora da faixa, o numpy estoura (OverflowError) ou trunca em silêncio
+        D = np.asarray(dezenas, dtype=np.int64).reshape(n, 6)
+        if D.min() < 1 or D.max() > 60:
+            raise ValueError('dezenas fora de 1..60')
+        regs['dezenas'] = D
+    if concursos is not None:
+        C = np.asarray([c or 0 for c in concursos], dtype=np.int64)
+        if len(C) and (C.min() < 0 or C.max() > 0xFFFFFFFF):
+            raise ValueError('nº de concurso fora de 0..2^32-1')
+        regs['concurso'] = C
+    regs['data'] = [data_para_dias(d) for d in datas] if datas is not None else SEM_DATA
+    return regs
+
+
+def _cabecalho(n):
+    return CABECALHO.pack(MAGIC, VERSAO, CABECALHO.size, REGISTRO.itemsize, 0, n)
+
+
+def grava(caminho, regs):
+    """Grava `regs` (array REGISTRO) em `caminho` de forma atômica (tmp + rename).
+    No Windows a troca falha enquanto outro processo mantiver o arquivo mapeado."""
+    regs = np.ascontiguousarray(regs, dtype=REGISTRO)
+    tmp = f'{caminho}.tmp.{os.getpid()}'  # dois processos podem regerar o cache ao mesmo tempo
+    with open(tmp, 'wb') as f:
+        f.write(_cabecalho(len(regs)))
+        f.write(regs.tobytes())
+    os.replace(tmp, caminho)
+
+
+def le_cabecalho(f):
+    bruto = f.read(CABECALHO.size)
+    if len(bruto) < CABECALHO.size:
+        raise CacheInvalido('cabeçalho incompleto')
+    magic, versao, tam_cab, tam_reg, _, n = CABECALHO.unpack(bruto)
+    if magic != MAGIC:
+        raise CacheInvalido('magic inválido')
+    if versao != VERSAO or tam_reg != REGISTRO.itemsize:
+        raise CacheInvalido(f'versão {versao} não suportada')
+    return tam_cab, n
+
+
+def abre(caminho):
+    """Abre o cache como array estruturado somente leitura mapeado em memória.
+    `regs['dezenas']` é uma view (N, 6) uint8 sem cópia."""
+    with open(caminho, 'rb') as f:
+        tam_cab, n = le_cabecalho(f)
+    if n == 0:
+        return np.zeros(0, dtype=REGISTRO)
+    return np.memmap(caminho, dtype=REGISTRO, mode='r', offset=tam_cab, shape=(n,))
+
+
+def anexa(caminho, regs):
+    """Acrescenta registros ao fim do arquivo e atualiza a contagem do cabeçalho."""
+    regs = np.ascontiguousarray(regs, dtype=REGISTRO)
+    if not os.path.exists(caminho):
+        return grava(caminho, regs)
+    with open(caminho, 'r+b') as f:
+        tam_cab, n = le_cabecalho(f)
+        f.seek(tam_cab + n * REGISTRO.itemsize)
+        f.write(regs.tobytes())
+        f.truncate()
+        f.seek(0)
+        f.write(_cabecalho(n + len(regs)))
+
+
+def sincroniza(caminho, dezenas, concursos=None, datas=None):
+    """Regrava o cache com o histórico `dezenas` (listas paralelas como em `monta_registros`).
+    Nº e data que faltarem são reaproveitados dos registros antigos no prefixo comum;
+    se o conteúdo já é o mesmo, só renova o mtime. Retorna o cache aberto."""
+    regs = monta_registros(dezenas, concursos, datas)
+    try:
+        antigo = abre(caminho)
+    except (OSError, CacheInvalido):
+        antigo = np.zeros(0, dtype=REGISTRO)
+    n = min(len(antigo), len(regs))
+    if n and np.array_equal(antigo['dezenas'][:n], regs['dezenas'][:n]):
+        if len(antigo) == len(regs):
+            del antigo
+            os.utime(caminho)
+            return abre(caminho)
+        sem_num = regs['concurso'][:n] == 0
+        regs['concurso'][:n][sem_num] = antigo['concurso'][:n][sem_num]
+        sem_data = regs['data'][:n] == SEM_DATA
+        regs['data'][:n][sem_data] = antigo['data'][:n][sem_data]
+    del antigo
+    grava(caminho, regs)
+    return abre(caminho)
+
+
+def importa_json(caminho_json, caminho_bin):
+    """Converte `mega_cache.json` (lista de listas de 6 dezenas) no cache binário.
+    ValueError se algum concurso não tiver 6 dezenas (ver `monta_registros`)."""
+    with open(caminho_json, encoding='utf8') as f:
+        dezenas = json.load(f)
+    regs = monta_registros(dezenas)
+    grava(caminho_bin, regs)
+    return regs
+
+
+def exporta_json(caminho_bin, caminho_json):
+    """Gera o `mega_cache.json` compatível a partir do cache binário."""
+    regs = abre(caminho_bin)
+    with open(caminho_json, 'w', encoding='utf8') as f:
+        json.dump(regs['dezenas'].tolist(), f)
+    return len(regs)
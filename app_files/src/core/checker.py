@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+checker.py
+Conferência em massa de bilhetes (CSV de `salva_csv`) contra um sorteio novo
+e contra todo o histórico.
+
+Bilhetes e sorteios viram bitmasks uint64 (bit d-1 = dezena d); os acertos de
+um bilhete em um sorteio são popcount(bilhete & sorteio). Os bilhetes são lidos
+do CSV em blocos e cruzados com o histórico em sub-blocos (bilhetes x concursos),
+de modo que a memória fica limitada ao tamanho do bloco.
+
+Apostas com mais de 6 dezenas contam todos os jogos de 6 que contêm: com q
+dezenas e h acertos há C(h, k)·C(q-h, 6-k) prêmios de k acertos (quadra k=4,
+quina k=5, sena k=6), como nas regras da Mega-Sena.
+"""
+import csv
+import json
+from itertools import chain, islice
+from math import comb
+
+import numpy as np
+
+from .batch import mascaras
+from .filters import popcount_np
+
+BLOCO = 100_000
+CELULAS = 1 << 22  # bilhetes x concursos por sub-bloco
+FAIXAS = {'quadra': 4, 'quina': 5, 'sena': 6}
+# PREMIOS[k][q, h] = prêmios de k acertos de uma aposta de q dezenas com h acertos
+PREMIOS = {k: np.array([[comb(h, k) * comb(q - h, 6 - k) if q >= 6 else 0 for h in range(7)]
+                        for q in range(21)], dtype=np.int64)
+           for k in FAIXAS.values()}
+
+
+def le_bilhetes(caminho, bloco=BLOCO):
+    """Lê um CSV 'Numero;D1;...' em blocos: gera (numeros, mascaras uint64, tamanhos)."""
+    with open(caminho, newline='', encoding='utf8') as f:
+        amostra = f.readline()
+        delim = ';' if ';' in amostra else ','
+        f.seek(0)
+        leitor = csv.reader(f, delimiter=delim)
+        cabecalho = next(leitor, None)
+        if cabecalho and all(c.strip().isdigit() for c in cabecalho if c.strip()):
+            # arquivo sem cabeçalho: a primeira linha já é um bilhete
+            leitor = chain([cabecalho], leitor)
+        while True:
+            linhas = [r for r in islice(leitor, bloco) if r and r[0].strip()]
+            if not linhas:
+                break
+            numeros = [r[0].strip() for r in linhas]
+            M, tamanhos = codifica([[int(c) for c in r[1:] if c.strip()] for r in linhas])
+            yield numeros, M, tamanhos
+
+
+def codifica(bilhetes):
+    """Bitmasks uint64 e tamanhos (C,) de uma lista de bilhetes de tamanhos variados."""
+    tamanhos = np.array([len(b) for b in bilhetes], dtype=np.int64)
+    dezenas = np.zeros((len(bilhetes), int(tamanhos.max()) if len(tamanhos) else 0), dtype=np.int64)
+    for i, b in enumerate(bilhetes):
+        dezenas[i, :len(b)] = b
+    # colunas vazias (0) não ligam bit nenhum
+    bits = np.where(dezenas > 0, np.left_shift(np.uint64(1), (np.maximum(dezenas, 1) - 1).astype(np.uint64)),
+                    np.uint64(0))
+    return np.bitwise_or.reduce(bits, axis=1), tamanhos
+
+
+def _premios(acertos, tamanhos):
+    """{faixa: array} com os prêmios de cada bilhete (acertos e tamanhos (C,))."""
+    q = np.minimum(tamanhos, 20)
+    return {nome: PREMIOS[k][q, acertos] for nome, k in FAIXAS.items()}
+
+
+class Conferencia:
+    """Acumula os resultados agregados; `confere_bloco` devolve as colunas por bilhete."""
+
+    def __init__(self, sorteio=None, historico=None):
+        self.sorteio = None if sorteio is None else sorted(int(d) for d in sorteio)
+        self._mascara = None if sorteio is None else mascaras(np.array([self.sorteio]))[0]
+        self.historico = None if historico is None else np.asarray(historico, dtype=np.uint64)
+        self.bilhetes = 0
+        self.acertos = np.zeros(7, dtype=np.int64)
+        self.premios = dict.fromkeys(FAIXAS, 0)
+        self.premios_historico = dict.fromkeys(FAIXAS, 0)
+        self.melhor_historico = np.zeros(7, dtype=np.int64)
+
+    def confere_bloco(self, M, tamanhos):
+        """Confere um bloco de bitmasks; retorna dict de colunas (arrays) por bilhete."""
+        self.bilhetes += len(M)
+        colunas = {}
+        if self._mascara is not None:
+            h = popcount_np(M & self._mascara).astype(np.int64)
+            colunas['acertos'] = h
+            self.acertos += np.bincount(h, minlength=7)[:7]
+            for nome, p in _premios(h, tamanhos).items():
+                colunas[nome] = p
+                self.premios[nome] += int(p.sum())
+        if self.historico is not None and len(self.historico):
+            L = len(self.historico)
+            passo = max(1, CELULAS // L)
+            hist = {nome: np.zeros(len(M), dtype=np.int64) for nome in FAIXAS}
+            melhor = np.zeros(len(M), dtype=np.int64)
+            for ini in range(0, len(M), passo):
+                sub = slice(ini, ini + passo)
+                A = popcount_np(M[sub, None] & self.historico[None, :])
+                melhor[sub] = A.max(axis=1)
+                # concursos com h acertos por bilhete; só h >= 4 rende prêmio
+                q = np.minimum(tamanhos[sub], 20)
+                for h in range(4, 7):
+                    n = np.count_nonzero(A == h, axis=1)
+                    for nome, k in FAIXAS.items():
+                        hist[nome][sub] += n * PREMIOS[k][q, h]
+            for nome, v in hist.items():
+                colunas[f'{nome}s_historico'] = v
+                self.premios_historico[nome] += int(v.sum())
+            colunas['melhor_historico'] = melhor
+            self.melhor_historico += np.bincount(melhor, minlength=7)[:7]
+        return colunas
+
+    def resumo(self):
+        r = {'bilhetes': self.bilhetes}
+        if self.sorteio is not None:
+            r['sorteio'] = self.sorteio
+            r['acertos_sorteio'] = {str(h): int(n) for h, n in enumerate(self.acertos)}
+            r['premios_sorteio'] = dict(self.premios)
+        if self.historico is not None:
+            r['concursos'] = int(len(self.historico))
+            r['premios_historico'] = dict(self.premios_historico)
+            r['melhor_historico'] = {str(h): int(n) for h, n in enumerate(self.melhor_historico)}
+        return r
+
+
+def confere(caminhos, sorteio=None, historico=None, saida=None, resumo=None, bloco=BLOCO):
+    """Confere os bilhetes dos CSVs em `caminhos` contra `sorteio` (6 dezenas) e/ou
+    `historico` (bitmasks uint64 dos concursos). `saida`: CSV por bilhete;
+    `resumo`: JSON agregado. Retorna o dict agregado."""
+    if isinstance(caminhos, str):
+        caminhos = [caminhos]
+    conf = Conferencia(sorteio, historico)
+    f = open(saida, 'w', encoding='utf8', newline='', buffering=1 << 20) if saida else None
+    try:
+        w = csv.writer(f, delimiter=';') if f else None
+        cabecalho = None
+        for caminho in caminhos:
+            for numeros, M, tamanhos in le_bilhetes(caminho, bloco):
+                colunas = conf.confere_bloco(M, tamanhos)
+                if w is None:
+                    continue
+                nomes = list(colunas)
+                if cabecalho is None:
+                    cabecalho = ['Arquivo', 'Numero'] + [n.capitalize() for n in nomes]
+                    w.writerow(cabecalho)
+                valores = np.column_stack([colunas[n] for n in nomes]).tolist() if nomes else [[]] * len(numeros)
+                w.writerows([caminho, n] + v for n, v in zip(numeros, valores))
+    finally:
+        if f:
+            f.close()
+    agregado = conf.resumo()
+    if resumo:
+        with open(resumo, 'w', encoding='utf8') as fr:
+            json.dump(agregado, fr, ensure_ascii=False, indent=2)
+    return agregado
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+combos.py
+Rank combinatório (sistema combinatório / ordem colex) de jogos de 6 dezenas.
+
+Um jogo ordenado d1 < ... < d6 (1..60) recebe o rank
+  sum(C(d_i - 1, i)) para i = 1..6,
+um inteiro em [0, C(60, 6)) que identifica o jogo de forma única e cabe em uint32.
+`rank`/`unrank` são a versão escalar; `ranks`/`unranks` operam sobre arrays numpy.
+"""
+from math import comb
+
+N = 60
+K = 6
+TOTAL = comb(N, K)
+
+# _BIN[i][c] = C(c, i)
+_BIN = [[comb(c, i) for c in range(N + 1)] for i in range(K + 1)]
+
+
+def rank(jogo):
+    """Rank colex de um jogo com 6 dezenas distintas."""
+    return sum(_BIN[i][d - 1] for i, d in enumerate(sorted(jogo), start=1))
+
+
+def unrank(r):
+    """Inverso de `rank`: retorna a lista ordenada de dezenas."""
+    jogo = []
+    c = N
+    for i in range(K, 0, -1):
+        c -= 1
+        while _BIN[i][c] > r:
+            c -= 1
+        jogo.append(c + 1)
+        r -= _BIN[i][c]
+    jogo.reverse()
+    return jogo
+
+
+def ranks(jogos):
+    """Ranks (uint64) das linhas de um array (M, k) ordenado por linha (k <= 6)."""
+    import numpy as np
+    tab = np.array(_BIN, dtype=np.uint64)
+    j = np.asarray(jogos, dtype=np.int64) - 1
+    r = np.zeros(len(j), dtype=np.uint64)
+    for i in range(j.shape[1]):
+        r += tab[i + 1][j[:, i]]
+    return r
+
+
+def unranks(rs):
+    """Inverso vetorizado de `ranks`: retorna array (M, 6) uint8 ordenado por linha."""
+    import numpy as np
+    rs = np.asarray(rs, dtype=np.uint64).copy()
+    saida = np.empty((len(rs), K), dtype=np.uint8)
+    for i in range(K, 0, -1):
+        tab = np.array(_BIN[i][:N], dtype=np.uint64)
+        c = np.searchsorted(tab, rs, side='right') - 1
+        saida[:, i - 1] = c + 1
+        rs -= tab[c]
+    return saida
+
+
+def colex(n, k):
+    """Todas as k-combinações de range(n) em ordem colex (linha i tem rank i), como int8."""
+    import numpy as np
+    atual = np.arange(n, dtype=np.int8)[:, None]
+    for kk in range(2, k + 1):
+        partes = []
+        for m in range(kk - 1, n):
+            prefixo = atual[:comb(m, kk - 1)]
+            partes.append(np.hstack([prefixo, np.full((len(prefixo), 1), m, dtype=np.int8)]))
+        atual = np.concatenate(partes) if partes else np.zeros((0, kk), dtype=np.int8)
+    return atual
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+cooccurrence.py
+Coocorrência de pares (e, opcionalmente, trios) e atrasos por dezena.
+
+Guarda, para o histórico processado até o concurso n-1:
+- `pares`: matriz 60x60 (uint32) com quantas vezes cada par saiu junto;
+- `trios`: contagem por trio (uint32), indexada pelo rank colex do trio
+  (C(60, 3) = 34.220 posições), só quando pedida;
+- `freq`, `primeiro`, `ultimo` e `maior_atraso` por dezena, de onde saem o
+  atraso atual (concursos desde a última aparição) e o intervalo médio.
+Todas as consultas são O(1). O estado é gravado em DATA_DIR (npz) junto com a
+assinatura dos concursos processados (nº de concursos + hash do conteúdo); quando
+o cache só ganhou concursos no fim — os n primeiros são exatamente os já
+processados —, `atualiza` processa apenas os novos em vez de reconstruir tudo.
+"""
+import hashlib
+import os
+from itertools import combinations
+
+import numpy as np
+
+from .combos import _BIN
+from .history import mascara
+from .sweep import matriz_sorteios
+
+VERSAO = 2
+NUM_TRIOS = _BIN[3][60]
+_BLOCO = 1 << 16
+# posições (dentro de um jogo de 6) dos 20 trios
+_TRIOS_6 = np.array(list(combinations(range(6), 3)), dtype=np.intp)
+_BIN_NP = [np.array(linha, dtype=np.int64) for linha in _BIN[:4]]
+
+
+def nome_arquivo(data_dir):
+    return os.path.join(str(data_dir), f'mega_coocorrencia_v{VERSAO}.npz')
+
+
+def rank_trio(a, b, c):
+    """Rank colex (0..34219) do trio {a, b, c}."""
+    a, b, c = sorted((a, b, c))
+    return _BIN[1][a - 1] + _BIN[2][b - 1] + _BIN[3][c - 1]
+
+
+def _hash_concursos(mascaras):
+    """Assinatura de uma sequência de concursos (bitmasks uint64, na ordem)."""
+    return hashlib.sha1(np.ascontiguousarray(mascaras, dtype='<u8').tobytes()).hexdigest()
+
+
+class Coocorrencia:
+    """Estatísticas de pares/trios/atrasos de um histórico, atualizáveis por anexação."""
+
+    def __init__(self, trios=False):
+        self.n = 0
+        self.pares = np.zeros((60, 60), dtype=np.uint32)
+        self.trios = np.zeros(NUM_TRIOS, dtype=np.uint32) if trios else None
+        self.freq = np.zeros(60, dtype=np.int64)
+        self.primeiro = np.full(60, -1, dtype=np.int64)
+        self.ultimo = np.full(60, -1, dtype=np.int64)
+        self.maior_atraso = np.zeros(60, dtype=np.int64)
+        self._assinatura = _hash_concursos(np.zeros(0, dtype=np.uint64))  # dos n concursos processados
+
+    # --- consultas O(1) ---
+
+    def par(self, a, b):
+        """Quantas vezes as dezenas `a` e `b` saíram no mesmo concurso."""
+        return int(self.pares[a - 1, b - 1])
+
+    def trio(self, a, b, c):
+        """Quantas vezes o trio saiu junto (requer `trios=True`)."""
+        if self.trios is None:
+            raise ValueError('Contagem de trios não foi calculada (use trios=True).')
+        return int(self.trios[rank_trio(a, b, c)])
+
+    def atraso(self, d):
+        """Concursos desde a última aparição de `d` (0 = saiu no último; n se nunca saiu)."""
+        return int(self.n - 1 - self.ultimo[d - 1])
+
+    def maior_atraso_de(self, d):
+        """Maior sequência de concursos sem `d`, incluindo o atraso atual."""
+        return max(int(self.maior_atraso[d - 1]), self.atraso(d))
+
+    def intervalo_medio(self, d):
+        """Intervalo médio (em concursos) entre aparições de `d`; None com menos de 2 aparições."""
+        f = int(self.freq[d - 1])
+        if f < 2:
+            return None
+        return (int(self.ultimo[d - 1]) - int(self.primeiro[d - 1])) / (f - 1)
+
+    def atrasos(self):
+        """Array (60,) com o atraso atual de cada dezena (índice d-1)."""
+        return self.n - 1 - self.ultimo
+
+    # --- atualização ---
+
+    def atualiza(self, concursos):
+        """Sincroniza com `concursos`. Se eles estendem o histórico já processado (os n
+        primeiros têm o mesmo hash), só os novos são somados; senão tudo é recalculado.
+        Retorna quantos foram processados."""
+        n = self.n
+        mascaras = np.fromiter((mascara(c) for c in concursos), dtype=np.uint64, count=len(concursos))
+        if len(concursos) < n or _hash_concursos(mascaras[:n]) != self._assinatura:
+            self.__init__(trios=self.trios is not None)
+            n = 0
+        novos = concursos[n:]
+        if not len(novos):
+            return 0
+        for ini in range(0, len(novos), _BLOCO):
+            self._soma(novos[ini:ini + _BLOCO], n + ini)
+        self.n = len(concursos)
+        self._assinatura = _hash_concursos(mascaras)
+        return len(novos)
+
+    def _soma(self, bloco, deslocamento):
+        X = matriz_sorteios(bloco)
+        Xf = X.astype(np.float64)
+        pares = Xf.T @ Xf
+        np.fill_diagonal(pares, 0)
+        self.pares += pares.astype(np.uint32)
+        if self.trios is not None:
+            seis = [sorted(c) for c in bloco if len(c) == 6 and len(set(c)) == 6]
+            if seis:
+                j = np.array(seis, dtype=np.int64)[:, _TRIOS_6].reshape(-1, 3) - 1
+                r = _BIN_NP[1][j[:, 0]] + _BIN_NP[2][j[:, 1]] + _BIN_NP[3][j[:, 2]]
+                self.trios += np.bincount(r, minlength=NUM_TRIOS).astype(np.uint32)
+        for d in range(60):
+            pos = np.flatnonzero(X[:, d]) + deslocamento
+            if not len(pos):
+                continue
+            # atrasos = concursos sem a dezena entre duas aparições (a primeira conta desde o início)
+            anteriores = np.concatenate(([self.ultimo[d]], pos[:-1]))
+            self.maior_atraso[d] = max(int(self.maior_atraso[d]), int((pos - anteriores - 1).max()))
+            if self.primeiro[d] < 0:
+                self.primeiro[d] = pos[0]
+            self.ultimo[d] = pos[-1]
+            self.freq[d] += len(pos)
+
+    # --- persistência ---
+
+    def salva(self, caminho):
+        tmp = caminho + '.tmp.npz'
+        campos = dict(n=self.n, pares=self.pares, freq=self.freq, primeiro=self.primeiro,
+                      ultimo=self.ultimo, maior_atraso=self.maior_atraso,
+                      assinatura=np.array(self._assinatura))
+        if self.trios is not None:
+            campos['trios'] = self.trios
+        np.savez(tmp, **campos)
+        os.replace(tmp, caminho)
+
+    @classmethod
+    def carrega(cls, caminho):
+        with np.load(caminho) as z:
+            obj = cls(trios='trios' in z.files)
+            obj.n = int(z['n'])
+            obj.pares = z['pares'].copy()
+            if obj.trios is not None:
+                obj.trios = z['trios'].copy()
+            obj.freq = z['freq'].copy()
+            obj.primeiro = z['primeiro'].copy()
+            obj.ultimo = z['ultimo'].copy()
+            obj.maior_atraso = z['maior_atraso'].copy()
+            obj._assinatura = str(z['assinatura'])
+        return obj
+
+
+def sincroniza(caminho, concursos, trios=False):
+    """Carrega o estado gravado em `caminho`, atualiza com `concursos` (incremental
+    quando possível) e regrava se algo mudou. Pedir `trios` sem tê-los gravados reconstrói."""
+    obj = None
+    if os.path.exists(caminho):
+        try:
+            obj = Coocorrencia.carrega(caminho)
+        except Exception:
+            obj = None
+    if obj is None or (trios and obj.trios is None):
+        obj = Coocorrencia(trios=trios)
+    if obj.atualiza(concursos) or not os.path.exists(caminho):
+        obj.salva(caminho)
+    return obj
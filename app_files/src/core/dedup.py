@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+dedup.py
+Registro persistente dos jogos de 6 dezenas já emitidos, para nunca repetir um
+jogo no mesmo lote nem entre execuções.
+
+Cada jogo é identificado pelo rank colex (`combos.rank`, < C(60, 6) = 50.063.860,
+cabe em uint32). Em disco:
+- `<base>.ranks`: ranks ordenados e únicos (uint32), reescrito só na compactação;
+- `<base>.log`: ranks acrescentados desde a última compactação (uint32, só append).
+Quando o log passa de `COMPACTA` entradas ele é fundido ao arquivo ordenado
+(tmp + os.replace) e zerado; um log que sobreviva a uma queda no meio da
+compactação só repete ranks já presentes, o que é inofensivo. Append e
+compactação rodam sob a trava de arquivo `<base>.lock` (`journal.trava`), para
+que ranks anexados por outro processo não se percam no truncamento.
+
+Na frente do arquivo fica um filtro de pertinência em memória: um bitmap de
+C(60, 6) bits (6,3 MB) com um bit por rank. Faz o papel de um filtro de Bloom
+com uma única função de hash injetora — sem falsos positivos e menor que um
+Bloom de 1% para dezenas de milhões de jogos —, então toda consulta custa O(1)
+qualquer que seja o tamanho do registro. Jogos com outra quantidade de dezenas
+não são registrados.
+"""
+import os
+
+import numpy as np
+
+from .combos import TOTAL, ranks
+from .filters import popcount_np
+from .journal import trava
+
+VERSAO = 1
+COMPACTA = 1 << 20
+
+
+def nome_base(data_dir):
+    return os.path.join(str(data_dir), f'mega_apostas_v{VERSAO}')
+
+
+def _le(caminho):
+    try:
+        return np.fromfile(caminho, dtype=np.uint32)
+    except (FileNotFoundError, OSError):
+        return np.zeros(0, dtype=np.uint32)
+
+
+def _seis(jogos):
+    """(ranks, válidos) das linhas de `jogos`; válidos = 6 dezenas distintas em 1..60."""
+    J = np.sort(np.asarray(jogos, dtype=np.int64).reshape(len(jogos), -1), axis=1)
+    if J.shape[1] != 6:
+        return np.zeros(len(J), dtype=np.uint64), np.zeros(len(J), dtype=bool)
+    validos = (J[:, 0] >= 1) & (J[:, -1] <= 60) & (np.diff(J, axis=1) > 0).all(axis=1)
+    return ranks(np.where(validos[:, None], J, np.arange(1, 7))), validos
+
+
+class RegistroApostas:
+    """Jogos já emitidos: `registra`/`registra_lote` marcam e dizem quais eram inéditos
+    (`ineditos_lote` só consulta); `salva` grava os novos no log (e compacta quando ele cresce)."""
+
+    def __init__(self, base):
+        self.base = base
+        self.caminho_ranks = base + '.ranks'
+        self.caminho_log = base + '.log'
+        self.caminho_lock = base + '.lock'
+        self._bits = None
+        self._n = 0
+        self._pendentes = []
+
+    def _carrega(self):
+        if self._bits is not None:
+            return
+        # múltiplo de 8 bytes para contar os bits como uint64
+        self._bits = np.zeros((TOTAL + 63) // 64 * 8, dtype=np.uint8)
+        r = np.concatenate([_le(self.caminho_ranks), _le(self.caminho_log)])
+        r = r[r < TOTAL]
+        self._marca(r)
+        self._n = int(popcount_np(self._bits.view(np.uint64)).sum())
+
+    def _marca(self, r):
+        r = np.asarray(r, dtype=np.uint64)
+        np.bitwise_or.at(self._bits, (r >> np.uint64(3)).astype(np.intp),
+                         np.left_shift(np.uint8(1), (r & np.uint64(7)).astype(np.uint8)))
+
+    def _contem_ranks(self, r):
+        r = np.asarray(r, dtype=np.uint64)
+        return ((self._bits[(r >> np.uint64(3)).astype(np.intp)] >> (r & np.uint64(7)).astype(np.uint8)) & 1) == 1
+
+    def __len__(self):
+        self._carrega()
+        return self._n + sum(len(p) for p in self._pendentes)
+
+    def contem_lote(self, jogos):
+        """Array bool (N,): True para os jogos já registrados."""
+        self._carrega()
+        r, validos = _seis(jogos)
+        return validos & self._contem_ranks(r)
+
+    def contem(self, jogo):
+        return bool(self.contem_lote([jogo])[0])
+
+    def ineditos_lote(self, jogos):
+        """Array bool (N,) com True para os jogos que `registra_lote` aceitaria, sem marcar
+        nada (a primeira ocorrência de um jogo repetido dentro do lote conta como inédita)."""
+        return self._ineditos(jogos)[0]
+
+    def _ineditos(self, jogos):
+        # (inéditos, ranks, a marcar)
+        self._carrega()
+        if not len(jogos):
+            vazio = np.zeros(0, dtype=bool)
+            return vazio, np.zeros(0, dtype=np.uint64), vazio
+        r, validos = _seis(jogos)
+        novo = ~self._contem_ranks(r)
+        primeira = np.zeros(len(r), dtype=bool)
+        idx = np.flatnonzero(validos)
+        primeira[idx[np.unique(r[idx], return_index=True)[1]]] = True
+        novo &= primeira | ~validos
+        return novo | ~validos, r, novo & validos
+
+    def registra_lote(self, jogos):
+        """Marca os jogos e retorna array bool (N,) com True para os inéditos (a primeira
+        ocorrência de um jogo repetido dentro do lote conta como inédita, as demais não).
+        Jogos que não têm 6 dezenas distintas passam sempre, sem registro."""
+        ineditos, r, marcar = self._ineditos(jogos)
+        marcar = r[marcar]
+        if len(marcar):
+            self._marca(marcar)
+            self._pendentes.append(marcar.astype(np.uint32))
+        return ineditos
+
+    def registra(self, jogo):
+        return bool(self.registra_lote([jogo])[0])
+
+    def salva(self):
+        """Acrescenta os ranks novos ao log; compacta se ele passou de `COMPACTA` entradas."""
+        if not self._pendentes:
+            return
+        novos = np.concatenate(self._pendentes)
+        with trava(self.caminho_lock):
+            with open(self.caminho_log, 'ab') as f:
+                f.write(novos.tobytes())
+            self._n += len(novos)
+            self._pendentes = []
+            if os.path.getsize(self.caminho_log) // 4 >= COMPACTA:
+                self._compacta()
+
+    def compacta(self):
+        """Funde o log ao arquivo ordenado de ranks e zera o log."""
+        self.salva()
+        with trava(self.caminho_lock):
+            self._compacta()
+
+    def _compacta(self):
+        # sob a trava: nenhum outro processo anexa ao log entre a leitura e o truncamento
+        log = _le(self.caminho_log)
+        if not len(log):
+            return
+        todos = np.union1d(_le(self.caminho_ranks), log).astype(np.uint32)
+        tmp = self.caminho_ranks + '.tmp'
+        todos.tofile(tmp)
+        os.replace(tmp, self.caminho_ranks)
+        open(self.caminho_log, 'wb').close()
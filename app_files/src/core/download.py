@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+download.py
+Download condicional e em fluxo do histórico oficial (ZIP da Caixa).
+
+O ZIP é copiado em blocos para um arquivo temporário (em memória até 8 MB) e o
+CSV interno é decodificado linha a linha. ETag/Last-Modified da última resposta
+ficam em um arquivo JSON ao lado do cache para que a próxima busca envie
+If-None-Match/If-Modified-Since: quando nada mudou o servidor responde 304 e
+nenhum corpo é transferido.
+"""
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+BLOCO = 64 * 1024
+
+
+class Resposta:
+    """Corpo baixado (arquivo temporário posicionado no início) + validadores HTTP."""
+
+    def __init__(self, arquivo, etag=None, last_modified=None):
+        self.arquivo = arquivo
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.arquivo.close()
+
+
+def le_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def salva_meta(meta_path, url, resposta):
+    meta = {'url': url, 'etag': resposta.etag, 'last_modified': resposta.last_modified}
+    with open(meta_path, 'w', encoding='utf8') as f:
+        json.dump(meta, f)
+
+
+def busca(url, meta_path, condicional=True, timeout=20):
+    """GET (condicional) de `url`. Retorna `Resposta` ou None quando o servidor responde 304."""
+    req = Request(url)
+    if condicional:
+        meta = le_meta(meta_path)
+        if meta.get('url') == url:
+            if meta.get('etag'):
+                req.add_header('If-None-Match', meta['etag'])
+            if meta.get('last_modified'):
+                req.add_header('If-Modified-Since', meta['last_modified'])
+    try:
+        resp = urlopen(req, timeout=timeout)
+    except HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+    with resp:
+        tmp = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        shutil.copyfileobj(resp, tmp, BLOCO)
+        tmp.seek(0)
+        return Resposta(tmp, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+
+
+def iter_concursos(arquivo):
+    """Decodifica o CSV de dentro do ZIP incrementalmente.
+    Gera (numero ou None, data, dezenas ordenadas) para cada linha válida."""
+    with zipfile.ZipFile(arquivo) as z:
+        csv_nome = [n for n in z.namelist() if n.upper().endswith('.CSV')][0]
+        with z.open(csv_nome) as bruto:
+            linhas = io.TextIOWrapper(bruto, encoding='ISO-8859-1', newline='')
+            next(linhas, None)  # cabeçalho
+            for ln in linhas:
+                r = ln.strip().split(';')
+                if len(r) < 8:
+                    continue
+                try:
+                    dezenas = sorted(map(int, r[2:8]))
+                except ValueError:
+                    continue
+                yield (int(r[0]) if r[0].isdigit() else None), r[1], dezenas
@@ -1,4 +1,3 @@
-```python
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
@@ -8,42 +7,302 @@ Uso:
   python mega_da_virada.py 50 --pdf
   from mega_da_virada import gerar_jogos, salva_pdf, carrega_concursos
 """
-import random, zipfile, io, json, os, datetime, csv, argparse, sys, time, socket
-from urllib.request import urlopen
-from urllib.error import URLError
+import time
+_T0 = time.perf_counter()  # origem de --profile-startup
+import random, json, os, sys, importlib, threading, contextlib
+# csv, argparse, socket e urllib são importados só nas funções que os usam (partida rápida)
 
+from itertools import islice
 from pathlib import Path
 
 URL_HIST = "https://www1.caixa.gov.br/loterias/_arquivos/loterias/D_megase.zip"
-DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+# CARTELA_DATA_DIR permite apontar o cache para outro diretório (benchmarks, testes)
+DATA_DIR = Path(os.environ.get('CARTELA_DATA_DIR') or Path(__file__).resolve().parent.parent.parent / "data")
 CACHE = str(DATA_DIR / "mega_cache.json")
+CACHE_BIN = str(DATA_DIR / "mega_cache.bin")
+CACHE_HTTP = str(DATA_DIR / "mega_cache.http.json")
+# regras de filtros_ok (opcional; ver src/core/filters.py)
+FILTROS = str(DATA_DIR / "filtros.json")
 
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+def _configura_log():
+    """Formato de log da CLI/serviço; chamado em `main()`, não na importação, para não
+    mexer no logging de quem só importa o motor (basicConfig não sobrescreve config existente)."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def baixa_hist():
+_DATA_DIR_OK = False
+
+def _garante_data_dir():
+    """Cria DATA_DIR na primeira gravação (e não mais como efeito da importação)."""
+    global _DATA_DIR_OK
+    if not _DATA_DIR_OK:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        _DATA_DIR_OK = True
+
+# (módulo, segundos) da primeira carga de cada módulo de src/core, para --profile-startup
+_PERFIL_IMPORTS = []
+
+def _core(nome):
+    """Importa um módulo irmão de `src/core` (ex.: 'batch') sob demanda.
+    Funciona tanto importado como `src.core.engine` quanto executado como script."""
+    if __package__:
+        modulo = f'{__package__}.{nome}'
+    else:
+        raiz = str(Path(__file__).resolve().parent.parent.parent)
+        if raiz not in sys.path:
+            sys.path.insert(0, raiz)
+        modulo = f'src.core.{nome}'
+    if modulo in sys.modules:
+        return sys.modules[modulo]
+    t = time.perf_counter()
+    m = importlib.import_module(modulo)
+    _PERFIL_IMPORTS.append((modulo, time.perf_counter() - t))
+    return m
+
+# Instrumentação opcional (`stats.Estatisticas`). None = desligada: os laços quentes
+# só testam `STATS is not None` e as medições de tempo viram um nullcontext.
+STATS = None
+_SEM_MEDICAO = contextlib.nullcontext()
+
+def ativa_estatisticas():
+    """Liga a instrumentação e retorna o `stats.Estatisticas` que passa a acumular
+    rejeições por filtro, candidatos por jogo e tempos por etapa.
+    Em modo `workers` os contadores de filtro só cobrem o processo atual."""
+    global STATS
+    STATS = _core('stats').Estatisticas()
+    return STATS
+
+def desativa_estatisticas():
+    """Desliga a instrumentação; retorna o objeto que estava ativo (ou None)."""
+    global STATS
+    st, STATS = STATS, None
+    return st
+
+# Registro persistente de jogos emitidos (`dedup.RegistroApostas`). None = desligado.
+DEDUP = None
+
+def ativa_dedup():
+    """Liga o registro de apostas em DATA_DIR: geração, `recomendar_numeros` e
+    `monta_carteira` passam a descartar jogos de 6 dezenas já emitidos e registram os
+    que entregam; os escritores de CSV só registram o que gravam, sem filtrar.
+    Requer numpy. Retorna o registro."""
+    global DEDUP
+    _garante_data_dir()
+    DEDUP = _core('dedup').RegistroApostas(_core('dedup').nome_base(DATA_DIR))
+    return DEDUP
+
+def desativa_dedup():
+    """Grava o que estiver pendente e desliga o registro; retorna-o (ou None)."""
+    global DEDUP
+    registro, DEDUP = DEDUP, None
+    if registro is not None:
+        registro.salva()
+    return registro
+
+def _mede(etapa):
+    return _SEM_MEDICAO if STATS is None else STATS.mede(etapa)
+
+def _medidor():
+    return None if STATS is None else STATS.mede
+
+_ARMAZEM = None
+
+def armazem():
+    """Armazenamento do histórico (`journal.Armazem`): snapshot mega_cache.json trocado
+    atomicamente, journal de concursos novos sob trava de arquivo e versões anteriores
+    em DATA_DIR/historico (veja `versoes()`/`restaura(versao)`)."""
+    global _ARMAZEM
+    if _ARMAZEM is None or _ARMAZEM.data_dir != str(DATA_DIR):
+        _ARMAZEM = _core('journal').Armazem(DATA_DIR)
+    return _ARMAZEM
+
+def _grava_bin(concursos, numeros=None, datas=None):
+    try:
+        cache_bin = _core('cache_bin')
+    except ImportError:
+        return
+    try:
+        cache_bin.grava(CACHE_BIN, cache_bin.monta_registros(concursos, numeros, datas))
+    except (ValueError, OverflowError, OSError) as e:
+        # sem cache binário válido, carrega_concursos volta a ler o JSON
+        logging.warning(f"Cache binário não gravado: {e}")
+        try:
+            os.remove(CACHE_BIN)
+        except OSError:
+            pass
+
+def _grava_cache(concursos, numeros=None, datas=None):
+    """Substitui o histórico: novo snapshot de mega_cache.json (a versão anterior fica em
+    DATA_DIR/historico) e, com numpy, o cache binário mapeável.
+    `numeros` (nº do concurso) e `datas` são listas paralelas opcionais."""
+    _garante_data_dir()
+    armazem().grava(concursos, apos=lambda: _grava_bin(concursos, numeros, datas))
+    if ESTADO is not None:
+        ESTADO.invalidar()
+
+def _carrega_bin():
+    """Abre o cache binário por memory-map; (re)gera a partir do histórico (snapshot +
+    journal) quando um dos dois for mais novo. Retorna None quando não há numpy ou cache disponível."""
+    try:
+        cache_bin = _core('cache_bin')
+    except ImportError:
+        return None
+    try:
+        fontes = [os.stat(p).st_mtime_ns for p in armazem().arquivos() if os.path.isfile(p)]
+        if os.path.isfile(CACHE_BIN) and os.stat(CACHE_BIN).st_mtime_ns >= max(fontes, default=0):
+            return cache_bin.abre(CACHE_BIN)
+        if os.path.isfile(CACHE):
+            lido = armazem().le()
+            return cache_bin.sincroniza(CACHE_BIN, lido.concursos, lido.numeros, lido.datas)
+    except Exception as e:
+        logging.warning(f"Cache binário indisponível: {e}")
+    return None
+
+ESTADO = None
+_ESTADO_LOCK = threading.Lock()
+
+def estado():
+    """Estado do histórico compartilhado pelo processo (`state.EstadoHistorico`).
+    Concursos, frequência, pesos e scores ficam memoizados até o cache mudar
+    (mtime/tamanho de mega_cache.json/.journal) ou um loader gravar um novo cache. O .bin fica
+    de fora: é derivado dos dois e regerado durante a própria carga."""
+    global ESTADO
+    with _ESTADO_LOCK:
+        if ESTADO is None:
+            ESTADO = _core('state').EstadoHistorico(lambda: carrega_concursos(), lambda: armazem().arquivos())
+        return ESTADO
+
+_PIPELINE = None
+
+def pipeline_filtros():
+    """Regras de `filtros_ok` compiladas (`filters.Pipeline`): as de DATA_DIR/filtros.json
+    quando o arquivo existe, senão as padrão. Troque com `configura_filtros`."""
+    global _PIPELINE
+    if _PIPELINE is None:
+        _PIPELINE = _core('filters').Pipeline(FILTROS if os.path.isfile(FILTROS) else None)
+    return _PIPELINE
+
+def configura_filtros(origem=None):
+    """Troca as regras de `filtros_ok` por `origem` (dict ou caminho de JSON; None = padrão)."""
+    global _PIPELINE
+    _PIPELINE = _core('filters').Pipeline(origem)
+    return _PIPELINE
+
+_TABELA = None
+
+def tabela_jogos():
+    """Tabela de jogos que passam nos filtros estáticos (`tabela.TabelaJogos`).
+    Construída uma única vez por conjunto de regras (~C(60,6) combinações) e gravada
+    em DATA_DIR. Requer numpy."""
+    global _TABELA
+    pipeline = pipeline_filtros()
+    tabela = _core('tabela')
+    _garante_data_dir()
+    with _ESTADO_LOCK:
+        if _TABELA is None or _TABELA.caminho != tabela.nome_arquivo(DATA_DIR, pipeline):
+            _TABELA = tabela.TabelaJogos(DATA_DIR, pipeline)
+        return _TABELA
+
+def _tabela_ou_none():
+    try:
+        return tabela_jogos()
+    except ImportError:
+        logging.warning('numpy não encontrado; usando gerador sequencial.')
+        return None
+
+def _iter_tabela(tb, quantidade, concursos, pesos, seed=None, bloco=10_000):
+    """Sorteio sem rejeição pela tabela, em blocos de `bloco` jogos."""
+    import numpy as np
+    if not concursos:
+        pesos = {d: 1.0 for d in range(1, 61)}
+    if not pipeline_filtros().usa_historico:
+        concursos = ()
+    rng = np.random.default_rng(seed)
+    for ini in range(0, quantidade, bloco):
+        n = min(bloco, quantidade - ini)
+        if STATS is not None:
+            STATS.avalia_lote(n, {})  # sem rejeição: 1 candidato por jogo
+        yield from tb.sorteia(n, pesos, concursos, rng).tolist()
+
+def carrega_array():
+    """Histórico como array estruturado (concurso, data, dezenas) mapeado do cache binário,
+    sem cópia. Requer numpy; baixa o histórico se ainda não houver cache."""
+    regs = _carrega_bin()
+    if regs is None:
+        baixa_hist()
+        regs = _carrega_bin()
+    return regs
+
+def _anexa_cache(novos, numeros, datas):
+    """Acrescenta concursos ao journal do histórico e ao fim do cache binário, sem
+    regravar o snapshot (o journal é compactado de tempos em tempos)."""
+    def anexa_bin(n0):
+        try:
+            cache_bin = _core('cache_bin')
+        except ImportError:
+            return
+        try:
+            if os.path.isfile(CACHE_BIN) and len(cache_bin.abre(CACHE_BIN)) == n0:
+                cache_bin.anexa(CACHE_BIN, cache_bin.monta_registros(novos, numeros, datas))
+                return
+        except (ValueError, OSError):
+            pass
+        # cache binário defasado (outro processo gravou sem numpy): é regerado na próxima leitura
+        try:
+            os.remove(CACHE_BIN)
+        except OSError:
+            pass
+    armazem().anexa(novos, numeros, datas, apos=anexa_bin)
+    if ESTADO is not None:
+        ESTADO.invalidar()
+
+def _ultimo_concurso():
+    """Maior nº de concurso registrado no cache binário (None se desconhecido)."""
+    regs = _carrega_bin()
+    if regs is None or not len(regs):
+        return None
+    ultimo = int(regs['concurso'].max())
+    return ultimo or None
+
+def baixa_hist(incremental=True):
+    """Baixa o histórico da Caixa e atualiza o cache.
+    Com `incremental` e cache existente, a requisição é condicional (ETag/If-Modified-Since):
+    se nada mudou custa um único 304; se mudou, só os concursos novos são anexados ao cache."""
+    import socket
+    from urllib.error import URLError
     logging.info("Baixando histórico da Caixa...")
+    _garante_data_dir()
+    download = _core('download')
     last_exc = None
     for attempt in range(1, 4):
         try:
-            data = urlopen(URL_HIST, timeout=20).read()
-            z = zipfile.ZipFile(io.BytesIO(data))
-            csv_nome = [n for n in z.namelist() if n.upper().endswith('.CSV')][0]
-            rows = [ln.decode('ISO-8859-1').strip().split(';') for ln in z.open(csv_nome).readlines()]
-            concursos = []
-            for r in rows[1:]:
-                if len(r) >= 8:
-                    try:
-                        concursos.append(sorted(map(int, r[2:8])))
-                    except ValueError:
+            atual = _le_cache() if incremental else None
+            resposta = download.busca(URL_HIST, CACHE_HTTP, condicional=atual is not None, timeout=20)
+            if resposta is None:
+                logging.info(f"Histórico sem alterações ({len(atual)} concursos).")
+                return atual
+            ultimo = _ultimo_concurso() if atual is not None else None
+            concursos, numeros, datas = [], [], []
+            with resposta:
+                for numero, data, dezenas in download.iter_concursos(resposta.arquivo):
+                    if ultimo is not None and (numero is None or numero <= ultimo):
                         continue
-            with open(CACHE, 'w', encoding='utf8') as f:
-                json.dump(concursos, f)
-            logging.info(f"Histórico salvo ({len(concursos)} concursos).")
-            return concursos
+                    concursos.append(dezenas)
+                    numeros.append(numero)
+                    datas.append(data)
+            if ultimo is not None:
+                if concursos:
+                    _anexa_cache(concursos, numeros, datas)
+                    atual.extend(concursos)
+                logging.info(f"Histórico atualizado (+{len(concursos)} concursos, total {len(atual)}).")
+                resultado = atual
+            else:
+                _grava_cache(concursos, numeros, datas)
+                logging.info(f"Histórico salvo ({len(concursos)} concursos).")
+                resultado = _core('history').Concursos(concursos)
+            download.salva_meta(CACHE_HTTP, URL_HIST, resposta)
+            return resultado
         except (URLError, socket.gaierror) as e:
             last_exc = e
             logging.warning(f"Tentativa {attempt}/3 falhou: {e}")
@@ -59,13 +318,34 @@ def baixa_hist():
     return []
 
 def carrega_concursos():
+    """Lê o histórico do cache (ou baixa da Caixa).
+    Retorna `history.Concursos`: uma lista de concursos com índice de pertinência
+    (`concursos.indice`) construído uma única vez na carga.
+    As dezenas vêm do cache binário (mega_cache.bin) quando o numpy já está carregado,
+    senão do JSON; de um jeito ou de outro o resultado são listas Python em memória.
+    Para ler o histórico mapeado do disco, sem cópia, use `carrega_array`."""
+    with _mede('carrega_concursos'):
+        concursos = _le_cache()
+        if concursos is None:
+            return baixa_hist()
+        return concursos
+
+def _le_cache():
+    """Lê o cache local sem baixar nada; None se ausente ou ilegível.
+    O JSON é a fonte de verdade: o cache binário só é usado quando o numpy já foi
+    carregado (importá-lo só para ler alguns milhares de concursos custa mais que o JSON),
+    e mesmo assim as dezenas são copiadas para listas (`Concursos` é uma lista); o acesso
+    sem cópia ao memory-map é o de `carrega_array`."""
+    if 'numpy' in sys.modules or not os.path.isfile(CACHE):
+        regs = _carrega_bin()
+        if regs is not None:
+            return _core('history').Concursos(regs['dezenas'].tolist())
     if os.path.isfile(CACHE):
         try:
-            with open(CACHE, encoding='utf8') as f:
-                return json.load(f)
+            return _core('history').Concursos(armazem().le().concursos)
         except Exception:
-            return baixa_hist()
-    return baixa_hist()
+            return None
+    return None
 
 def frequencia(concursos):
     freq = {d:0 for d in range(1,61)}
@@ -75,11 +355,13 @@ def frequencia(concursos):
     return freq
 
 
-def pontuar_dezenas(concursos):
+def pontuar_dezenas(concursos, freq=None):
     """Calcula um score simples por dezena baseado em frequência histórica.
     Retorna dict {dezena: score} com score normalizado entre 0 e 1.
+    `freq` (de `frequencia`) pode ser passado para evitar recálculo.
     """
-    freq = frequencia(concursos)
+    if freq is None:
+        freq = frequencia(concursos)
     maxf = max(freq.values()) if freq else 1
     scores = {d: (freq[d] / maxf) for d in range(1, 61)}
     return scores
@@ -95,15 +377,17 @@ def top_dezenas(n=10):
     return ordered[:n]
 
 
-def combined_scores(concursos, recent_n=100, alpha=0.6):
+def combined_scores(concursos, recent_n=100, alpha=0.6, freq=None):
     """Combina frequência histórica e indicador de recência.
     - `alpha` pondera frequência (0..1); recência recebe 1-alpha.
     - `recent_n` define quantos concursos recentes considerar para o componente de recência.
     - Para recência suportamos `decay` linear (padrão) ou `exp` (exponencial).
+    - `freq` (de `frequencia`) pode ser passado para evitar recálculo.
     Retorna dict {dezena: score} normalizado entre 0 e 1.
     """
     # frequência geral (normalizada)
-    freq = frequencia(concursos)
+    if freq is None:
+        freq = frequencia(concursos)
     maxf = max(freq.values()) if freq else 1
     freq_norm = {d: (freq[d] / maxf) for d in range(1, 61)}
 
@@ -138,25 +422,68 @@ def combined_scores(concursos, recent_n=100, alpha=0.6):
 def top_dezenas(n=10, use_combined=True):
     """Retorna lista dos N pares (dezena, score) ordenados por score desc.
     Se `use_combined` True, usa `combined_scores` (frequência + recência).
+    Scores memoizados em `estado()` até o histórico mudar.
     """
-    concursos = carrega_concursos()
-    if use_combined:
-        try:
-            scores = combined_scores(concursos)
-        except Exception:
-            scores = pontuar_dezenas(concursos)
-    else:
-        scores = pontuar_dezenas(concursos)
-    ordered = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
-    return ordered[:n]
+    def calcula(concursos, freq):
+        if use_combined:
+            try:
+                scores = combined_scores(concursos, freq=freq)
+            except Exception:
+                scores = pontuar_dezenas(concursos, freq)
+        else:
+            scores = pontuar_dezenas(concursos, freq)
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+    with _mede('pontuacao'):
+        return estado().derivado(('top', use_combined), calcula)[:n]
 
 
 def top_dezenas_params(n=10, recent_n=100, alpha=0.6, decay='linear', decay_lambda=0.05):
     """Retorna top N dezenas usando parâmetros: recent_n, alpha, decay e decay_lambda.
     - decay: 'linear' ou 'exp'
     - decay_lambda: taxa para exponencial
+    Resultado memoizado por parâmetros em `estado()` até o histórico mudar.
     """
-    concursos = carrega_concursos()
+    chave = ('params', recent_n, alpha, decay, decay_lambda)
+    with _mede('pontuacao'):
+        return estado().derivado(chave, lambda c, f: _ordena_params(c, f, recent_n, alpha, decay, decay_lambda))[:n]
+
+
+def varredura_params(recent_n=(100,), alpha=(0.6,), decay=('linear',), decay_lambda=(0.05,), n=10):
+    """Avalia `top_dezenas_params` para todas as combinações das grades de uma vez
+    (`sweep.varre`: matriz one-hot + somas de prefixo/descontadas, requer numpy).
+    Retorna lista de dicts {recent_n, alpha, decay, decay_lambda, ranking}; em
+    decay='linear' cada (recent_n, alpha) aparece uma vez, com decay_lambda=None."""
+    try:
+        sweep = _core('sweep')
+    except ImportError:
+        logging.warning('numpy não encontrado; avaliando a grade ponto a ponto.')
+        tabela = []
+        for dk in dict.fromkeys(decay):
+            for r in recent_n:
+                for lam in (decay_lambda if dk == 'exp' else (None,)):
+                    for a in alpha:
+                        ranking = top_dezenas_params(60, r, a, dk, 0.05 if lam is None else lam)
+                        tabela.append({'recent_n': r, 'alpha': a, 'decay': dk, 'decay_lambda': lam,
+                                       'ranking': ranking[:n] if n is not None else ranking})
+        return tabela
+    with _mede('pontuacao'):
+        X = estado().derivado('matriz', lambda c, f: sweep.matriz_sorteios(c))
+        return sweep.varre(estado().concursos(), recent_n, alpha, decay, decay_lambda,
+                           n=n, freq=estado().frequencia(), X=X)
+
+
+def backtest(estrategias=None, k=6, inicio=100, workers=None, seed=0):
+    """Backtest walk-forward (`backtest.backtest`) das estratégias sobre o histórico atual:
+    cada concurso é previsto só com os anteriores. `estrategias`: especificações como
+    'combinado:recent_n=50,decay=exp' (padrão: `backtest.PADRAO`). Requer numpy."""
+    bt = _core('backtest')
+    X = estado().derivado('matriz', lambda c, f: _core('sweep').matriz_sorteios(c))
+    return bt.backtest(estado().concursos(), estrategias or bt.PADRAO, k=k, inicio=inicio,
+                       workers=workers, seed=seed, X=X, pipeline=pipeline_filtros())
+
+
+def _ordena_params(concursos, freq, recent_n, alpha, decay, decay_lambda):
+    """Todas as 60 dezenas ordenadas por score para os parâmetros de `top_dezenas_params`."""
     try:
         if decay == 'exp':
             # construir recency weights exponenciais manualmente
@@ -172,7 +499,6 @@ def top_dezenas_params(n=10, recent_n=100, alpha=0.6, decay='linear', decay_lamb
                         raw[d] += weight
             max_raw = max(raw.values()) if raw else 1
             rec_weight = {d: (raw[d] / max_raw) for d in range(1, 61)}
-            freq = frequencia(concursos)
             maxf = max(freq.values()) if freq else 1
             freq_norm = {d: (freq[d] / maxf) for d in range(1, 61)}
             scores = {d: alpha * freq_norm.get(d, 0.0) + (1.0 - alpha) * rec_weight.get(d, 0.0) for d in range(1,61)}
@@ -184,11 +510,20 @@ def top_dezenas_params(n=10, recent_n=100, alpha=0.6, decay='linear', decay_lamb
                 for d in scores:
                     scores[d] = scores[d] / mx
         else:
-            scores = combined_scores(concursos, recent_n=recent_n, alpha=alpha)
+            scores = combined_scores(concursos, recent_n=recent_n, alpha=alpha, freq=freq)
     except Exception:
-        scores = pontuar_dezenas(concursos)
-    ordered = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
-    return ordered[:n]
+        scores = pontuar_dezenas(concursos, freq)
+    return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+
+
+def coocorrencia(trios=False):
+    """Coocorrência de pares (e trios, se pedido) e atrasos por dezena do histórico atual
+    (`cooccurrence.Coocorrencia`, consultas O(1): `par(a, b)`, `trio(a, b, c)`, `atraso(d)`...).
+    Persistida em DATA_DIR e atualizada só com os concursos novos quando o cache cresce. Requer numpy."""
+    cooc = _core('cooccurrence')
+    _garante_data_dir()
+    return estado().derivado(('coocorrencia', trios),
+                             lambda c, f: cooc.sincroniza(cooc.nome_arquivo(DATA_DIR), c, trios))
 
 
 def frequencies(list_of_lists, max_num=60):
@@ -200,57 +535,152 @@ def frequencies(list_of_lists, max_num=60):
                 freq[n] += 1
     return freq
 
-def pesos_invertidos(concursos):
-    freq = frequencia(concursos)
+def pesos_invertidos(concursos, freq=None):
+    if freq is None:
+        freq = frequencia(concursos)
     total = sum(freq.values()) or 1
     return {d: (total - f)/total for d,f in freq.items()}
 
 def filtros_ok(jogo, concursos):
-    j = sorted(jogo)
-    if sum(1 for d in j if d % 2 == 0) >= 4: return False
-    for a,b,c in zip(j, j[1:], j[2:]):
-        if b == a+1 and c == b+1: return False
-    finais = [d % 10 for d in j]
-    if max(finais.count(f) for f in set(finais)) > 2: return False
-    if len(set(d//10 for d in j)) < 4: return False
-    if not (100 <= sum(j) <= 250): return False
-    primos = {2,3,5,7,11,13,17,19,23,29,31,37,41,43,47,53,59}
-    if sum(1 for d in j if d in primos) > 4: return False
-    if j in concursos: return False
-    return True
-
-def gerar_jogos(quantidade=20, forcar_filtros=False):
-    concursos = carrega_concursos()
-    pesos = pesos_invertidos(concursos)
-    jogos = []
-    while len(jogos) < quantidade:
-        if concursos:
-            j = sorted(random.choices(range(1,61), weights=[pesos[d] for d in range(1,61)], k=6))
+    """True se `jogo` passa em todas as regras de `pipeline_filtros()`."""
+    motivo = (_PIPELINE or pipeline_filtros()).motivo(jogo, concursos)
+    if STATS is not None:
+        STATS.avalia(motivo)
+    return motivo is None
+
+def motivo_rejeicao(jogo, concursos):
+    """Nome da primeira regra de `filtros_ok` que rejeita `jogo`, ou None se aprovado.
+    As regras são reordenadas pela taxa de rejeição observada, então o nome
+    reportado pode mudar ao longo da execução; a decisão não."""
+    return (_PIPELINE or pipeline_filtros()).motivo(jogo, concursos)
+
+def _amostrador(concursos):
+    """Amostrador sem reposição (`sampler.AmostradorPonderado`) dos pesos invertidos,
+    memoizado em `estado()`; uniforme quando não há histórico."""
+    if not concursos:
+        return _core('sampler').AmostradorPonderado()
+    return estado().derivado('amostrador', lambda c, f: _core('sampler').AmostradorPonderado(pesos_invertidos(c, f)))
+
+def gerar_jogos(quantidade=20, forcar_filtros=False, lote=None, seed=None, workers=None, tabela=False):
+    """Gera `quantidade` jogos de 6 dezenas aprovados por `filtros_ok`.
+    Com `lote` (ex.: 50000) usa o motor vetorizado de `batch.py`, que sorteia
+    blocos de candidatos e filtra com máscaras numpy.
+    Com `workers` (>= 1) divide o trabalho em shards num pool de processos
+    (`parallel.py`); com a mesma `seed` a saída é igual para qualquer nº de workers.
+    Com `tabela` sorteia direto da tabela pré-computada de jogos válidos
+    (`tabela.py`), sem laço de rejeição.
+    `seed` vale para esses três modos. Para lotes enormes prefira `iter_jogos`."""
+    return list(iter_jogos(quantidade, forcar_filtros, lote=lote, seed=seed, workers=workers, tabela=tabela))
+
+def _semente(seed, rodada):
+    """Semente da rodada `rodada` (> 0) de reposição de jogos repetidos."""
+    return seed if seed is None or rodada == 0 else seed * 1_000_003 + rodada
+
+def iter_jogos(quantidade=20, forcar_filtros=False, lote=None, seed=None, workers=None, tabela=False, bloco=10_000):
+    """Versão geradora de `gerar_jogos` (mesmos modos e parâmetros): entrega os jogos
+    à medida que são gerados, sem montar a lista completa. `bloco` limita quantos
+    jogos cada modo vetorizado produz por vez.
+    Com o registro de apostas ligado (`ativa_dedup`), jogos já emitidos (neste lote ou
+    em execuções anteriores) são descartados e repostos por novas rodadas do gerador;
+    só os jogos de fato entregues são registrados."""
+    if DEDUP is None:
+        yield from _iter_jogos(quantidade, forcar_filtros, lote, seed, workers, tabela, bloco)
+        return
+    registro = DEDUP
+    falta, rodada, vazias = quantidade, 0, 0
+    try:
+        while falta > 0:
+            jogos = _iter_jogos(falta, forcar_filtros, lote, _semente(seed, rodada), workers, tabela, bloco)
+            novos = 0
+            while True:
+                parte = list(islice(jogos, bloco))
+                if not parte:
+                    break
+                entregues = []
+                try:
+                    for j, inedito in zip(parte, registro.ineditos_lote(parte)):
+                        if inedito:
+                            entregues.append(j)
+                            yield j
+                finally:
+                    # só o que chegou ao consumidor: quem para no meio do bloco não queima o resto
+                    registro.registra_lote(entregues)
+                novos += len(entregues)
+            falta -= novos
+            rodada += 1
+            vazias = vazias + 1 if not novos else 0
+            if vazias >= 100:
+                logging.warning(f'Registro de apostas: sem jogos inéditos após {rodada} rodadas; faltaram {falta}.')
+                break
+    finally:
+        registro.salva()
+
+def _iter_jogos(quantidade, forcar_filtros, lote, seed, workers, tabela, bloco):
+    concursos = estado().concursos()
+    with _mede('pontuacao'):
+        pesos = estado().derivado('pesos', pesos_invertidos)
+    if tabela and not forcar_filtros:
+        tb = _tabela_ou_none()
+        if tb is not None:
+            yield from _iter_tabela(tb, quantidade, concursos, pesos, seed, bloco)
+            return
+    if workers:
+        yield from _core('parallel').iter_jogos_paralelo(quantidade, concursos, pesos, forcar_filtros,
+                                                         workers=workers, seed=seed, lote=lote,
+                                                         pipeline=pipeline_filtros())
+        return
+    if lote:
+        try:
+            batch = _core('batch')
+        except ImportError:
+            logging.warning('numpy não encontrado; usando gerador sequencial.')
         else:
-            j = sorted(random.sample(range(1,61), 6))
+            for b in batch.iter_blocos_lote(quantidade, concursos, pesos, forcar_filtros, lote=min(lote, bloco), seed=seed,
+                                            stats=STATS, pipeline=pipeline_filtros()):
+                yield from b.tolist()
+            return
+    amostrador = _amostrador(concursos)
+    n = 0
+    while n < quantidade:
+        j = amostrador.sorteia(6)
         if forcar_filtros or filtros_ok(j, concursos):
-            jogos.append(j)
-    return jogos
+            n += 1
+            yield j
 
-def recomendar_numeros(qtd=6, seed=None, forcar_filtros=False):
+def recomendar_numeros(qtd=6, seed=None, forcar_filtros=False, tabela=False):
     """Gera uma recomendação única de `qtd` dezenas usando os pesos do histórico.
-    Retorna lista de inteiros ordenada."""
+    Com `tabela` (e qtd=6) sorteia da tabela de jogos válidos, sem tentativas.
+    Com o registro de apostas ligado (`ativa_dedup`), um jogo de 6 dezenas já emitido
+    é sorteado de novo. Retorna lista de inteiros ordenada."""
+    if DEDUP is None or qtd != 6:
+        return _recomenda(qtd, seed, forcar_filtros, tabela)
+    try:
+        for rodada in range(1000):
+            jogo = _recomenda(qtd, _semente(seed, rodada), forcar_filtros, tabela)
+            if DEDUP.registra(jogo):
+                return jogo
+        logging.warning('Registro de apostas: nenhuma recomendação inédita encontrada.')
+        return jogo
+    finally:
+        DEDUP.salva()
+
+def _recomenda(qtd, seed, forcar_filtros, tabela):
     if seed is not None:
         random.seed(seed)
-    concursos = carrega_concursos()
-    pesos = pesos_invertidos(concursos)
-    if concursos:
-        jogo = sorted(random.choices(range(1,61), weights=[pesos[d] for d in range(1,61)], k=qtd))
-    else:
-        jogo = sorted(random.sample(range(1,61), qtd))
+    concursos = estado().concursos()
+    with _mede('pontuacao'):
+        pesos = estado().derivado('pesos', pesos_invertidos)
+    if tabela and qtd == 6 and not forcar_filtros:
+        tb = _tabela_ou_none()
+        if tb is not None:
+            return next(_iter_tabela(tb, 1, concursos, pesos, seed))
+    amostrador = _amostrador(concursos)
+    jogo = amostrador.sorteia(qtd)
     if forcar_filtros or filtros_ok(jogo, concursos):
         return jogo
     # tentar novamente algumas vezes com fallback
     for _ in range(1000):
-        if concursos:
-            jogo = sorted(random.choices(range(1,61), weights=[pesos[d] for d in range(1,61)], k=qtd))
-        else:
-            jogo = sorted(random.sample(range(1,61), qtd))
+        jogo = amostrador.sorteia(qtd)
         if forcar_filtros or filtros_ok(jogo, concursos):
             return jogo
     return jogo
@@ -263,324 +693,296 @@ def custo_aposta(qtd):
         return 0
     return 6 * comb(qtd, 6)
 
+def monta_carteira(orcamento, candidatos=None, n_candidatos=50_000, tamanhos=(6,),
+                   peso_pares=1.0, peso_trios=1.0, seed=None):
+    """Carteira de apostas que maximiza a cobertura de pares/trios distintos sem passar
+    de `orcamento` reais (`portfolio.otimiza`, preços de `custo_aposta`). Requer numpy.
+    Sem `candidatos`, sorteia `n_candidatos` por tamanho em `tamanhos` (6 a 20):
+    jogos de 6 vêm do gerador com filtros; apostas maiores, do amostrador ponderado.
+    Com o registro de apostas ligado, jogos de 6 já emitidos ficam fora dos candidatos
+    e só as apostas escolhidas são registradas.
+    Retorna dict com `apostas`, `custo`, `pares` e `trios`."""
+    import numpy as np
+    portfolio = _core('portfolio')
+    if candidatos is None:
+        rng = np.random.default_rng(seed)
+        amostrador = _amostrador(estado().concursos())
+        candidatos = {}
+        for q in tamanhos:
+            if q == 6:
+                # `_iter_jogos` não passa pelo registro: candidatos descartados não contam como emitidos
+                seis = np.array(list(_iter_jogos(n_candidatos, False, 50_000, seed, None, False, 10_000)),
+                                dtype=np.int64).reshape(-1, 6)
+                if DEDUP is not None:
+                    seis = seis[~DEDUP.contem_lote(seis)]
+                candidatos[q] = seis
+            elif custo_aposta(q):
+                candidatos[q] = amostrador.sorteia_lote(rng, n_candidatos, q)
+    carteira = portfolio.otimiza(candidatos, orcamento, custo_aposta, peso_pares, peso_trios)
+    if DEDUP is not None:
+        seis = [a for a in carteira['apostas'] if len(a) == 6]
+        if seis:
+            DEDUP.registra_lote(seis)
+            DEDUP.salva()
+    return carteira
+
+def ranqueia_cartelas(k=10, candidatos=50_000, tamanho=25, alvo=None, workers=None, seed=None, amostra=50_000):
+    """Top-k cartelas (Tele Sena: `tamanho` dezenas de 1 a 60) por distância de Mahalanobis
+    entre `candidatos` sorteadas, em fluxo com heap limitado (`ranking.py`). A covariância
+    vem de `amostra` cartelas uniformes; `alvo` (cartela) troca o centro, que por padrão é a
+    média. `workers` > 1 usa um pool de processos (0 = todos os núcleos). Requer numpy.
+    Retorna lista de (cartela, distância²)."""
+    ranking = _core('ranking')
+    modelo = ranking.modelo_padrao(tamanho, amostra, alvo)
+    return ranking.ranqueia(modelo, candidatos, k=k, tamanho=tamanho, workers=workers, seed=seed)
+
 def carregar_csv_local(path):
     """Carrega CSV local da Caixa (ou compatível) e atualiza cache JSON.
     Retorna lista de concursos (listas de 6 dezenas)."""
     try:
         with open(path, encoding='utf8') as f:
             rows = [ln.strip().split(';') for ln in f if ln.strip()]
-        concursos = []
+        concursos, numeros = [], []
         for r in rows[1:]:
             try:
                 nums = list(map(int, r[1:7]))
                 if len(nums) == 6:
                     concursos.append(sorted(nums))
+                    numeros.append(int(r[0]) if r[0].strip().isdigit() else None)
             except Exception:
                 continue
-        with open(CACHE, 'w', encoding='utf8') as f:
-            json.dump(concursos, f)
-        return concursos
+        _grava_cache(concursos, numeros)
+        return _core('history').Concursos(concursos)
     except Exception as e:
         raise
 
 def carregar_arquivo_local(path):
-    """Carrega CSV ou XLSX local e atualiza o cache.
-    Suporta arquivos .csv (ponto-e-vírgula) e .xlsx (openpyxl).
+    """Carrega CSV ou XLSX local e atualiza o cache e os artefatos derivados.
+    Suporta arquivos .csv (ponto-e-vírgula) e .xlsx.
     Retorna lista de concursos (listas de 6 dezenas).
+    A leitura é feita em fluxo por `ingest.le_historico`.
     """
     path = os.path.abspath(path)
     if not os.path.exists(path):
         raise FileNotFoundError(path)
-    lower = path.lower()
-    concursos = []
 
-    # helper: valida número de dezena
-    def is_dezena(v):
-        try:
-            iv = int(v)
-            return 1 <= iv <= 60
-        except Exception:
-            return False
-
-    # read into rows (list of lists) with header in first row
-    rows = []
-    header = None
-    if lower.endswith('.csv'):
-        with open(path, encoding='utf8', errors='ignore') as f:
-            for i, ln in enumerate(f):
-                parts = [p.strip() for p in ln.strip().split(';')]
-                if i == 0:
-                    header = parts
-                rows.append(parts)
-    elif lower.endswith('.xlsx') or lower.endswith('.xls'):
-        try:
-            from openpyxl import load_workbook
-            wb = load_workbook(path, read_only=True, data_only=True)
-            sheet = wb[wb.sheetnames[0]]
-            for i, row in enumerate(sheet.iter_rows(values_only=True)):
-                parts = [str(c).strip() if c is not None else '' for c in row]
-                if i == 0:
-                    header = parts
-                rows.append(parts)
-        except Exception:
-            try:
-                import pandas as pd
-                df = pd.read_excel(path)
-                header = [str(c) for c in df.columns]
-                for _, r in df.iterrows():
-                    rows.append([str(r[c]).strip() if not (r[c] is None) else '' for c in df.columns])
-            except Exception:
-                raise RuntimeError('Instale openpyxl ou pandas para ler .xlsx')
-    else:
-        raise RuntimeError('Formato não suportado: use .csv ou .xlsx')
-
-    if not rows:
-        with open(CACHE, 'w', encoding='utf8') as f:
-            json.dump([], f)
-        return []
-
-    cols = max(len(r) for r in rows)
-
-    # 1) tentar detectar por cabeçalho comum (D1..D6, D01..D06, DEZENA1..)
-    col_candidates = []
-    if header:
-        lower_hdr = [str(h).strip().lower() for h in header]
-        for pattern_idx in range(len(lower_hdr)):
-            # try to find sequence of 6 header names matching d1..d6
-            names = lower_hdr[pattern_idx:pattern_idx+6]
-            if len(names) < 6:
-                break
-            ok = True
-            for j, nm in enumerate(names, start=1):
-                if not (nm.startswith(f'd{j}') or nm.startswith(f'd{j:02d}') or nm.startswith(f'dezena') or nm.startswith(f'dez')) and not any(sub in nm for sub in [f'd{j}', f'v{j}', f'{j}']):
-                    ok = False
-                    break
-            if ok:
-                col_candidates = list(range(pattern_idx, pattern_idx+6))
-                break
+    # leitura em fluxo: papéis das colunas inferidos numa amostra, resto direto para arrays
+    hist = _core('ingest').le_historico(path)
+    ordem = hist.ordem()
+    numeros = [hist.concurso(i) for i in ordem]
+    datas = [hist.datas[i] for i in ordem]
+    concursos = _core('history').Concursos(hist.jogo(i) for i in ordem)
+    del hist, ordem
 
-    # 2) se não encontrou por cabeçalho, analisar colunas por frequência de inteiros em 1..60
-    if not col_candidates:
-        counts = [0]*cols
-        total_rows = max(1, len(rows)-1)
-        # skip header row when counting if header exists
-        start_idx = 1 if header else 0
-        for r in rows[start_idx:]:
-            for ci in range(cols):
-                v = r[ci] if ci < len(r) else ''
-                if is_dezena(v):
-                    counts[ci] += 1
-        # pick columns with highest counts
-        indexed = sorted(enumerate(counts), key=lambda x: (-x[1], x[0]))
-        # select top 6 columns that have at least some numeric hits
-        selected = [i for i,c in indexed if c > 0][:6]
-        selected.sort()
-        if len(selected) == 6:
-            col_candidates = selected
-        else:
-            # fallback: try consecutive window with many numeric entries
-            for start in range(0, max(0, cols-6)+1):
-                window = list(range(start, start+6))
-                score = sum(counts[i] for i in window)
-                if score >= (total_rows * 0.1):
-                    col_candidates = window
-                    break
-
-    # 3) detectar colunas de concurso e data (se existirem)
-    concurso_col = None
-    data_col = None
-    if header:
-        lower_hdr = [str(h).strip().lower() for h in header]
-        for i, h in enumerate(lower_hdr):
-            if any(k in h for k in ('concurso', 'nr', 'numero', 'n_conc', 'num_conc', 'concurso_num')) and concurso_col is None:
-                concurso_col = i
-            if any(k in h for k in ('data', 'dt', 'sorteio')) and data_col is None:
-                data_col = i
-
-    # heurística por conteúdo se não detectado
-    def looks_like_date(s):
-        if not s:
-            return False
-        s = s.strip()
-        # formatos comuns: dd/mm/yyyy, yyyy-mm-dd, dd-mm-yyyy
-        import re
-        if re.match(r'^\d{1,2}/\d{1,2}/\d{2,4}$', s):
-            return True
-        if re.match(r'^\d{4}-\d{1,2}-\d{1,2}$', s):
-            return True
-        return False
-
-    if data_col is None:
-        # buscar coluna com muitas ocorrências de datas
-        cols = max(len(r) for r in rows)
-        date_counts = [0]*cols
-        start_idx = 1 if header else 0
-        for r in rows[start_idx:]:
-            for ci in range(cols):
-                v = r[ci] if ci < len(r) else ''
-                if looks_like_date(v):
-                    date_counts[ci] += 1
-        best = sorted(enumerate(date_counts), key=lambda x: -x[1])
-        if best and best[0][1] > 0:
-            data_col = best[0][0]
-
-    if concurso_col is None:
-        # buscar coluna com muitos inteiros crescentes
-        cols = max(len(r) for r in rows)
-        num_counts = [0]*cols
-        start_idx = 1 if header else 0
-        for r in rows[start_idx:]:
-            for ci in range(cols):
-                v = r[ci] if ci < len(r) else ''
-                try:
-                    iv = int(str(v).strip())
-                    if iv > 0:
-                        num_counts[ci] += 1
-                except Exception:
-                    pass
-        best = sorted(enumerate(num_counts), key=lambda x: -x[1])
-        if best and best[0][1] > 0:
-            concurso_col = best[0][0]
-
-    # 4) construir concursos a partir das col_candidates, coletando meta (concurso, data)
-    entries = []  # cada item: dict{'concurso': int or None, 'data': str or None, 'dezenas': [6 ints]}
-    start_idx = 1 if header else 0
-    for r in rows[start_idx:]:
-        vals = []
-        for ci in col_candidates:
-            if ci < len(r) and is_dezena(r[ci]):
-                vals.append(int(r[ci]))
-            else:
-                vals = []
-                break
-        if len(vals) == 6:
-            concurso_val = None
-            data_val = None
-            if concurso_col is not None and concurso_col < len(r):
-                try:
-                    concurso_val = int(str(r[concurso_col]).strip())
-                except Exception:
-                    concurso_val = None
-            if data_col is not None and data_col < len(r):
-                data_val = str(r[data_col]).strip()
-            entries.append({'concurso': concurso_val, 'data': data_val, 'dezenas': sorted(vals)})
-
-    # ordenar por concurso se disponível, senão manter ordem
-    try:
-        entries_sorted = sorted(entries, key=lambda e: (e['concurso'] if e['concurso'] is not None else 0))
-    except Exception:
-        entries_sorted = entries
-
-    concursos = [e['dezenas'] for e in entries_sorted]
-
-    # salvar cache padrão
-    with open(CACHE, 'w', encoding='utf8') as f:
-        json.dump(concursos, f)
-
-    # salvar CSV completo padronizado
-    full_path = 'mega_full_from_local.csv'
-    with open(full_path, 'w', encoding='utf8', newline='') as f:
-        w = csv.writer(f, delimiter=';')
-        header_row = ['Concurso', 'Data', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6']
-        w.writerow(header_row)
-        for e in entries_sorted:
-            row = [e['concurso'] if e['concurso'] is not None else '', e['data'] if e['data'] else ''] + e['dezenas']
-            w.writerow(row)
-
-    # frequências gerais
-    freq = frequencies(concursos, max_num=60)
-    freq_path = 'mega_freq_from_local.csv'
-    with open(freq_path, 'w', encoding='utf8', newline='') as f:
-        w = csv.writer(f, delimiter=';')
-        w.writerow(['dezena', 'freq'])
-        for d in range(1, 61):
-            w.writerow([d, freq[d]])
-
-    # frequências recentes (últimos 100 concursos)
-    recents = 100
-    recent_list = concursos[-recents:] if len(concursos) >= 1 else concursos
-    freq_recent = frequencies(recent_list, max_num=60)
-    recent_path = 'mega_freq_recent.csv'
-    with open(recent_path, 'w', encoding='utf8', newline='') as f:
-        w = csv.writer(f, delimiter=';')
-        w.writerow(['dezena', 'freq_recent'])
-        for d in range(1, 61):
-            w.writerow([d, freq_recent[d]])
-
-    # resumo JSON
-    # calcular top10 usando pontuação combinada (frequência + recência)
-    try:
-        combined = combined_scores(concursos, recent_n=100, alpha=0.6)
-        top10 = sorted(combined.items(), key=lambda x: (-x[1], x[0]))[:10]
-    except Exception:
-        top10 = sorted([(d, freq[d]) for d in range(1, 61)], key=lambda x: (-x[1], x[0]))[:10]
-
-    summary = {
-        'total_concursos': len(concursos),
-        'ultima_data': entries_sorted[-1]['data'] if entries_sorted and entries_sorted[-1]['data'] else None,
-        'ultima_concurso': entries_sorted[-1]['concurso'] if entries_sorted and entries_sorted[-1]['concurso'] else None,
-        'top10': top10
-    }
-    with open('mega_summary.json', 'w', encoding='utf8') as f:
-        json.dump(summary, f, ensure_ascii=False, indent=2)
+    # salvar cache padrão (JSON + binário)
+    _grava_cache(concursos, numeros, datas)
 
+    # artefatos derivados (CSV completo, frequências, resumo) em DATA_DIR: só os defasados
+    atualiza_artefatos(concursos, numeros, datas)
     return concursos
 
-def salva_pdf(jogos, arquivo='volantes_mega.pdf'):
+def importar_arquivos(fontes, workers=None):
+    """Importa de uma vez várias exportações CSV/XLSX (arquivos, diretórios ou globs):
+    lê os arquivos em paralelo (`workers` processos; None = um por núcleo), funde por nº
+    do concurso e grava o cache uma única vez. Retorna `importer.Importacao`, com o
+    relatório de conflitos em `.relatorio()`."""
+    imp = _core('importer').importa(fontes, workers=workers)
+    if not imp.concursos:
+        raise ValueError('Nenhum concurso com número encontrado nos arquivos importados.')
+    _grava_cache(imp.concursos, imp.numeros, imp.datas)
+    atualiza_artefatos(imp.concursos, imp.numeros, imp.datas)
+    return imp
+
+def _historico_completo():
+    """(concursos, números, datas) do cache; nº e data vêm do cache binário quando há numpy."""
+    regs = _carrega_bin()
+    if regs is not None:
+        dias_para_data = _core('cache_bin').dias_para_data
+        return (regs['dezenas'].tolist(), [int(n) or None for n in regs['concurso']],
+                [dias_para_data(d) for d in regs['data']])
+    lido = armazem().le()
+    return lido.concursos, lido.numeros, lido.datas
+
+def atualiza_artefatos(concursos=None, numeros=None, datas=None, forcar=False):
+    """Gera em DATA_DIR mega_full_from_local.csv, mega_freq_from_local.csv,
+    mega_freq_recent.csv e mega_summary.json, só os que mudaram desde a última geração
+    (chave = hash do histórico; ver `artifacts.py`), em paralelo. Sem argumentos usa o
+    histórico em cache; `forcar` refaz todos. Retorna dict {artefato: 'gerado' | 'atual'}."""
+    if concursos is None:
+        if _le_cache() is None:
+            raise FileNotFoundError('Sem histórico em cache: rode com --update ou --importar antes.')
+        concursos, numeros, datas = _historico_completo()
+    _garante_data_dir()
+    with _mede('artefatos'):
+        return _core('artifacts').atualiza(DATA_DIR, concursos, numeros, datas, pontua=combined_scores, forcar=forcar)
+
+def _garante_fpdf():
+    """Falha cedo (antes de gerar os jogos) quando a biblioteca do PDF não está instalada."""
     try:
-        from fpdf import FPDF
-    except Exception:
-        print('Biblioteca fpdf não encontrada. Instalando...')
-        os.system(f"{sys.executable} -m pip install fpdf")
-        from fpdf import FPDF
-    pdf = FPDF()
-    pdf.set_auto_page_break(True, margin=10)
-    per_page = 12
-    for pag in range(0, len(jogos), per_page):
-        pdf.add_page()
-        pdf.set_font('Helvetica', 'B', 14)
-        pdf.cell(0, 10, f'Mega – Volantes gerados em {datetime.date.today():%d/%m/%Y}', ln=True, align='C')
-        pdf.ln(6)
-        pdf.set_font('Helvetica', '', 12)
-        for i, j in enumerate(jogos[pag:pag+per_page], pag+1):
-            pdf.cell(0, 6, f"{i:02d}: " + ' - '.join(f"{d:02d}" for d in j), ln=True)
-    pdf.output(arquivo)
+        import fpdf  # noqa: F401
+    except ImportError:
+        raise ImportError('Biblioteca fpdf não encontrada; instale com: python -m pip install fpdf') from None
+
+def salva_pdf(jogos, arquivo='volantes_mega.pdf'):
+    """Salva jogos em PDF (12 por página). Aceita qualquer iterável (ex.: `iter_jogos`);
+    o conteúdo é paginado em blocos por `saida.SaidaPDF`."""
+    _garante_fpdf()
+    saida = _core('saida')
+    saida.escreve_em_blocos(jogos, [saida.SaidaPDF(arquivo)], medir=_medidor())
     print(f'PDF salvo: {arquivo}')
 
-def salva_csv(jogos, arquivo='volantes_mega.csv'):
-    """Salva jogos em CSV simples: Numero;D1;D2;D3;D4;D5;D6"""
-    with open(arquivo, 'w', encoding='utf8', newline='') as f:
-        w = csv.writer(f, delimiter=';')
-        w.writerow(['Numero','D1','D2','D3','D4','D5','D6'])
-        for i, j in enumerate(jogos, 1):
-            w.writerow([f'{i:02d}'] + [f'{d:02d}' for d in j])
+def salva_csv(jogos, arquivo='volantes_mega.csv', largura=None):
+    """Salva jogos em CSV simples: Numero;D1;D2;D3;D4;D5;D6
+    Aceita qualquer iterável (ex.: `iter_jogos`), gravado em blocos. Os jogos são
+    gravados como vieram: para não repetir apostas já emitidas eles devem sair de
+    `iter_jogos`/`recomendar_numeros` com o registro ligado (ver `saida.SaidaCSV`).
+    `largura`: colunas de dezenas (padrão: a maior aposta de uma lista; 6 para iteradores)."""
+    if largura is None:
+        largura = max(map(len, jogos), default=6) if isinstance(jogos, (list, tuple)) else 6
+    saida = _core('saida')
+    saida.escreve_em_blocos(jogos, [saida.SaidaCSV(arquivo, registro=DEDUP, largura=max(largura, 6))],
+                            medir=_medidor())
     print(f'CSV salvo: {arquivo}')
 
-def atualizar_cache():
-    """Força download do histórico e atualiza o cache."""
-    return baixa_hist()
+def confere_bilhetes(arquivos, sorteio=None, historico=True, saida=None, resumo=None):
+    """Confere os bilhetes de um ou mais CSVs de `salva_csv` contra `sorteio` (6 dezenas)
+    e, com `historico`, contra todos os concursos do cache (`checker.confere`).
+    `saida`: CSV por bilhete; `resumo`: JSON agregado. Retorna o dict agregado. Requer numpy."""
+    mascaras = mascaras_concursos() if historico else None
+    return _core('checker').confere(arquivos, sorteio=sorteio, historico=mascaras, saida=saida, resumo=resumo)
+
+def mascaras_concursos():
+    """Bitmask uint64 de cada concurso do histórico (com repetições, na ordem), para
+    contar prêmios concurso a concurso. Memoizado em `estado()`. Requer numpy."""
+    import numpy as np
+    return estado().derivado('mascaras_concursos', lambda c, f: _core('batch').mascaras(
+        np.array([x for x in c if len(x) == 6 and len(set(x)) == 6], dtype=np.int64).reshape(-1, 6)))
+
+def atualizar_cache(incremental=True):
+    """Força download do histórico e atualiza o cache.
+    `incremental=False` ignora ETag/Last-Modified e regrava o cache completo."""
+    return baixa_hist(incremental=incremental)
+
+def _primeiro_marcado(jogos, marca):
+    """Repassa `jogos` anotando em `marca` o instante do primeiro (para --profile-startup)."""
+    for j in jogos:
+        if not marca:
+            marca.append(time.perf_counter())
+        yield j
+
+def _relatorio_partida(primeiro=None, stats=None):
+    """Tempos de partida (ms, a partir do início da importação do motor): importação do
+    motor, primeira carga de cada módulo de src/core (inclui suas dependências, ex.: numpy),
+    carga do histórico e primeiro resultado."""
+    ms = lambda s: f'{s * 1000:9.1f} ms'
+    linhas = ['Perfil de partida (desde o início da importação do motor):',
+              f'  {"importação de engine":<32}{ms(_T_IMPORTADO - _T0)}']
+    linhas += [f'  {"import " + nome.rsplit(".", 1)[-1]:<32}{ms(seg)}' for nome, seg in _PERFIL_IMPORTS]
+    if stats is not None and 'carrega_concursos' in stats.tempos:
+        linhas.append(f'  {"carga do histórico":<32}{ms(stats.tempos["carrega_concursos"])}')
+    if primeiro is not None:
+        linhas.append(f'  {"primeiro resultado":<32}{ms(primeiro - _T0)}')
+    linhas.append(f'  {"total":<32}{ms(time.perf_counter() - _T0)}')
+    return '\n'.join(linhas)
 
 def main():
+    import argparse
+    _configura_log()
     ap = argparse.ArgumentParser(description='Gerador inteligente de jogos da Mega da Virada')
     ap.add_argument('quantidade', type=int, nargs='?', default=20, help='quantos jogos gerar')
     ap.add_argument('--pdf', nargs='?', const='volantes_mega.pdf', help='salva PDF (opcional: nome)')
     ap.add_argument('--csv', nargs='?', const='volantes_mega.csv', help='salva CSV (opcional: nome)')
     ap.add_argument('--forca', action='store_true', help='ignora filtros (gera sem restrições)')
     ap.add_argument('--update', action='store_true', help='força atualização do histórico da Caixa')
+    ap.add_argument('--lote', type=int, default=None, help='gera em blocos vetorizados de N candidatos (requer numpy)')
+    ap.add_argument('--seed', type=int, default=None, help='semente do gerador vetorizado/paralelo')
+    ap.add_argument('--workers', type=int, default=None, help='gera em N processos (saída reprodutível com --seed)')
+    ap.add_argument('--tabela', action='store_true', help='sorteia da tabela pré-computada de jogos válidos (requer numpy)')
+    ap.add_argument('--orcamento', type=float, default=None, help='monta uma carteira com cobertura máxima de pares/trios até este valor em R$ (requer numpy)')
+    ap.add_argument('--tamanhos', default='6', help='tamanhos de aposta da carteira, ex.: 6,7,8 (com --orcamento)')
+    ap.add_argument('--filtros', help='JSON com as regras dos filtros (padrão: data/filtros.json, se existir)')
+    ap.add_argument('--stats', nargs='?', const='-', help='relatório JSON de rejeições por filtro e tempos (opcional: arquivo; padrão stderr)')
+    ap.add_argument('--servir', nargs='?', type=int, const=8765, metavar='PORTA', help='modo serviço: HTTP em localhost com o histórico em memória (--workers processos; 0 = threads)')
+    ap.add_argument('--ineditos', action='store_true', help='não repete jogos já emitidos/salvos (registro persistente em data/; requer numpy)')
+    ap.add_argument('--importar', nargs='+', metavar='FONTE', help='importa e funde CSV/XLSX (arquivos, diretórios ou globs) num único cache (--workers processos)')
+    ap.add_argument('--rebuild-artifacts', nargs='?', const='defasados', choices=('defasados', 'todos'), help='(re)gera em data/ os artefatos derivados do histórico (CSV completo, frequências, resumo): só os defasados ou todos')
+    ap.add_argument('--profile-startup', action='store_true', help='mostra em stderr o tempo de importação/carga até o primeiro resultado (detalhe da stdlib: python -X importtime)')
     args = ap.parse_args()
 
+    if args.servir is not None:
+        _core('service').serve(porta=args.servir, workers=1 if args.workers is None else args.workers, filtros=args.filtros)
+        return
+
+    if args.importar:
+        imp = importar_arquivos(args.importar, workers=args.workers)
+        print(json.dumps(imp.relatorio(), ensure_ascii=False, indent=2))
+        print(f'Histórico importado: {len(imp.concursos)} concursos, {len(imp.conflitos)} conflitos.')
+        return
+    if args.rebuild_artifacts:
+        try:
+            estado_artefatos = atualiza_artefatos(forcar=args.rebuild_artifacts == 'todos')
+        except FileNotFoundError as e:
+            ap.error(str(e))
+        for nome, situacao in estado_artefatos.items():
+            print(f'{nome}: {situacao}')
+        print(f'Artefatos em {DATA_DIR}')
+        return
+
+    if args.filtros:
+        configura_filtros(args.filtros)
+    if args.stats or args.profile_startup:
+        ativa_estatisticas()
+    if args.ineditos:
+        ativa_dedup()
+    if args.pdf:
+        try:
+            _garante_fpdf()
+        except ImportError as e:
+            ap.error(str(e))
+
     if getattr(args, 'update', False):
         atualizar_cache()
 
-    jogos = gerar_jogos(args.quantidade, forcar_filtros=args.forca)
-    for n,j in enumerate(jogos,1):
-        print(f"{n:02d}: " + ' - '.join(f"{d:02d}" for d in j))
+    carteira = None
+    if args.orcamento:
+        # `quantidade` vira o nº de candidatos por tamanho do qual a carteira é escolhida
+        tamanhos = tuple(int(t) for t in args.tamanhos.split(',') if t.strip())
+        carteira = monta_carteira(args.orcamento, n_candidatos=max(args.quantidade, 1000), tamanhos=tamanhos, seed=args.seed)
+        jogos = carteira['apostas']
+    else:
+        # uma única passada pelo gerador alimenta stdout, CSV e PDF em blocos
+        jogos = iter_jogos(args.quantidade, forcar_filtros=args.forca, lote=args.lote, seed=args.seed, workers=args.workers, tabela=args.tabela)
+    marca = []
+    if args.profile_startup:
+        jogos = _primeiro_marcado(jogos, marca)
+    saida = _core('saida')
+    saidas = [saida.SaidaTexto(sys.stdout)]
     if args.pdf:
-        salva_pdf(jogos, args.pdf)
+        saidas.append(saida.SaidaPDF(args.pdf))
     if getattr(args, 'csv', False):
-        salva_csv(jogos, args.csv)
+        largura = max(map(len, carteira['apostas']), default=6) if carteira is not None else 6
+        saidas.append(saida.SaidaCSV(args.csv, registro=DEDUP, largura=max(largura, 6)))
+    saida.escreve_em_blocos(jogos, saidas, medir=_medidor())
+    if carteira is not None:
+        print(f"Carteira: {len(carteira['apostas'])} apostas, R$ {carteira['custo']}, "
+              f"{carteira['pares']} pares e {carteira['trios']} trios cobertos")
+    if args.pdf:
+        print(f'PDF salvo: {args.pdf}')
+    if getattr(args, 'csv', False):
+        print(f'CSV salvo: {args.csv}')
+    medidas = desativa_estatisticas()
+    if args.stats:
+        relatorio = medidas.json(indent=2)
+        if args.stats == '-':
+            print(relatorio, file=sys.stderr)
+        else:
+            with open(args.stats, 'w', encoding='utf8') as f:
+                f.write(relatorio)
+            print(f'Estatísticas salvas: {args.stats}')
+    if args.profile_startup:
+        print(_relatorio_partida(marca[0] if marca else None, medidas), file=sys.stderr)
+
+_T_IMPORTADO = time.perf_counter()
 
 if __name__ == '__main__':
     main()
-
-```
\ No newline at end of file
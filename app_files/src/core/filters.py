@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+filters.py
+Pipeline declarativo das regras de `engine.filtros_ok`.
+
+As regras e seus limites vêm de um dict (ou JSON, ex.: DATA_DIR/filtros.json):
+
+  {"pares_max": 3, "sequencia_max": 2, "finais_max": 2, "decadas_min": 4,
+   "soma_min": 100, "soma_max": 250, "primos_max": 4, "historico": true}
+
+Chaves ausentes usam `PADRAO`; valor null (ou false) desliga a regra. Cada regra
+é compilada uma vez para bitmasks/tabelas sobre 1..60 (o jogo vira um int de 60
+bits e pares/primos/sequências são um AND + popcount). O `Pipeline` conta quantos
+jogos cada regra rejeita e, a cada `REORDENA` avaliações, reordena as regras pela
+taxa de rejeição / custo, para que as mais seletivas e baratas rodem primeiro.
+A decisão (aprovado ou não) não depende da ordem; só o nome da regra reportada
+como motivo pode mudar. As regras assumem jogos com dezenas distintas.
+"""
+import json
+from functools import reduce
+from operator import or_
+
+PADRAO = {
+    'pares_max': 3,
+    'sequencia_max': 2,
+    'finais_max': 2,
+    'decadas_min': 4,
+    'soma_min': 100,
+    'soma_max': 250,
+    'primos_max': 4,
+    'historico': True,
+}
+
+PRIMOS = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59)
+
+REORDENA = 8192
+
+_BIT = [0] + [1 << (d - 1) for d in range(1, 61)]
+_PARES = reduce(or_, (_BIT[d] for d in range(2, 61, 2)))
+_PRIMOS = reduce(or_, (_BIT[d] for d in PRIMOS))
+# contagem por final: 4 bits por final (0..9); cada final aparece no máx. 6 vezes em 1..60
+_FINAL = [0] + [1 << (4 * (d % 10)) for d in range(1, 61)]
+_ALTOS = int('8' * 10, 16)
+_DECADA = [0] + [d // 10 for d in range(1, 61)]
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(x):
+        return bin(x).count('1')
+
+
+def carrega_config(origem=None):
+    """Config completa a partir de `origem` (dict, caminho de JSON ou None = `PADRAO`)."""
+    config = dict(PADRAO)
+    if origem is None:
+        return config
+    if not isinstance(origem, dict):
+        with open(origem, encoding='utf8') as f:
+            origem = json.load(f)
+    desconhecidas = set(origem) - set(PADRAO)
+    if desconhecidas:
+        raise ValueError(f"Regras desconhecidas em filtros: {', '.join(sorted(desconhecidas))}")
+    config.update(origem)
+    return config
+
+
+def mascara(jogo):
+    m = 0
+    for d in jogo:
+        m |= _BIT[d]
+    return m
+
+
+class Regra:
+    """Regra compilada: `aprova(j, m, concursos)` para um jogo ordenado `j` com
+    bitmask `m`; `mask(j, m, historico)` é a versão numpy sobre arrays (N, k)."""
+
+    __slots__ = ('nome', 'custo', 'aprova', 'mask')
+
+    def __init__(self, nome, custo, aprova, mask):
+        self.nome = nome
+        self.custo = custo
+        self.aprova = aprova
+        self.mask = mask
+
+    def __repr__(self):
+        return f'Regra({self.nome!r})'
+
+
+def _maximo_popcount(nome, bits, limite):
+    def aprova(j, m, concursos):
+        return _popcount(m & bits) <= limite
+
+    def mask(j, m, historico):
+        import numpy as np
+        return popcount_np(m & np.uint64(bits)) <= limite
+    return Regra(nome, 1, aprova, mask)
+
+
+def popcount_np(x):
+    """Popcount por elemento de um array uint64 (`np.bitwise_count` no numpy >= 2)."""
+    import numpy as np
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x)
+    return _popcount_swar(x)
+
+
+def _popcount_swar(x):
+    # numpy < 2: soma paralela dos bits (SWAR) em 12 operações vetorizadas por elemento
+    import numpy as np
+    x = np.asarray(x, dtype=np.uint64)
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+def _sequencia(limite):
+    # existe sequência de limite+1 dezenas consecutivas <=> m & (m>>1) & ... & (m>>limite) != 0
+    passos = tuple(range(1, limite + 1))
+
+    def aprova(j, m, concursos):
+        r = m
+        for p in passos:
+            r &= m >> p
+        return not r
+
+    def mask(j, m, historico):
+        import numpy as np
+        r = m.copy()
+        for p in passos:
+            r &= m >> np.uint64(p)
+        return r == 0
+    return Regra('sequencia', 1, aprova, mask)
+
+
+def _finais(limite):
+    # soma os contadores de 4 bits; contador + (7 - limite) liga o bit alto se contador > limite
+    soma_limite = int(f'{7 - min(limite, 7):x}' * 10, 16)
+    tabela = _FINAL
+
+    def aprova(j, m, concursos):
+        return not ((sum(map(tabela.__getitem__, j)) + soma_limite) & _ALTOS)
+
+    def mask(j, m, historico):
+        import numpy as np
+        s = np.array(tabela, dtype=np.uint64)[j].sum(axis=1)
+        return (s + np.uint64(soma_limite)) & np.uint64(_ALTOS) == 0
+    return Regra('finais', 3, aprova, mask)
+
+
+def _decadas(minimo):
+    tabela = _DECADA
+
+    def aprova(j, m, concursos):
+        return len(set(map(tabela.__getitem__, j))) >= minimo
+
+    def mask(j, m, historico):
+        import numpy as np
+        bits = np.left_shift(np.uint8(1), np.array(tabela, dtype=np.uint8)[j])
+        return popcount_np(np.bitwise_or.reduce(bits, axis=1).astype(np.uint64)) >= minimo
+    return Regra('decadas', 3, aprova, mask)
+
+
+def _soma(minimo, maximo):
+    minimo = float('-inf') if minimo is None else minimo
+    maximo = float('inf') if maximo is None else maximo
+
+    def aprova(j, m, concursos):
+        return minimo <= sum(j) <= maximo
+
+    def mask(j, m, historico):
+        s = j.sum(axis=1)
+        return (s >= minimo) & (s <= maximo)
+    return Regra('soma', 2, aprova, mask)
+
+
+def _historico():
+    def aprova(j, m, concursos):
+        # histórico carregado por carrega_concursos traz índice O(1); listas simples caem na busca linear
+        indice = getattr(concursos, 'indice', None)
+        if indice is not None:
+            return not indice.contem_mascara(m)
+        return not (concursos and j in concursos)
+
+    def mask(j, m, historico):
+        import numpy as np
+        if historico is None or not len(historico):
+            return np.ones(len(m), dtype=bool)
+        # um concurso tem 6 dezenas distintas; jogos com outra contagem nunca coincidem
+        return ~np.isin(m, historico)
+    return Regra('historico', 2, aprova, mask)
+
+
+def compila(config):
+    """Lista de `Regra` para a config (ordem inicial = ordem clássica de filtros_ok)."""
+    regras = []
+    if config.get('pares_max') is not None:
+        regras.append(_maximo_popcount('pares', _PARES, config['pares_max']))
+    if config.get('sequencia_max') is not None:
+        regras.append(_sequencia(config['sequencia_max']))
+    if config.get('finais_max') is not None:
+        regras.append(_finais(config['finais_max']))
+    if config.get('decadas_min') is not None:
+        regras.append(_decadas(config['decadas_min']))
+    if config.get('soma_min') is not None or config.get('soma_max') is not None:
+        regras.append(_soma(config.get('soma_min'), config.get('soma_max')))
+    if config.get('primos_max') is not None:
+        regras.append(_maximo_popcount('primos', _PRIMOS, config['primos_max']))
+    if config.get('historico'):
+        regras.append(_historico())
+    return regras
+
+
+class Pipeline:
+    """Regras compiladas + ordem adaptativa. `motivo(jogo, concursos)` devolve o
+    nome da primeira regra que rejeita o jogo (na ordem atual) ou None."""
+
+    def __init__(self, config=None, adaptativo=True):
+        self.config = carrega_config(config)
+        self.adaptativo = adaptativo
+        self._regras = tuple(compila(self.config))
+        self.ordem = self._regras
+        self._zera()
+
+    def __reduce__(self):
+        # closures não são serializáveis: recompila no destino (ex.: workers de parallel.py)
+        return (Pipeline, (self.config, self.adaptativo))
+
+    @property
+    def chave(self):
+        """Hash curto das regras estáticas (sem o histórico); identifica tabelas pré-computadas."""
+        import hashlib
+        estaticas = {k: v for k, v in self.config.items() if k != 'historico'}
+        return hashlib.sha1(json.dumps(estaticas, sort_keys=True).encode()).hexdigest()[:10]
+
+    @property
+    def padrao(self):
+        return all(self.config[k] == v for k, v in PADRAO.items() if k != 'historico')
+
+    @property
+    def usa_historico(self):
+        return bool(self.config.get('historico'))
+
+    def _zera(self):
+        self._avaliados = 0
+        self._rejeitados = [0] * len(self.ordem)
+        self._proxima = REORDENA
+
+    def motivo(self, jogo, concursos=()):
+        j = sorted(jogo)
+        m = 0
+        for d in j:
+            m |= _BIT[d]
+        self._avaliados += 1
+        if self._avaliados >= self._proxima and self.adaptativo:
+            self.reordena()
+        for i, regra in enumerate(self.ordem):
+            if not regra.aprova(j, m, concursos):
+                self._rejeitados[i] += 1
+                return regra.nome
+        return None
+
+    def aprova(self, jogo, concursos=()):
+        return self.motivo(jogo, concursos) is None
+
+    def taxas(self):
+        """{regra: taxa de rejeição entre os jogos que chegaram a ela} desde a última reordenação."""
+        chegaram = self._avaliados
+        taxas = {}
+        for regra, rej in zip(self.ordem, self._rejeitados):
+            taxas[regra.nome] = rej / chegaram if chegaram else 0.0
+            chegaram -= rej
+        return taxas
+
+    def reordena(self):
+        """Ordena as regras por taxa de rejeição / custo (decrescente) e zera os contadores."""
+        taxas = self.taxas()
+        self.ordem = tuple(sorted(self.ordem, key=lambda r: -taxas[r.nome] / r.custo))
+        self._zera()
+
+    def regras_mask(self, jogos, historico=None):
+        """Máscaras numpy por regra, na ordem atual: lista de (nome, bool (N,), True = aprovado).
+        `jogos` (N, k) ordenado por linha; `historico` é o array uint64 de bitmasks dos concursos."""
+        import numpy as np
+        j = np.asarray(jogos, dtype=np.int64)
+        if j.size:
+            m = np.bitwise_or.reduce(np.left_shift(np.uint64(1), (j - 1).astype(np.uint64)), axis=1)
+        else:
+            m = np.zeros(len(j), dtype=np.uint64)
+        return [(r.nome, r.mask(j, m, historico)) for r in self.ordem]
+
+
+_PADRAO = None
+
+
+def padrao():
+    """Pipeline compartilhado com as regras de `PADRAO`."""
+    global _PADRAO
+    if _PADRAO is None:
+        _PADRAO = Pipeline()
+    return _PADRAO
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+history.py
+Índice de pertinência para o histórico de concursos.
+
+Cada sorteio de 6 dezenas é codificado como um bitmask de 60 bits
+(bit d-1 = dezena d), então `jogo in indice` custa O(1) em vez da varredura
+linear de `jogo in concursos`.
+"""
+
+
+def mascara(jogo):
+    """Bitmask (int) do jogo: bit d-1 ligado para cada dezena d."""
+    m = 0
+    for d in jogo:
+        m |= 1 << (d - 1)
+    return m
+
+
+class IndiceHistorico:
+    """Conjunto de bitmasks dos concursos conhecidos."""
+
+    __slots__ = ('_mascaras', '_array')
+
+    def __init__(self, concursos=()):
+        self._mascaras = set()
+        self._array = None
+        for c in concursos:
+            self.adiciona(c)
+
+    def adiciona(self, concurso):
+        # só concursos com 6 dezenas distintas podem coincidir com um jogo
+        if len(concurso) == 6 and len(set(concurso)) == 6:
+            self._mascaras.add(mascara(concurso))
+            self._array = None
+
+    def __contains__(self, jogo):
+        # um bitmask do índice tem 6 bits, então jogos com dezenas repetidas nunca coincidem
+        return len(jogo) == 6 and mascara(jogo) in self._mascaras
+
+    def contem_mascara(self, m):
+        """Como `in`, mas para um bitmask já calculado (ver `mascara`)."""
+        return m in self._mascaras
+
+    def __len__(self):
+        return len(self._mascaras)
+
+    def array(self):
+        """Bitmasks ordenados como numpy uint64 (para `np.isin`/`searchsorted`)."""
+        if self._array is None:
+            import numpy as np
+            self._array = np.array(sorted(self._mascaras), dtype=np.uint64)
+        return self._array
+
+
+class Concursos(list):
+    """Lista de concursos (listas de 6 dezenas) com `indice` embutido.
+    Continua sendo uma `list` para todo o código existente (json, fatias, len);
+    o índice é mantido em dia por append/extend/insert e reconstruído nas remoções.
+    """
+
+    def __init__(self, concursos=()):
+        super().__init__(concursos)
+        self.indice = IndiceHistorico(self)
+
+    def __reduce__(self):
+        return (Concursos, (list(self),))
+
+    def _reindexa(self):
+        self.indice = IndiceHistorico(self)
+
+    def append(self, concurso):
+        super().append(concurso)
+        self.indice.adiciona(concurso)
+
+    def insert(self, i, concurso):
+        super().insert(i, concurso)
+        self.indice.adiciona(concurso)
+
+    def extend(self, concursos):
+        concursos = list(concursos)
+        super().extend(concursos)
+        for c in concursos:
+            self.indice.adiciona(c)
+
+    def __iadd__(self, concursos):
+        self.extend(concursos)
+        return self
+
+    def __setitem__(self, i, valor):
+        super().__setitem__(i, valor)
+        self._reindexa()
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        self._reindexa()
+
+    def pop(self, i=-1):
+        valor = super().pop(i)
+        self._reindexa()
+        return valor
+
+    def remove(self, concurso):
+        super().remove(concurso)
+        self._reindexa()
+
+    def clear(self):
+        super().clear()
+        self._reindexa()
+
+
+def indexa(concursos):
+    """Garante um `Concursos` (com índice) sem copiar se já for um."""
+    if isinstance(concursos, Concursos):
+        return concursos
+    return Concursos(concursos)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+importer.py
+Importação em lote de várias exportações do histórico (CSV/XLSX de fontes e anos
+diferentes), fundidas pelo nº do concurso.
+
+Os arquivos (diretórios e globs são expandidos) são lidos em paralelo num pool
+de processos por `ingest.le_historico`; cada worker devolve o `Historico`
+compacto (arrays) do seu arquivo. A fusão é feita na ordem dos arquivos, então o
+resultado não depende do número de workers:
+- um concurso visto com as mesmas dezenas em vários arquivos entra uma vez (a
+  data vem do primeiro arquivo que a tiver);
+- dezenas diferentes para o mesmo nº são um conflito: vence a versão presente
+  em mais arquivos (empate: a do primeiro arquivo) e todas as versões vão para o
+  relatório;
+- linhas sem nº de concurso não têm como ser fundidas e são só contadas.
+"""
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .ingest import le_historico
+
+FORMATOS = ('.csv', '.xlsx', '.xls')
+MAX_FALTANDO = 100
+
+
+def expande(fontes):
+    """Arquivos de `fontes` (arquivos, diretórios ou globs), na ordem dada e sem repetição;
+    o conteúdo de cada diretório/glob vem em ordem alfabética."""
+    if isinstance(fontes, (str, os.PathLike)):
+        fontes = [fontes]
+    arquivos = []
+    for fonte in map(str, fontes):
+        if os.path.isdir(fonte):
+            achados = [os.path.join(fonte, n) for n in os.listdir(fonte)]
+        elif glob.has_magic(fonte):
+            achados = glob.glob(fonte, recursive=True)
+        else:
+            if not os.path.exists(fonte):
+                raise FileNotFoundError(fonte)
+            arquivos.append(os.path.abspath(fonte))
+            continue
+        arquivos.extend(sorted(os.path.abspath(a) for a in achados
+                               if os.path.isfile(a) and a.lower().endswith(FORMATOS)))
+    return list(dict.fromkeys(arquivos))
+
+
+def _le(caminho):
+    try:
+        return le_historico(caminho), None
+    except Exception as e:  # um arquivo ruim não derruba a importação: vai para o relatório
+        return None, f'{type(e).__name__}: {e}'
+
+
+class Importacao:
+    """Histórico fundido (listas paralelas ordenadas pelo nº do concurso) e relatório."""
+
+    def __init__(self):
+        self.concursos = []
+        self.numeros = []
+        self.datas = []
+        self.arquivos = []   # {'arquivo', 'linhas', 'erro'}
+        self.conflitos = []  # {'concurso', 'escolhido', 'versoes': [{'dezenas', 'data', 'arquivos'}]}
+        self.sem_numero = 0
+        self.faltando = []
+
+    def relatorio(self):
+        return {
+            'concursos': len(self.concursos),
+            'primeiro': self.numeros[0] if self.numeros else None,
+            'ultimo': self.numeros[-1] if self.numeros else None,
+            'arquivos': self.arquivos,
+            'conflitos': self.conflitos,
+            'sem_numero': self.sem_numero,
+            'faltando': len(self.faltando),
+            'faltando_exemplos': self.faltando[:MAX_FALTANDO],
+        }
+
+
+class Fusao:
+    """Acumula os `Historico` de cada arquivo, na ordem, e funde por nº do concurso."""
+
+    def __init__(self):
+        self._versoes = {}  # nº -> {dezenas: [data, [arquivos]]}, na ordem em que apareceram
+        self.sem_numero = 0
+
+    def adiciona(self, arquivo, hist):
+        for i in range(len(hist)):
+            numero = hist.concurso(i)
+            if numero is None or numero <= 0:
+                self.sem_numero += 1
+                continue
+            dezenas = tuple(hist.dezenas[6 * i:6 * i + 6])
+            versao = self._versoes.setdefault(numero, {}).setdefault(dezenas, [None, []])
+            if versao[0] is None and hist.datas[i]:
+                versao[0] = hist.datas[i]
+            if arquivo not in versao[1]:
+                versao[1].append(arquivo)
+
+    def resultado(self, imp):
+        """Preenche `imp` (Importacao) com o histórico fundido e os conflitos."""
+        for numero in sorted(self._versoes):
+            versoes = self._versoes[numero]
+            # max devolve o primeiro entre os empatados: a versão do primeiro arquivo
+            dezenas, (data, arquivos) = max(versoes.items(), key=lambda kv: len(kv[1][1]))
+            if len(versoes) > 1:
+                imp.conflitos.append({
+                    'concurso': numero,
+                    'escolhido': list(dezenas),
+                    'versoes': [{'dezenas': list(d), 'data': dt, 'arquivos': arqs}
+                                for d, (dt, arqs) in versoes.items()],
+                })
+            imp.concursos.append(list(dezenas))
+            imp.numeros.append(numero)
+            imp.datas.append(data)
+        imp.sem_numero = self.sem_numero
+        if imp.numeros:
+            presentes = set(imp.numeros)
+            imp.faltando = [n for n in range(imp.numeros[0], imp.numeros[-1] + 1) if n not in presentes]
+        return imp
+
+
+def importa(fontes, workers=None):
+    """Lê e funde todos os arquivos de `fontes` (ver `expande`). `workers`: processos
+    de leitura (None/0 = um por núcleo, limitado ao nº de arquivos). Retorna `Importacao`."""
+    arquivos = expande(fontes)
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(arquivos) or 1))
+    if workers == 1:
+        lidos = map(_le, arquivos)
+    else:
+        ex = ProcessPoolExecutor(max_workers=workers)
+        lidos = ex.map(_le, arquivos)  # resultados na ordem dos arquivos
+    fusao = Fusao()
+    imp = Importacao()
+    try:
+        for arquivo, (hist, erro) in zip(arquivos, lidos):
+            imp.arquivos.append({'arquivo': arquivo, 'linhas': len(hist) if hist is not None else 0, 'erro': erro})
+            if hist is not None:
+                fusao.adiciona(arquivo, hist)
+    finally:
+        if workers > 1:
+            ex.shutdown()
+    return fusao.resultado(imp)
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+journal.py
+Armazenamento do histórico com journal, snapshots atômicos e versões anteriores.
+
+Arquivos (em DATA_DIR):
+- `mega_cache.json`: snapshot (mesmo formato de sempre: lista de listas de 6
+  dezenas), só trocado por inteiro com tmp + os.replace — quem abre o arquivo vê
+  sempre a versão antiga ou a nova completas, nunca um arquivo pela metade;
+- `mega_cache.journal`: concursos acrescentados desde o snapshot, uma linha JSON
+  por atualização ({"base", "n0", "concursos", "numeros", "datas"}), gravada com
+  um único write + fsync;
+- `historico/mega_cache.<data-hora>.json`: snapshots anteriores (hard link do
+  arquivo substituído, sem cópia), os `MANTER` mais recentes.
+
+Escritores (anexa, grava, compacta) se excluem por uma trava de arquivo
+(`mega_cache.lock`); leitores não travam nada. Cada linha do journal leva em
+`base` o hash do snapshot que ela estende e em `n0` quantos concursos havia antes
+dela: o leitor só aplica, em cadeia, as linhas que estendem exatamente o
+snapshot que ele leu. Linhas de um snapshot já substituído (ou uma linha final
+incompleta, de um escritor ainda no meio do write) são ignoradas, então a visão
+lida é sempre um estado consistente. A cada `COMPACTA` linhas o journal é
+incorporado num novo snapshot; as linhas do snapshot substituído ficam no
+journal até a compactação seguinte, para os leitores que ainda o tenham aberto.
+"""
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+COMPACTA = 64
+MANTER = 10
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def trava(caminho):
+    """Trava exclusiva (bloqueante) sobre o arquivo `caminho`, entre processos."""
+    with open(caminho, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK desiste após ~10 s; continua esperando
+                    time.sleep(0.1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _hash(dados):
+    return hashlib.sha1(dados).hexdigest()[:16]
+
+
+def _grava_atomico(caminho, dados):
+    tmp = f'{caminho}.tmp.{os.getpid()}'
+    with open(tmp, 'wb') as f:
+        f.write(dados)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, caminho)
+
+
+def _entrada(linha):
+    try:
+        return json.loads(linha)
+    except ValueError:
+        return {}
+
+
+class Leitura:
+    """Visão consistente do histórico: `concursos` e as listas paralelas `numeros` e
+    `datas` (None onde o snapshot não guarda essa informação)."""
+
+    __slots__ = ('concursos', 'numeros', 'datas', 'base', 'linhas')
+
+    def __init__(self, concursos, base):
+        self.concursos = concursos
+        self.numeros = [None] * len(concursos)
+        self.datas = [None] * len(concursos)
+        self.base = base
+        self.linhas = 0  # linhas do journal aplicadas
+
+
+class Armazem:
+    """Histórico em `<data_dir>/<nome>.json` + journal + versões anteriores."""
+
+    def __init__(self, data_dir, nome='mega_cache'):
+        self.data_dir = str(data_dir)
+        self.snapshot = os.path.join(self.data_dir, f'{nome}.json')
+        self.journal = os.path.join(self.data_dir, f'{nome}.journal')
+        self.lock = os.path.join(self.data_dir, f'{nome}.lock')
+        self.dir_historico = os.path.join(self.data_dir, 'historico')
+        self.nome = nome
+
+    # --- leitura (sem trava) ---
+
+    def _le_snapshot(self):
+        try:
+            with open(self.snapshot, 'rb') as f:
+                dados = f.read()
+        except FileNotFoundError:
+            return [], _hash(b'')
+        return json.loads(dados) if dados.strip() else [], _hash(dados)
+
+    def le(self):
+        """`Leitura` do snapshot atual mais as linhas do journal que o estendem."""
+        concursos, base = self._le_snapshot()
+        leitura = Leitura(concursos, base)
+        for linha in self._linhas():
+            e = _entrada(linha)
+            if e.get('base') != base or e.get('n0') != len(leitura.concursos):
+                continue
+            leitura.concursos.extend(e['concursos'])
+            leitura.numeros.extend(e.get('numeros') or [None] * len(e['concursos']))
+            leitura.datas.extend(e.get('datas') or [None] * len(e['concursos']))
+            leitura.linhas += 1
+        return leitura
+
+    def arquivos(self):
+        """Caminhos cuja mudança indica histórico novo (para invalidar caches)."""
+        return (self.snapshot, self.journal)
+
+    # --- escrita (sob trava) ---
+
+    @contextmanager
+    def _travado(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        with trava(self.lock):
+            yield
+
+    def anexa(self, concursos, numeros=None, datas=None, apos=None):
+        """Acrescenta concursos ao journal (O(novos)); compacta quando ele cresce.
+        `apos(n0)` roda ainda sob a trava (n0 = concursos antes dos novos), para
+        atualizar caches derivados sem corrida com outro escritor."""
+        if not concursos:
+            return
+        with self._travado():
+            atual = self.le()
+            entrada = {'base': atual.base, 'n0': len(atual.concursos), 'concursos': [list(c) for c in concursos],
+                       'numeros': list(numeros) if numeros is not None else None,
+                       'datas': list(datas) if datas is not None else None}
+            with open(self.journal, 'ab') as f:
+                linha = (json.dumps(entrada) + '\n').encode('utf8')
+                if f.tell() and not self._termina_em_linha():
+                    linha = b'\n' + linha  # isola o resto de um write interrompido (linha inválida, ignorada)
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+            if atual.linhas + 1 >= COMPACTA:
+                self._snapshot(atual.concursos + entrada['concursos'], atual.base)
+            if apos is not None:
+                apos(entrada['n0'])
+
+    def grava(self, concursos, apos=None):
+        """Substitui o histórico inteiro por `concursos` (novo snapshot, journal vazio para ele).
+        `apos()` roda ainda sob a trava."""
+        with self._travado():
+            self._snapshot(concursos)
+            if apos is not None:
+                apos()
+
+    def compacta(self):
+        """Incorpora o journal num novo snapshot."""
+        with self._travado():
+            atual = self.le()
+            if atual.linhas:
+                self._snapshot(atual.concursos, atual.base)
+
+    def _linhas(self):
+        try:
+            with open(self.journal, 'rb') as f:
+                return f.read().split(b'\n')[:-1]  # o último pedaço não tem '\n': incompleto ou vazio
+        except FileNotFoundError:
+            return []
+
+    def _termina_em_linha(self):
+        with open(self.journal, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _snapshot(self, concursos, base=None):
+        if base is None:
+            base = self._le_snapshot()[1]
+        if os.path.exists(self.snapshot):
+            self._guarda_versao()
+        _grava_atomico(self.snapshot, json.dumps([list(c) for c in concursos]).encode('utf8'))
+        # as linhas do snapshot substituído ficam por mais um ciclo (o novo hash não casa com
+        # elas): um leitor que já abriu o snapshot antigo ainda encontra o seu journal
+        manter = [l for l in self._linhas() if _entrada(l).get('base') == base]
+        _grava_atomico(self.journal, b''.join(l + b'\n' for l in manter))
+
+    # --- versões anteriores ---
+
+    def _guarda_versao(self):
+        os.makedirs(self.dir_historico, exist_ok=True)
+        carimbo = datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')
+        destino = os.path.join(self.dir_historico, f'{self.nome}.{carimbo}.json')
+        try:
+            os.link(self.snapshot, destino)  # o snapshot nunca é alterado no lugar: o link basta
+        except OSError:
+            shutil.copy2(self.snapshot, destino)
+        for antiga in self.versoes()[MANTER:]:
+            try:
+                os.remove(antiga)
+            except OSError:
+                pass
+
+    def versoes(self):
+        """Snapshots anteriores guardados, do mais novo para o mais antigo."""
+        try:
+            nomes = os.listdir(self.dir_historico)
+        except FileNotFoundError:
+            return []
+        prefixo = self.nome + '.'
+        return [os.path.join(self.dir_historico, n)
+                for n in sorted((n for n in nomes if n.startswith(prefixo) and n.endswith('.json')), reverse=True)]
+
+    def restaura(self, versao):
+        """Volta o histórico para a versão `versao` (caminho ou nome em `versoes()`);
+        o estado atual também vira uma versão guardada."""
+        caminho = versao if os.path.isabs(versao) else os.path.join(self.dir_historico, versao)
+        with open(caminho, encoding='utf8') as f:
+            concursos = json.load(f)
+        self.grava(concursos)
+        return concursos
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+parallel.py
+Geração de jogos em vários núcleos (ProcessPoolExecutor).
+
+A quantidade pedida é dividida em shards de tamanho fixo (SHARD jogos); cada
+shard tem seu próprio gerador aleatório derivado de (seed, índice do shard).
+Como o particionamento não depende do número de workers e os resultados são
+juntados na ordem dos shards, a mesma seed produz a mesma saída com 1 ou N workers.
+Histórico e pesos chegam a cada worker uma única vez pelo `initializer`
+(herdados sem cópia com fork; serializados uma vez por worker com spawn).
+"""
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+SHARD = 10_000
+
+_CTX = {}
+
+
+def _inicia_worker(concursos, pesos, forcar_filtros, lote, pipeline=None):
+    if pipeline is None:
+        from .filters import padrao
+        pipeline = padrao()
+    _CTX.update(concursos=concursos, pesos=pesos, forcar_filtros=forcar_filtros, lote=lote, pipeline=pipeline)
+
+
+def _gera_shard(tarefa):
+    seed, indice, qtd = tarefa
+    concursos, pesos = _CTX['concursos'], _CTX['pesos']
+    forcar_filtros, lote, pipeline = _CTX['forcar_filtros'], _CTX['lote'], _CTX['pipeline']
+    if lote:
+        try:
+            import numpy as np
+            from .batch import gerar_jogos_lote
+        except ImportError:
+            pass
+        else:
+            ss = np.random.SeedSequence(seed, spawn_key=(indice,))
+            return gerar_jogos_lote(qtd, concursos, pesos, forcar_filtros, lote=lote, seed=ss, pipeline=pipeline)
+    from .sampler import AmostradorPonderado
+    rng = random.Random(f'{seed}:{indice}')
+    amostrador = AmostradorPonderado(pesos if concursos else None)
+    jogos = []
+    while len(jogos) < qtd:
+        j = amostrador.sorteia(6, rng)
+        if forcar_filtros or pipeline.aprova(j, concursos):
+            jogos.append(j)
+    return jogos
+
+
+def shards(quantidade, seed):
+    """Tarefas (seed, índice, qtd) que cobrem `quantidade` jogos."""
+    return [(seed, i, min(SHARD, quantidade - inicio))
+            for i, inicio in enumerate(range(0, quantidade, SHARD))]
+
+
+def iter_jogos_paralelo(quantidade, concursos, pesos, forcar_filtros=False, workers=None, seed=None, lote=None, pipeline=None):
+    """Como `gerar_jogos_paralelo`, mas entrega os jogos em ordem à medida que os shards
+    terminam, mantendo no máximo 2 shards por worker em andamento (memória limitada).
+    `pipeline` (`filters.Pipeline`) troca as regras padrão dos filtros."""
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 63)
+    tarefas = shards(quantidade, seed)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tarefas) or 1))
+    if workers == 1:
+        _inicia_worker(concursos, pesos, forcar_filtros, lote, pipeline)
+        for t in tarefas:
+            yield from _gera_shard(t)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_inicia_worker,
+                             initargs=(concursos, pesos, forcar_filtros, lote, pipeline)) as ex:
+        pendentes = deque()
+        for t in tarefas:
+            pendentes.append(ex.submit(_gera_shard, t))
+            if len(pendentes) >= 2 * workers:
+                yield from pendentes.popleft().result()
+        while pendentes:
+            yield from pendentes.popleft().result()
+
+
+def gerar_jogos_paralelo(quantidade, concursos, pesos, forcar_filtros=False, workers=None, seed=None, lote=None, pipeline=None):
+    """Gera `quantidade` jogos distribuindo shards entre `workers` processos
+    (padrão: os.cpu_count()). Resultado determinístico para uma `seed` fixa."""
+    return list(iter_jogos_paralelo(quantidade, concursos, pesos, forcar_filtros, workers, seed, lote, pipeline))
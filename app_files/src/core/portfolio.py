@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+portfolio.py
+Montagem de carteiras (fechamentos) que maximizam a cobertura de pares e trios
+distintos dentro de um orçamento em reais.
+
+A cobertura é guardada como bitsets sobre as 60 dezenas:
+- pares: `par[a]` (uint64) tem o bit b ligado se o par {a, b} já está coberto;
+- trios: `trio[a, b]` (uint64) tem o bit c ligado se o trio {a, b, c} está coberto.
+Para uma aposta com bitmask m e dezenas a_1..a_q, os pares novos são
+Σ popcount(m & ~par[a_i]) / 2 e os trios novos Σ_{i<j} popcount(m & ~trio[a_i, a_j]) / 3,
+calculados para milhões de candidatos de uma vez com numpy.
+
+A escolha é gulosa por ganho/custo (`custo_aposta`, apostas de 6 a 20 dezenas)
+com avaliação preguiçosa: como a cobertura só cresce, o último ganho calculado
+de cada candidato é um teto para o ganho atual. Cada tamanho mantém uma fila com
+os `lote` candidatos de maior teto; a cada passo só a fila é recalculada e, quando
+o melhor dela fica abaixo do teto dos de fora, só os candidatos cujo teto ainda
+alcança o melhor ganho atual.
+"""
+from itertools import combinations
+
+import numpy as np
+
+from .batch import mascaras
+from .filters import popcount_np
+
+LOTE = 1024
+_UM = np.uint64(1)
+
+
+class Cobertura:
+    """Pares e trios já cobertos pelas apostas escolhidas."""
+
+    def __init__(self, trios=True):
+        bits = np.left_shift(_UM, np.arange(60, dtype=np.uint64))
+        self.par = bits.copy()  # o próprio bit a conta como coberto
+        self.trio = (bits[:, None] | bits[None, :]) if trios else None
+
+    def ganho(self, J, M, peso_pares=1.0, peso_trios=1.0):
+        """Ganho ponderado de cada linha de `J` (N, q; dezenas 0..59 ordenadas) com bitmasks `M`."""
+        pares = np.zeros(len(M), dtype=np.int64)
+        for i in range(J.shape[1]):
+            pares += popcount_np(M & ~self.par[J[:, i]])
+        total = peso_pares * (pares // 2)
+        if self.trio is not None and peso_trios:
+            trios = np.zeros(len(M), dtype=np.int64)
+            for i, j in combinations(range(J.shape[1]), 2):
+                trios += popcount_np(M & ~self.trio[J[:, i], J[:, j]])
+            total = total + peso_trios * (trios // 3)
+        return total
+
+    def adiciona(self, dezenas):
+        """Marca como cobertos os pares/trios da aposta `dezenas` (0..59)."""
+        m = np.bitwise_or.reduce(np.left_shift(_UM, np.asarray(dezenas, dtype=np.uint64)))
+        for a in dezenas:
+            self.par[a] |= m
+        if self.trio is not None:
+            for a, b in combinations(dezenas, 2):
+                self.trio[a, b] |= m
+                self.trio[b, a] |= m
+
+    def pares(self):
+        return int((popcount_np(self.par).sum() - 60) // 2)
+
+    def trios(self):
+        if self.trio is None:
+            return None
+        sup = np.triu_indices(60, 1)
+        return int((popcount_np(self.trio[sup]).sum() - 2 * len(sup[0])) // 3)
+
+
+class _Grupo:
+    """Candidatos de um mesmo tamanho (mesmo custo), seus tetos de ganho e a fila
+    dos de maior teto."""
+
+    def __init__(self, jogos, custo):
+        jogos = np.sort(np.asarray(jogos, dtype=np.int64), axis=1)
+        # candidatos repetidos: únicos pelo bitmask (mais barato que np.unique por linha)
+        M, unicos = np.unique(mascaras(jogos), return_index=True)
+        self.J = (jogos[unicos] - 1).astype(np.intp)
+        self.M = M
+        self.custo = custo
+        self.ativo = np.ones(len(M), dtype=bool)
+        self.teto = np.full(len(M), np.inf)
+        self.fila = None
+        self.fora = np.inf  # maior teto de quem está fora da fila
+
+    def prepara(self, cob, peso_pares, peso_trios, lote, limiar=-np.inf):
+        """Recalcula o ganho dos ativos cujo teto alcança `limiar` (os demais não podem
+        vencer) e põe os `lote` de maior teto na fila."""
+        idx = np.flatnonzero(self.ativo & (self.teto >= limiar))
+        self.teto[idx] = cob.ganho(self.J[idx], self.M[idx], peso_pares, peso_trios)
+        teto = np.where(self.ativo, self.teto, -np.inf)
+        if len(teto) > lote:
+            ordem = np.argpartition(-teto, lote)
+            self.fila, self.fora = ordem[:lote], teto[ordem[lote]]
+        else:
+            self.fila, self.fora = np.arange(len(teto)), -np.inf
+
+    def melhor(self, cob, peso_pares, peso_trios):
+        """(ganho exato, índice) do melhor candidato da fila, ou None."""
+        self.fila = self.fila[self.ativo[self.fila]]
+        if not len(self.fila):
+            return None
+        ganho = cob.ganho(self.J[self.fila], self.M[self.fila], peso_pares, peso_trios)
+        self.teto[self.fila] = ganho
+        k = int(np.argmax(ganho))
+        return ganho[k], self.fila[k]
+
+
+def otimiza(candidatos, orcamento, custo, peso_pares=1.0, peso_trios=1.0, lote=LOTE):
+    """Escolhe apostas entre `candidatos` sem passar de `orcamento` reais; `custo(q)`
+    dá o preço de uma aposta com q dezenas (ex.: `engine.custo_aposta`).
+    `candidatos`: array (N, q), dict {q: array (N, q)} ou iterável de listas de
+    dezenas (tamanhos 6 a 20 misturados). Retorna dict com `apostas`, `custo`,
+    `pares` e `trios` cobertos."""
+    if isinstance(candidatos, np.ndarray):
+        por_tamanho = {candidatos.shape[1]: candidatos}
+    elif isinstance(candidatos, dict):
+        por_tamanho = candidatos
+    else:
+        por_tamanho = {}
+        for jogo in candidatos:
+            por_tamanho.setdefault(len(jogo), []).append(jogo)
+    grupos = [_Grupo(j, custo(q)) for q, j in sorted(por_tamanho.items()) if custo(q) > 0 and len(j)]
+    cob = Cobertura(trios=bool(peso_trios))
+    apostas, gasto = [], 0
+
+    while True:
+        restante = orcamento - gasto
+        abertos = [g for g in grupos if g.custo <= restante and g.ativo.any()]
+        if not abertos:
+            break
+        melhor, limite = _melhor(abertos, cob, peso_pares, peso_trios)
+        if melhor is None or melhor[0] < limite:
+            # algum candidato fora das filas ainda pode vencer: recalcula quem pode
+            for g in abertos:
+                limiar = melhor[0] * g.custo if melhor is not None else -np.inf
+                g.prepara(cob, peso_pares, peso_trios, lote, limiar)
+            melhor, _ = _melhor(abertos, cob, peso_pares, peso_trios)
+        if melhor is None or melhor[0] <= 0:
+            break
+        _, g, i = melhor
+        g.ativo[i] = False
+        cob.adiciona(g.J[i])
+        apostas.append((g.J[i] + 1).tolist())
+        gasto += g.custo
+    return {'apostas': apostas, 'custo': gasto, 'pares': cob.pares(), 'trios': cob.trios()}
+
+
+def _melhor(grupos, cob, peso_pares, peso_trios):
+    """((ganho/custo, grupo, índice) do melhor das filas, maior teto/custo fora delas)."""
+    melhor, limite = None, -np.inf
+    for g in grupos:
+        if g.fila is None:
+            limite = np.inf
+            continue
+        limite = max(limite, g.fora / g.custo)
+        r = g.melhor(cob, peso_pares, peso_trios)
+        if r is not None and (melhor is None or r[0] / g.custo > melhor[0]):
+            melhor = (r[0] / g.custo, g, r[1])
+    return melhor, limite
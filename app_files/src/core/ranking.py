@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+ranking.py
+Ranqueamento de cartelas (Tele Sena: 25 dezenas de 1 a 60) por distância de
+Mahalanobis, em fluxo, para dezenas de milhões de candidatas.
+
+Cada cartela vira um vetor de características (`CARACTERISTICAS`) calculado a
+partir da matriz de pertinência B (N, 60): as lineares (soma, pares, primos,
+baixas) saem de um único produto B @ A; as demais de reduções sobre B.
+`Modelo` estima média e covariância numa amostra de referência e fatora
+Σ = L·Lᵀ (Cholesky) uma única vez; com W = L⁻¹, d² = ‖W·(x - alvo)‖², então um
+bloco inteiro é pontuado com um produto de matrizes.
+
+O top-k é mantido num heap limitado a k entradas: cada bloco só contribui com os
+seus k melhores (argpartition) e só entra quem bate o pior do heap, então a
+memória não cresce com o número de candidatas. As candidatas são sorteadas em
+shards com gerador derivado de (seed, índice do shard) e empates são
+desempatados pela ordem de sorteio: a mesma seed dá o mesmo top-k com 1 ou N
+workers.
+"""
+import heapq
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .filters import PRIMOS
+
+UNIVERSO = 60
+TAMANHO = 25
+AMOSTRA = 50_000
+BLOCO = 1 << 15
+SHARD = 1 << 18
+
+CARACTERISTICAS = ('soma', 'pares', 'primos', 'baixas', 'decadas', 'finais', 'consecutivos', 'amplitude')
+
+_D = np.arange(1, UNIVERSO + 1)
+# colunas lineares: B @ _A dá soma, pares, primos e baixas (<= 30) de cada cartela
+_A = np.stack([_D, _D % 2 == 0, np.isin(_D, PRIMOS), _D <= UNIVERSO // 2], axis=1).astype(np.float64)
+
+_CTX = {}
+
+
+def pertinencia(cartelas):
+    """Matriz bool (N, 60) com B[i, d-1] = dezena d na cartela i."""
+    B = np.zeros((len(cartelas), UNIVERSO), dtype=bool)
+    for i, c in enumerate(cartelas):
+        B[i, np.asarray(c, dtype=np.intp) - 1] = True
+    return B
+
+
+def caracteristicas(B):
+    """Array (N, F) float64 das `CARACTERISTICAS` de cada linha de `B`."""
+    B = np.asarray(B, dtype=bool)
+    X = np.empty((len(B), len(CARACTERISTICAS)))
+    X[:, :4] = B.astype(np.float64) @ _A
+    grade = B.reshape(len(B), UNIVERSO // 10, 10)  # linhas = décadas (1-10, 11-20...), colunas = finais
+    X[:, 4] = grade.any(axis=2).sum(axis=1)
+    X[:, 5] = grade.any(axis=1).sum(axis=1)
+    X[:, 6] = (B[:, 1:] & B[:, :-1]).sum(axis=1)
+    X[:, 7] = (UNIVERSO - 1 - np.argmax(B[:, ::-1], axis=1)) - np.argmax(B, axis=1)
+    return X
+
+
+def sorteia(rng, n, tamanho=TAMANHO):
+    """Pertinência (n, 60) de `n` cartelas uniformes com `tamanho` dezenas distintas."""
+    R = rng.random((n, UNIVERSO))
+    corte = np.partition(R, tamanho - 1, axis=1)[:, tamanho - 1:tamanho]
+    return R <= corte
+
+
+class Modelo:
+    """Média e fator de Cholesky da covariância das características de `referencia`
+    (cartelas ou matriz de pertinência). `alvo`: cartela cujas características são o
+    centro das distâncias (padrão: a média, ou seja, as cartelas mais típicas)."""
+
+    def __init__(self, referencia, alvo=None):
+        B = referencia if isinstance(referencia, np.ndarray) and referencia.dtype == bool else pertinencia(referencia)
+        X = caracteristicas(B)
+        self.media = X.mean(axis=0)
+        cov = np.cov(X, rowvar=False)
+        # características constantes na referência (ex.: tamanho fixo) tornam Σ singular
+        cov += np.eye(len(cov)) * max(1e-9, 1e-9 * np.trace(cov))
+        L = np.linalg.cholesky(cov)
+        self.W = np.linalg.solve(L, np.eye(len(L)))  # L⁻¹: Σ⁻¹ = Wᵀ·W
+        self.centro = self.media if alvo is None else caracteristicas(pertinencia([alvo]))[0]
+
+    def distancias(self, B):
+        """d² de Mahalanobis (N,) de cada linha de `B` ao centro."""
+        Z = (caracteristicas(B) - self.centro) @ self.W.T
+        return np.einsum('ij,ij->i', Z, Z)
+
+
+class TopK:
+    """Os k menores (distância, ordem) vistos até agora, num heap de tamanho k."""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []  # (-d, -ordem, cartela): o pior fica na raiz
+        self._vistas = set()
+
+    def pior(self):
+        return -self._heap[0][0] if len(self._heap) >= self.k else np.inf
+
+    def oferece(self, d, ordem, cartela):
+        if cartela in self._vistas:
+            return
+        item = (-d, -ordem, cartela)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            self._vistas.discard(heapq.heappushpop(self._heap, item)[2])
+        else:
+            return
+        self._vistas.add(cartela)
+
+    def adiciona_bloco(self, dist, B, ordem0):
+        """Considera um bloco: só os k melhores dele que batem o pior do heap."""
+        if len(dist) > self.k:
+            idx = np.argpartition(dist, self.k - 1)[:self.k]
+        else:
+            idx = np.arange(len(dist))
+        idx = idx[dist[idx] <= self.pior()]
+        for i in idx[np.lexsort((idx, dist[idx]))]:
+            self.oferece(float(dist[i]), ordem0 + int(i), tuple((np.flatnonzero(B[i]) + 1).tolist()))
+
+    def junta(self, itens):
+        for d, ordem, cartela in itens:
+            self.oferece(d, ordem, cartela)
+
+    def itens(self):
+        """Lista (distância, ordem, cartela) do melhor para o pior."""
+        return sorted((-d, -o, c) for d, o, c in self._heap)
+
+
+def _ranqueia_shard(modelo, k, tamanho, seed, indice, qtd, bloco=BLOCO):
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(indice,)))
+    top = TopK(k)
+    base = indice * SHARD
+    for ini in range(0, qtd, bloco):
+        B = sorteia(rng, min(bloco, qtd - ini), tamanho)
+        top.adiciona_bloco(modelo.distancias(B), B, base + ini)
+    return top.itens()
+
+
+def _inicia_worker(modelo, k, tamanho, seed):
+    _CTX.update(modelo=modelo, k=k, tamanho=tamanho, seed=seed)
+
+
+def _roda_shard(tarefa):
+    indice, qtd = tarefa
+    return _ranqueia_shard(_CTX['modelo'], _CTX['k'], _CTX['tamanho'], _CTX['seed'], indice, qtd)
+
+
+def ranqueia(modelo, candidatos, k=10, tamanho=TAMANHO, workers=None, seed=None):
+    """Top-k (menor distância) entre `candidatos` cartelas sorteadas uniformemente.
+    Com `workers` > 1 os shards vão para um pool de processos (o modelo chega uma
+    vez por worker pelo initializer; 0 = um por núcleo). Retorna lista de (cartela, distância)."""
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 63)
+    tarefas = [(i, min(SHARD, candidatos - ini)) for i, ini in enumerate(range(0, candidatos, SHARD))]
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers or 1, len(tarefas) or 1))
+    top = TopK(k)
+    if workers == 1:
+        for indice, qtd in tarefas:
+            top.junta(_ranqueia_shard(modelo, k, tamanho, seed, indice, qtd))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicia_worker,
+                                 initargs=(modelo, k, tamanho, seed)) as ex:
+            pendentes = deque()
+            for t in tarefas:
+                pendentes.append(ex.submit(_roda_shard, t))
+                if len(pendentes) >= 2 * workers:
+                    top.junta(pendentes.popleft().result())
+            while pendentes:
+                top.junta(pendentes.popleft().result())
+    return [(list(c), d) for d, _, c in top.itens()]
+
+
+def ranqueia_blocos(modelo, blocos, k=10):
+    """Top-k de candidatas fornecidas em blocos (arrays (n, q) de dezenas ou
+    matrizes de pertinência), em fluxo. Retorna lista de (cartela, distância)."""
+    top = TopK(k)
+    visto = 0
+    for bloco in blocos:
+        bloco = np.asarray(bloco)
+        B = bloco if bloco.dtype == bool else pertinencia(bloco)
+        top.adiciona_bloco(modelo.distancias(B), B, visto)
+        visto += len(B)
+    return [(list(c), d) for d, _, c in top.itens()]
+
+
+def modelo_padrao(tamanho=TAMANHO, amostra=AMOSTRA, alvo=None, seed=0):
+    """`Modelo` com referência de `amostra` cartelas uniformes (reprodutível por `seed`)."""
+    return Modelo(sorteia(np.random.default_rng(seed), amostra, tamanho), alvo)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+saida.py
+Escritores em blocos (stdout, CSV, PDF) para lotes grandes de jogos.
+
+Os jogos chegam de um iterador (ex.: `engine.iter_jogos`) e são consumidos em
+blocos de tamanho fixo: cada escritor recebe um bloco por vez e grava com uma
+única chamada, de forma que a memória fica limitada ao tamanho do bloco.
+"""
+import csv
+import datetime
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+BLOCO = 10_000
+POR_PAGINA = 12
+
+
+def formata(i, jogo):
+    return f"{i:02d}: " + ' - '.join(f"{d:02d}" for d in jogo)
+
+
+class SaidaTexto:
+    """Linhas 'NN: DD - DD - ...' em um arquivo texto (padrão: stdout), um write por bloco."""
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo if arquivo is not None else sys.stdout
+
+    def escreve(self, inicio, jogos):
+        self.arquivo.write(''.join(formata(i, j) + '\n' for i, j in enumerate(jogos, inicio)))
+
+    def fecha(self):
+        self.arquivo.flush()
+
+
+class SaidaCSV:
+    """CSV 'Numero;D1;...;D6' (mesmo formato de `engine.salva_csv`). Apostas com mais
+    dezenas (carteiras) precisam de `largura` (o tamanho da maior aposta): o cabeçalho
+    vai até D<largura> e as apostas menores completam a linha com campos vazios.
+    Como o cabeçalho é escrito antes do primeiro bloco, uma aposta maior que `largura`
+    é um erro (ValueError), e não uma linha mais larga que o cabeçalho.
+    `registro` (`dedup.RegistroApostas`, opcional) recebe os jogos de 6 dezenas gravados,
+    mas não filtra nada: quem descarta os já emitidos é o gerador (`engine.iter_jogos`,
+    `recomendar_numeros`, `monta_carteira`, que já entregam os jogos registrados). Jogos
+    de outra origem são gravados como vieram e só marcados para as próximas execuções."""
+
+    def __init__(self, caminho, registro=None, largura=6):
+        self.caminho = caminho
+        self.registro = registro
+        self.largura = largura
+        self._f = open(caminho, 'w', encoding='utf8', newline='', buffering=1 << 20)
+        self._w = csv.writer(self._f, delimiter=';')
+        self._w.writerow(['Numero'] + [f'D{i}' for i in range(1, largura + 1)])
+
+    def escreve(self, inicio, jogos):
+        maior = max(map(len, jogos))
+        if maior > self.largura:
+            raise ValueError(f'aposta com {maior} dezenas não cabe no CSV de {self.largura} colunas '
+                             f'(informe largura={maior} ou mais)')
+        vazio = [''] * self.largura
+        self._w.writerows([f'{i:02d}'] + [f'{d:02d}' for d in j] + vazio[len(j):]
+                          for i, j in enumerate(jogos, inicio))
+        if self.registro is not None:
+            seis = [j for j in jogos if len(j) == 6]
+            if seis:
+                self.registro.registra_lote(seis)
+
+    def fecha(self):
+        self._f.close()
+        if self.registro is not None:
+            self.registro.salva()
+
+
+class SaidaPDF:
+    """PDF com 12 jogos por página. Só a página corrente é montada a partir do bloco;
+    as linhas já paginadas não ficam retidas por este escritor."""
+
+    def __init__(self, caminho):
+        from fpdf import FPDF
+        self.caminho = caminho
+        self._pdf = FPDF()
+        self._pdf.set_auto_page_break(True, margin=10)
+        self._na_pagina = POR_PAGINA
+
+    def _nova_pagina(self):
+        pdf = self._pdf
+        pdf.add_page()
+        pdf.set_font('Helvetica', 'B', 14)
+        pdf.cell(0, 10, f'Mega – Volantes gerados em {datetime.date.today():%d/%m/%Y}', ln=True, align='C')
+        pdf.ln(6)
+        pdf.set_font('Helvetica', '', 12)
+        self._na_pagina = 0
+
+    def escreve(self, inicio, jogos):
+        for i, j in enumerate(jogos, inicio):
+            if self._na_pagina == POR_PAGINA:
+                self._nova_pagina()
+            self._pdf.cell(0, 6, formata(i, j), ln=True)
+            self._na_pagina += 1
+
+    def fecha(self):
+        self._pdf.output(self.caminho)
+
+
+def escreve_em_blocos(jogos, saidas, bloco=BLOCO, medir=None):
+    """Consome o iterável `jogos` em blocos e repassa cada bloco a todas as `saidas`.
+    `medir` (ex.: `stats.Estatisticas.mede`) separa o tempo de 'geracao' (consumo
+    do iterável) do de 'escrita'. Retorna a quantidade de jogos escritos."""
+    if medir is None:
+        medir = _sem_medicao
+    it = iter(jogos)
+    total = 0
+    ok = False
+    try:
+        while True:
+            with medir('geracao'):
+                parte = list(islice(it, bloco))
+            if not parte:
+                break
+            with medir('escrita'):
+                for s in saidas:
+                    s.escreve(total + 1, parte)
+            total += len(parte)
+        ok = True
+    finally:
+        # fecha todas as saídas mesmo que uma falhe (o CSV ainda grava o registro de apostas);
+        # a primeira falha sobe depois, sem encobrir um erro da escrita
+        erro = None
+        with medir('escrita'):
+            for s in saidas:
+                try:
+                    s.fecha()
+                except Exception as e:
+                    if erro is None:
+                        erro = e
+        if erro is not None and ok:
+            raise erro
+    return total
+
+
+def _sem_medicao(etapa, _nulo=nullcontext()):
+    return _nulo
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+sampler.py
+Sorteio ponderado SEM reposição de dezenas, montado uma vez a partir dos pesos.
+
+Sorteia uma dezena por vez com probabilidade proporcional ao peso entre as que
+ainda restam (sorteio sucessivo), então não há dezenas repetidas nem descartes
+por repetição:
+- `sorteia`: versão escalar; busca binária nas somas acumuladas pré-calculadas,
+  "pulando" os intervalos das dezenas já escolhidas (com pesos tão desiguais que
+  as somas perdem precisão, refaz a soma só das restantes);
+- `sorteia_lote`: versão numpy equivalente, com chaves de Efraimidis–Spirakis
+  (E_d / w_d, E_d ~ Exponencial(1); as k menores chaves formam o jogo).
+"""
+import random
+from bisect import bisect_right, insort
+from math import fsum
+
+DEZENAS = tuple(range(1, 61))
+# abaixo desta fração da soma total as somas acumuladas já não distinguem as dezenas restantes
+_PRECISAO = 1e-9
+
+
+class AmostradorPonderado:
+    """Amostrador reutilizável construído a partir de {dezena: peso} (ou pesos
+    em ordem 1..60). Pesos zero nunca são escolhidos enquanto houver positivos."""
+
+    __slots__ = ('_w', '_inicio', '_fim', '_total', '_inv_np')
+
+    def __init__(self, pesos=None):
+        if pesos is None:
+            w = [1.0] * len(DEZENAS)
+        elif isinstance(pesos, dict):
+            w = [float(pesos[d]) for d in DEZENAS]
+        else:
+            w = [float(p) for p in pesos]
+        inicio, fim, acc = [], [], 0.0
+        for p in w:
+            inicio.append(acc)
+            acc += p
+            fim.append(acc)
+        self._w = tuple(w)
+        self._inicio = tuple(inicio)
+        self._fim = tuple(fim)
+        self._total = acc
+        self._inv_np = None
+
+    def sorteia(self, k=6, rng=random):
+        """Um jogo ordenado com `k` dezenas distintas (`rng`: módulo random ou random.Random)."""
+        w, inicio, fim = self._w, self._inicio, self._fim
+        if not 0 <= k <= len(w):
+            raise ValueError(f'k deve estar entre 0 e {len(w)}')
+        ultimo = len(w) - 1
+        total = self._total
+        minimo = total * _PRECISAO
+        escolhidos = []
+        for _ in range(k):
+            if total > minimo:
+                u = rng.random() * total
+                # desloca u para além dos intervalos já removidos (em ordem crescente)
+                for i in escolhidos:
+                    if u < inicio[i]:
+                        break
+                    u += w[i]
+                i = bisect_right(fim, u)
+                if i > ultimo:
+                    i = ultimo
+                if not w[i] or i in escolhidos:  # arredondamento na borda de um intervalo
+                    i = self._sorteia_restantes(escolhidos, rng)
+            else:
+                # a massa que resta se perdeu no arredondamento das somas acumuladas
+                # (pesos muito desiguais, ou só pesos zero): sorteio exato entre as restantes
+                i = self._sorteia_restantes(escolhidos, rng)
+            insort(escolhidos, i)
+            total -= w[i]
+        return [i + 1 for i in escolhidos]
+
+    def _sorteia_restantes(self, escolhidos, rng):
+        """Índice sorteado proporcionalmente ao peso entre os não escolhidos, com as somas
+        refeitas só sobre eles (uniforme se todos os restantes pesam zero)."""
+        livres = [i for i in range(len(self._w)) if i not in escolhidos]
+        pesos = [self._w[i] for i in livres]
+        total = fsum(pesos)
+        if not total > 0:
+            return livres[int(rng.random() * len(livres))]
+        u = rng.random() * total
+        acc = 0.0
+        for i, p in zip(livres, pesos):
+            acc += p
+            if u < acc:
+                return i
+        return next(i for i, p in zip(reversed(livres), reversed(pesos)) if p > 0)
+
+    def sorteia_lote(self, rng, n, k=6):
+        """`n` jogos de uma vez como array numpy (n, k) ordenado por linha (`rng`: numpy Generator)."""
+        import numpy as np
+        if self._inv_np is None:
+            w = np.array(self._w, dtype=np.float64)
+            with np.errstate(divide='ignore'):
+                self._inv_np = np.where(w > 0, 1.0 / w, np.inf)
+        chaves = rng.standard_exponential((n, len(DEZENAS)))
+        chaves *= self._inv_np
+        bloco = np.argpartition(chaves, k - 1, axis=1)[:, :k] + 1
+        bloco.sort(axis=1)
+        return bloco
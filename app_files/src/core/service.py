@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+service.py
+Modo serviço: servidor HTTP (asyncio, só biblioteca padrão) em localhost que
+mantém o histórico e as estatísticas derivadas quentes entre chamadas.
+
+Endpoints (GET com query string ou POST com corpo JSON; respostas em JSON):
+  /saude                                   concursos carregados e versão do estado
+  /jogos?quantidade=20&seed=&lote=&tabela=&forca=
+  /top?n=10&recent_n=100&alpha=0.6&decay=linear&decay_lambda=0.05
+  /recomendacao?qtd=6&seed=&tabela=&forca=
+  /confere   POST {"jogos": [[...], ...], "sorteio": [...], "historico": true}
+
+A geração roda num pool de executores (processos com o estado já carregado, ou
+threads com `workers=0`), para não bloquear o laço de eventos. Pedidos
+concorrentes compatíveis (mesmos parâmetros, sem `seed`) são agrupados: os que
+chegam dentro de `JANELA` segundos viram uma única chamada ao motor, cujo
+resultado é repartido entre eles. Pedidos com `seed` rodam sozinhos para
+continuarem reprodutíveis (em /jogos, sem `lote` nem `tabela`, pelo motor vetorizado
+com `LOTE_SEED`, já que o sequencial ignora a seed).
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from . import engine
+
+HOST = '127.0.0.1'
+PORTA = 8765
+JANELA = 0.005
+LIMITE = 100_000  # jogos/bilhetes por pedido
+LOTE_SEED = 50_000  # lote de /jogos com `seed` e sem `lote`/`tabela`
+_CORPO_MAX = 16 << 20
+
+_STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class ErroPedido(ValueError):
+    """Parâmetro inválido: vira resposta 400."""
+
+
+# --- tarefas executadas no pool (funções de módulo: precisam ser serializáveis) ---
+
+def _inicia_worker(filtros):
+    # cada processo carrega o histórico uma vez e o mantém quente; com fork o estado
+    # do `random` viria copiado do pai e todos os workers sorteariam os mesmos jogos
+    random.seed()
+    if filtros is not None:
+        engine.configura_filtros(filtros)
+    engine.estado().concursos()
+
+
+def _gera_agrupado(chave, quantidades, seed=None):
+    """Gera sum(quantidades) jogos numa chamada e reparte na ordem dos pedidos."""
+    forca, lote, tabela = chave
+    jogos = engine.gerar_jogos(sum(quantidades), forcar_filtros=forca, lote=lote, seed=seed, tabela=tabela)
+    partes, ini = [], 0
+    for q in quantidades:
+        partes.append(jogos[ini:ini + q])
+        ini += q
+    return partes
+
+
+def _recomenda_agrupado(chave, pedidos, seed=None):
+    qtd, forca, tabela = chave
+    return [engine.recomendar_numeros(qtd, seed=seed, forcar_filtros=forca, tabela=tabela) for _ in pedidos]
+
+
+def _confere(jogos, sorteio, historico):
+    checker = engine._core('checker')
+    conf = checker.Conferencia(sorteio, engine.mascaras_concursos() if historico else None)
+    colunas = conf.confere_bloco(*checker.codifica(jogos))
+    resposta = conf.resumo()
+    resposta['bilhetes'] = [{nome: int(v[i]) for nome, v in colunas.items()} for i in range(len(jogos))]
+    return resposta
+
+
+class Agrupador:
+    """Junta pedidos concorrentes com a mesma chave numa única chamada de `funcao(chave, args)`,
+    que deve devolver um resultado por argumento, na mesma ordem."""
+
+    def __init__(self, executor, funcao, janela=JANELA):
+        self.executor = executor
+        self.funcao = funcao
+        self.janela = janela
+        self._pendentes = {}
+
+    async def pede(self, chave, arg):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        fila = self._pendentes.get(chave)
+        if fila is None:
+            fila = self._pendentes[chave] = []
+            loop.call_later(self.janela, lambda: asyncio.ensure_future(self._despacha(chave)))
+        fila.append((arg, fut))
+        return await fut
+
+    async def _despacha(self, chave):
+        fila = self._pendentes.pop(chave)
+        try:
+            resultados = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.funcao, chave, [a for a, _ in fila])
+        except Exception as e:
+            for _, fut in fila:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), r in zip(fila, resultados):
+            if not fut.done():
+                fut.set_result(r)
+
+
+def _int(params, nome, padrao=None, minimo=None, maximo=None):
+    valor = params.get(nome)
+    if valor in (None, ''):
+        return padrao
+    try:
+        valor = int(valor)
+    except (TypeError, ValueError):
+        raise ErroPedido(f'{nome} deve ser inteiro')
+    if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+        raise ErroPedido(f'{nome} fora do intervalo [{minimo}, {maximo}]')
+    return valor
+
+
+def _float(params, nome, padrao):
+    valor = params.get(nome)
+    if valor in (None, ''):
+        return padrao
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ErroPedido(f'{nome} deve ser número')
+
+
+def _bool(params, nome):
+    valor = params.get(nome, False)
+    if isinstance(valor, str):
+        return valor.lower() in ('1', 'true', 'sim', 'yes', 'on')
+    return bool(valor)
+
+
+def _dezenas(valor, nome, tamanhos=range(6, 21)):
+    if isinstance(valor, str):
+        valor = [d for d in valor.replace(' ', '').split(',') if d]
+    try:
+        dezenas = [int(d) for d in valor]
+    except (TypeError, ValueError):
+        raise ErroPedido(f'{nome}: dezenas inválidas')
+    if len(dezenas) not in tamanhos or len(set(dezenas)) != len(dezenas) or not all(1 <= d <= 60 for d in dezenas):
+        raise ErroPedido(f'{nome}: esperado {min(tamanhos)} a {max(tamanhos)} dezenas distintas entre 1 e 60')
+    return sorted(dezenas)
+
+
+def _tamanho_corpo(valor):
+    """Content-Length como inteiro >= 0 (0 se ausente); None se inválido."""
+    if valor in (None, ''):
+        return 0
+    if not (valor.isascii() and valor.isdigit()):  # recusa sinal, espaços, '²', cabeçalho repetido ('5, 5')
+        return None
+    return int(valor)
+
+
+class Servico:
+    """Servidor HTTP do motor. `workers` processos para a geração (0 = threads no próprio processo)."""
+
+    def __init__(self, host=HOST, porta=PORTA, workers=1, filtros=None, janela=JANELA):
+        self.host = host
+        self.porta = porta
+        self.workers = workers
+        self.filtros = filtros
+        self.janela = janela
+        self.servidor = None
+
+    def _abre_executores(self):
+        if self.filtros is not None:
+            engine.configura_filtros(self.filtros)
+        config = engine.pipeline_filtros().config
+        if self.workers:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_inicia_worker, initargs=(config,))
+        else:
+            self.pool = ThreadPoolExecutor(os.cpu_count() or 1)
+        # consultas leves usam o estado quente deste processo
+        self.threads = ThreadPoolExecutor(4)
+        self.jogos = Agrupador(self.pool, _gera_agrupado, self.janela)
+        self.recomendacoes = Agrupador(self.pool, _recomenda_agrupado, self.janela)
+
+    async def inicia(self):
+        self._abre_executores()
+        loop = asyncio.get_running_loop()
+        # aquece histórico e derivados antes de aceitar conexões
+        await loop.run_in_executor(self.threads, engine.estado().concursos)
+        if self.workers:
+            await asyncio.gather(*(loop.run_in_executor(self.pool, int) for _ in range(self.workers)))
+        self.servidor = await asyncio.start_server(self._conexao, self.host, self.porta)
+        self.porta = self.servidor.sockets[0].getsockname()[1]
+        logging.info(f'Serviço ouvindo em http://{self.host}:{self.porta}')
+        return self.servidor
+
+    async def fecha(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        self.pool.shutdown(cancel_futures=True)
+        self.threads.shutdown(cancel_futures=True)
+
+    async def serve(self):
+        await self.inicia()
+        try:
+            async with self.servidor:
+                await self.servidor.serve_forever()
+        finally:
+            await self.fecha()
+
+    # --- HTTP ---
+
+    async def _conexao(self, reader, writer):
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, alvo, versao = linha.decode('latin-1').split()
+                except ValueError:
+                    await self._responde(writer, 400, {'erro': 'linha de requisição inválida'}, False)
+                    break
+                cabecalhos = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = h.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                tamanho = _tamanho_corpo(cabecalhos.get('content-length'))
+                if tamanho is None:
+                    # sem um tamanho confiável não há como achar o fim do corpo: fecha a conexão
+                    await self._responde(writer, 400, {'erro': 'Content-Length inválido'}, False)
+                    break
+                if tamanho > _CORPO_MAX:
+                    await self._responde(writer, 413, {'erro': 'corpo grande demais'}, False)
+                    break
+                corpo = await reader.readexactly(tamanho) if tamanho else b''
+                mantem = (cabecalhos.get('connection', '').lower() != 'close'
+                          and (versao != 'HTTP/1.0' or cabecalhos.get('connection', '').lower() == 'keep-alive'))
+                status, resposta = await self._trata(metodo, alvo, corpo)
+                await self._responde(writer, status, resposta, mantem)
+                if not mantem:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _responde(self, writer, status, resposta, mantem):
+        corpo = json.dumps(resposta, ensure_ascii=False).encode('utf8')
+        writer.write((f'HTTP/1.1 {status} {_STATUS[status]}\r\n'
+                      'Content-Type: application/json; charset=utf-8\r\n'
+                      f'Content-Length: {len(corpo)}\r\n'
+                      f"Connection: {'keep-alive' if mantem else 'close'}\r\n\r\n").encode('latin-1') + corpo)
+        await writer.drain()
+
+    async def _trata(self, metodo, alvo, corpo):
+        url = urlsplit(alvo)
+        rota = getattr(self, '_rota_' + url.path.strip('/'), None) if url.path.strip('/').isidentifier() else None
+        if rota is None:
+            return 404, {'erro': f'rota desconhecida: {url.path}'}
+        if metodo not in ('GET', 'POST'):
+            return 405, {'erro': f'método não suportado: {metodo}'}
+        try:
+            params = dict(parse_qsl(url.query))
+            if corpo:
+                dados = json.loads(corpo)
+                if not isinstance(dados, dict):
+                    raise ErroPedido('corpo JSON deve ser um objeto')
+                params.update(dados)
+            return 200, await rota(params)
+        except (ErroPedido, json.JSONDecodeError) as e:
+            return 400, {'erro': str(e)}
+        except Exception as e:
+            logging.exception('Erro no serviço')
+            return 500, {'erro': str(e)}
+
+    # --- rotas ---
+
+    async def _rota_saude(self, params):
+        est = engine.estado()
+        return {'concursos': len(est.concursos()), 'versao': est.versao, 'workers': self.workers}
+
+    async def _rota_jogos(self, params):
+        quantidade = _int(params, 'quantidade', 20, 1, LIMITE)
+        seed = _int(params, 'seed')
+        chave = (_bool(params, 'forca'), _int(params, 'lote', None, 1), _bool(params, 'tabela'))
+        if seed is not None:
+            if not chave[1] and not chave[2]:
+                # o gerador sequencial não usa `seed`: o pedido vai para o vetorizado
+                chave = (chave[0], LOTE_SEED, False)
+            partes = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _gera_agrupado, chave, [quantidade], seed)
+            return {'jogos': partes[0]}
+        return {'jogos': await self.jogos.pede(chave, quantidade)}
+
+    async def _rota_top(self, params):
+        decay = params.get('decay', 'linear')
+        if decay not in ('linear', 'exp'):
+            raise ErroPedido("decay deve ser 'linear' ou 'exp'")
+        args = (_int(params, 'n', 10, 1, 60), _int(params, 'recent_n', 100, 1),
+                _float(params, 'alpha', 0.6), decay, _float(params, 'decay_lambda', 0.05))
+        top = await asyncio.get_running_loop().run_in_executor(self.threads, engine.top_dezenas_params, *args)
+        return {'top': [[d, s] for d, s in top]}
+
+    async def _rota_recomendacao(self, params):
+        qtd = _int(params, 'qtd', 6, 6, 20)
+        seed = _int(params, 'seed')
+        chave = (qtd, _bool(params, 'forca'), _bool(params, 'tabela'))
+        if seed is not None:
+            r = await asyncio.get_running_loop().run_in_executor(self.pool, _recomenda_agrupado, chave, [None], seed)
+            return {'dezenas': r[0]}
+        return {'dezenas': await self.recomendacoes.pede(chave, None)}
+
+    async def _rota_confere(self, params):
+        jogos = params.get('jogos')
+        if not isinstance(jogos, list) or not jogos:
+            raise ErroPedido('informe "jogos": lista de listas de dezenas')
+        if len(jogos) > LIMITE:
+            raise ErroPedido(f'no máximo {LIMITE} bilhetes por pedido')
+        jogos = [_dezenas(j, 'jogos') for j in jogos]
+        sorteio = _dezenas(params['sorteio'], 'sorteio', (6,)) if params.get('sorteio') is not None else None
+        historico = _bool(params, 'historico') if 'historico' in params else True
+        if sorteio is None and not historico:
+            raise ErroPedido('nada a conferir: informe "sorteio" ou historico=true')
+        return await asyncio.get_running_loop().run_in_executor(self.threads, _confere, jogos, sorteio, historico)
+
+
+def serve(host=HOST, porta=PORTA, workers=1, filtros=None):
+    """Roda o serviço até Ctrl+C."""
+    try:
+        asyncio.run(Servico(host, porta, workers, filtros).serve())
+    except KeyboardInterrupt:
+        print('Serviço encerrado.', file=sys.stderr)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+state.py
+Estado do histórico compartilhado pelo processo (memoização com invalidação por mtime).
+
+Mantém os concursos carregados, a frequência por dezena e valores derivados
+(pesos, scores) até que o arquivo de cache mude (mtime/tamanho) ou alguém chame
+`invalidar()`. Quando a nova carga apenas acrescenta concursos ao fim, a
+frequência é atualizada de forma incremental em vez de recalculada.
+"""
+import os
+import threading
+
+
+def _hash_linha(concurso):
+    return hash(tuple(int(d) for d in concurso))
+
+
+class EstadoHistorico:
+    """Histórico + estatísticas derivadas, seguro para uso entre threads.
+
+    `carregar`: função sem argumentos que retorna a lista de concursos.
+    `arquivos`: função sem argumentos que retorna os caminhos a observar.
+    """
+
+    def __init__(self, carregar, arquivos):
+        self._carregar = carregar
+        self._arquivos = arquivos
+        self._lock = threading.RLock()
+        self._assinatura = None
+        self._concursos = None
+        self._fim = (0, None)  # (nº de concursos, hash do último) da carga atual
+        self._freq = None
+        self._derivados = {}
+        self._travas = {}  # chave -> Lock do cálculo daquele derivado
+        self.versao = 0
+
+    def _assinatura_atual(self):
+        sig = []
+        for p in self._arquivos():
+            try:
+                st = os.stat(p)
+                sig.append((p, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((p, None, None))
+        return tuple(sig)
+
+    def _atualiza(self):
+        # assinatura tirada antes da carga: uma gravação no meio dela muda a assinatura
+        # em disco e força nova carga no próximo acesso, em vez de ficar mascarada
+        assinatura = self._assinatura_atual()
+        if self._concursos is not None and self._assinatura == assinatura:
+            return
+        novos = self._carregar()
+        n, fim = self._fim if self._concursos is not None else (0, None)
+        apenas_anexou = (
+            self._concursos is not None and len(novos) >= n
+            and (n == 0 or _hash_linha(novos[n - 1]) == fim)
+        )
+        if apenas_anexou:
+            freq = dict(self._freq)
+            for c in novos[n:]:
+                for d in c:
+                    freq[d] = freq.get(d, 0) + 1
+        else:
+            freq = {d: 0 for d in range(1, 61)}
+            for c in novos:
+                for d in c:
+                    freq[d] = freq.get(d, 0) + 1
+        self._concursos = novos
+        self._fim = (len(novos), _hash_linha(novos[-1]) if len(novos) else None)
+        self._freq = freq
+        self._derivados = {}
+        self._assinatura = assinatura
+        self.versao += 1
+
+    def invalidar(self):
+        """Força nova checagem/carga no próximo acesso (usado quando um loader grava o cache)."""
+        with self._lock:
+            self._assinatura = None
+
+    def concursos(self):
+        with self._lock:
+            self._atualiza()
+            return self._concursos
+
+    def frequencia(self):
+        """Cópia do dict {dezena: ocorrências}."""
+        with self._lock:
+            self._atualiza()
+            return dict(self._freq)
+
+    def derivado(self, chave, calcula):
+        """Retorna `calcula(concursos, freq)` memoizado por `chave` até a próxima mudança do histórico.
+        O cálculo roda fora da trava do estado (quem lê `concursos()` ou outra chave não
+        espera por ele); chamadas simultâneas da mesma chave calculam uma vez só. Se o
+        histórico mudar durante o cálculo, o valor é devolvido mas não guardado."""
+        with self._lock:
+            self._atualiza()
+            if chave in self._derivados:
+                return self._derivados[chave]
+            trava = self._travas.setdefault(chave, threading.Lock())
+        with trava:
+            with self._lock:
+                self._atualiza()
+                if chave in self._derivados:  # calculado por quem segurava a trava da chave
+                    return self._derivados[chave]
+                versao, concursos, freq = self.versao, self._concursos, self._freq
+            valor = calcula(concursos, freq)
+            with self._lock:
+                if self.versao == versao:
+                    self._derivados[chave] = valor
+            return valor
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+stats.py
+Instrumentação opcional dos pontos quentes: rejeições por filtro, candidatos
+por jogo aceito e tempo gasto por etapa (carga, pontuação, geração, escrita).
+
+Desligada por padrão: o motor só consulta `engine.STATS is not None` antes de
+registrar qualquer coisa. Ligue com `engine.ativa_estatisticas()` ou `--stats`.
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class Estatisticas:
+    """Acumula contadores e tempos; `relatorio()` devolve um dict serializável em JSON."""
+
+    def __init__(self):
+        self.rejeicoes = Counter()
+        self.candidatos = 0
+        self.aceitos = 0
+        self.tempos = Counter()
+        self.chamadas = Counter()
+        self._inicio = time.perf_counter()
+
+    def avalia(self, motivo):
+        """Registra um candidato avaliado; `motivo` é o nome da regra que o rejeitou (ou None)."""
+        self.candidatos += 1
+        if motivo is None:
+            self.aceitos += 1
+        else:
+            self.rejeicoes[motivo] += 1
+
+    def avalia_lote(self, candidatos, rejeicoes, descartados=0):
+        """Versão em lote: `rejeicoes` é {regra: quantidade}; `descartados` são
+        aprovados que não chegaram a ser entregues (corte do último bloco)."""
+        rejeitados = 0
+        for regra, n in rejeicoes.items():
+            if n:
+                self.rejeicoes[regra] += int(n)
+                rejeitados += int(n)
+        self.candidatos += int(candidatos)
+        self.aceitos += int(candidatos) - rejeitados - int(descartados)
+
+    @contextmanager
+    def mede(self, etapa):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[etapa] += time.perf_counter() - t0
+            self.chamadas[etapa] += 1
+
+    def relatorio(self):
+        return {
+            'candidatos': self.candidatos,
+            'aceitos': self.aceitos,
+            'candidatos_por_jogo': round(self.candidatos / self.aceitos, 4) if self.aceitos else None,
+            'rejeicoes_por_filtro': dict(self.rejeicoes.most_common()),
+            'tempo_s': {k: round(v, 6) for k, v in self.tempos.items()},
+            'chamadas': dict(self.chamadas),
+            'total_s': round(time.perf_counter() - self._inicio, 6),
+        }
+
+    def json(self, **kw):
+        return json.dumps(self.relatorio(), ensure_ascii=False, **kw)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+sweep.py
+Varredura vetorizada dos parâmetros de `engine.top_dezenas_params`.
+
+O histórico vira uma matriz one-hot X (L concursos x 60 dezenas). Para cada
+janela recente (início s = L - recent_n) a recência é uma soma ponderada das
+linhas de X a partir de s:
+- linear: peso (i - s + 1) = (i + 1) - s, logo basta somar por segmentos
+  Σx_i e Σ(i+1)·x_i (somas de prefixo) e combinar para cada s;
+- exp: peso exp(-λ·(L-1-i)), somas descontadas calculadas para todos os λ de uma
+  vez com um produto de matrizes (nλ x janela) @ (janela x 60).
+Com as recências em mãos, todos os `alpha` são combinados por broadcast e cada
+ponto da grade recebe seu ranking, igual ao de `top_dezenas_params`.
+"""
+from itertools import chain
+
+import numpy as np
+
+_BLOCO = 1 << 16
+
+
+def matriz_sorteios(concursos):
+    """Matriz one-hot uint8 (L, 60): X[i, d-1] = nº de vezes que d saiu no concurso i."""
+    L = len(concursos)
+    tam = np.fromiter(map(len, concursos), dtype=np.int64, count=L)
+    flat = np.fromiter(chain.from_iterable(concursos), dtype=np.int64, count=int(tam.sum()))
+    linhas = np.repeat(np.arange(L), tam)
+    ok = (flat >= 1) & (flat <= 60)
+    X = np.zeros((L, 60), dtype=np.uint8)
+    np.add.at(X, (linhas[ok], flat[ok] - 1), 1)
+    return X
+
+
+def _inicio(recent_n, L):
+    # mesmo recorte de `concursos[-recent_n:]` (inclusive recent_n=0 => histórico todo)
+    return slice(-recent_n, None).indices(L)[0]
+
+
+def _somas_por_segmento(X, cortes, pesos):
+    """Para cortes crescentes c_0 < ... < c_k = L, retorna k arrays (m, 60) com
+    Σ_{c_j <= i < c_{j+1}} pesos(i)[:, None] * X[i] (pesos(i) é (m, len(i)))."""
+    saidas = []
+    for a, b in zip(cortes, cortes[1:]):
+        acc = None
+        for ini in range(a, b, _BLOCO):
+            fim = min(b, ini + _BLOCO)
+            w = pesos(np.arange(ini, fim))
+            parte = w @ X[ini:fim].astype(w.dtype)
+            acc = parte if acc is None else acc + parte
+        saidas.append(acc)
+    return saidas
+
+
+def recencias(X, inicios, decay='linear', lambdas=(0.05,)):
+    """Recência bruta (não normalizada) por início de janela.
+    Retorna dict {inicio: array (60,)} para linear ou {inicio: array (nλ, 60)} para exp."""
+    L = len(X)
+    cortes = sorted(set(inicios) | {L})
+    if decay == 'exp':
+        lam = np.asarray(lambdas, dtype=np.float64)[:, None]
+
+        def pesos(i):
+            return np.exp(-lam * (L - 1 - i)[None, :])
+    else:
+        def pesos(i):
+            return np.stack([np.ones(len(i), dtype=np.int64), i + 1])
+    segmentos = _somas_por_segmento(X, cortes, pesos)
+    resultado = {}
+    # acumula do segmento mais novo para o mais antigo
+    acc = None
+    for s, seg in zip(reversed(cortes[:-1]), reversed(segmentos)):
+        acc = seg if acc is None else acc + seg
+        if decay == 'exp':
+            resultado[s] = acc.copy()
+        else:
+            resultado[s] = (acc[1] - s * acc[0]).astype(np.float64)
+    for s in inicios:
+        if s not in resultado:  # janela vazia
+            resultado[s] = np.zeros((len(lambdas), 60) if decay == 'exp' else 60)
+    return resultado
+
+
+def _combina(freq_norm, rec_raw, alphas):
+    """Scores (nα, 60) de combined_scores para uma recência bruta (60,)."""
+    max_raw = rec_raw.max()
+    if max_raw == 0:
+        # combined_scores divide por zero e top_dezenas_params cai em pontuar_dezenas
+        return np.broadcast_to(freq_norm, (len(alphas), 60))
+    rec = rec_raw / max_raw
+    a = alphas[:, None]
+    scores = a * freq_norm + (1.0 - a) * rec
+    mx = scores.max(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(mx > 0, scores / np.where(mx > 0, mx, 1.0), 0.0)
+
+
+def ranking(scores, n=None):
+    """[(dezena, score), ...] por score desc e dezena asc (como `top_dezenas_params`)."""
+    ordem = np.lexsort((np.arange(60), -scores))
+    if n is not None:
+        ordem = ordem[:n]
+    return [(int(i) + 1, float(scores[i])) for i in ordem]
+
+
+def varre(concursos, recent_n=(100,), alpha=(0.6,), decay=('linear',), decay_lambda=(0.05,),
+          n=10, freq=None, X=None):
+    """Avalia todas as combinações da grade em uma passada.
+    Cada item devolvido é um dict com recent_n, alpha, decay, decay_lambda e
+    `ranking` (top `n`; None = as 60). Em decay='linear' o lambda não tem efeito,
+    então cada (recent_n, alpha) aparece uma vez com decay_lambda=None.
+    `freq` (de `engine.frequencia`) e `X` (de `matriz_sorteios`) evitam recálculo."""
+    if X is None:
+        X = matriz_sorteios(concursos)
+    L = len(X)
+    if freq is None:
+        f = X.sum(axis=0, dtype=np.int64).astype(np.float64)
+    else:
+        f = np.array([freq.get(d, 0) for d in range(1, 61)], dtype=np.float64)
+    maxf = f.max() if len(f) else 0
+    freq_norm = f / maxf if maxf else np.zeros(60)
+    alphas = np.asarray(alpha, dtype=np.float64)
+    inicios = {r: _inicio(r, L) for r in recent_n}
+    tabela = []
+    decays = list(dict.fromkeys(decay))
+    for dk in decays:
+        lambdas = tuple(decay_lambda) if dk == 'exp' else (None,)
+        rec = recencias(X, list(inicios.values()), dk, lambdas if dk == 'exp' else ())
+        for r in recent_n:
+            bruto = rec[inicios[r]]
+            for li, lam in enumerate(lambdas):
+                scores = _combina(freq_norm, bruto[li] if dk == 'exp' else bruto, alphas)
+                for ai, a in enumerate(alpha):
+                    tabela.append({'recent_n': r, 'alpha': a, 'decay': dk, 'decay_lambda': lam,
+                                   'ranking': ranking(scores[ai], n)})
+    return tabela
+
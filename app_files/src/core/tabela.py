@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+tabela.py
+Amostrador sem rejeição sobre a tabela pré-computada de jogos válidos.
+
+Os C(60, 6) ~ 50 milhões de jogos são enumerados uma vez em ordem de rank
+(combos.py) e os que passam nos filtros estáticos de `filtros_ok` (tudo menos o
+histórico) são gravados como array ordenado de ranks uint32 em DATA_DIR. Para
+sortear, calcula-se (uma vez por vetor de pesos) a soma acumulada de
+prod(pesos[d]) de cada jogo válido, com peso zero para os concursos já
+sorteados; cada jogo custa então uma busca binária, sem laço de rejeição.
+Com regras não padrão (`filters.Pipeline`) a tabela ganha um arquivo próprio,
+identificado pelo hash das regras estáticas.
+"""
+import logging
+import os
+from math import comb
+
+import numpy as np
+
+from . import combos
+from .batch import filtros_mask
+
+VERSAO = 1
+_BLOCO = 1 << 20
+
+
+def nome_arquivo(data_dir, pipeline=None):
+    if pipeline is None or pipeline.padrao:
+        return os.path.join(str(data_dir), f'mega_tabela_v{VERSAO}.npy')
+    return os.path.join(str(data_dir), f'mega_tabela_v{VERSAO}_{pipeline.chave}.npy')
+
+
+def constroi(caminho, pipeline=None):
+    """Enumera todos os jogos, filtra por bloco e grava os ranks válidos em `caminho`."""
+    logging.info('Construindo tabela de jogos válidos (executado uma única vez)...')
+    c5 = combos.colex(combos.N - 1, combos.K - 1)
+    partes = []
+    for m in range(combos.K - 1, combos.N):
+        # jogos cuja maior dezena é m+1: ranks contíguos a partir de C(m, 6)
+        base = comb(m, combos.K)
+        total = comb(m, combos.K - 1)
+        for ini in range(0, total, _BLOCO):
+            fim = min(total, ini + _BLOCO)
+            jogos = np.empty((fim - ini, combos.K), dtype=np.int64)
+            jogos[:, :-1] = c5[ini:fim]
+            jogos[:, -1] = m
+            jogos += 1
+            ok = np.flatnonzero(filtros_mask(jogos, pipeline=pipeline))
+            partes.append((ok + base + ini).astype(np.uint32))
+    validos = np.concatenate(partes)
+    tmp = caminho + '.tmp.npy'
+    np.save(tmp, validos)
+    os.replace(tmp, caminho)
+    logging.info(f'Tabela gravada: {len(validos)} jogos válidos de {combos.TOTAL}.')
+    return validos
+
+
+class TabelaJogos:
+    """Ranks válidos (mapeados do disco) + somas acumuladas por vetor de pesos."""
+
+    def __init__(self, data_dir, pipeline=None):
+        caminho = nome_arquivo(data_dir, pipeline)
+        if not os.path.exists(caminho):
+            constroi(caminho, pipeline)
+        self.caminho = caminho
+        self.ranks = np.load(caminho, mmap_mode='r')
+        self._acumulado = None
+        self._chave = None
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def acumulado(self, pesos, historico=()):
+        """Soma acumulada dos pesos prod(pesos[d]) dos jogos válidos; concursos
+        em `historico` recebem peso zero. Memoizado para o último (pesos, histórico)."""
+        w = np.array([pesos[d] for d in range(1, 61)], dtype=np.float64)
+        validos = [c for c in historico if len(c) == 6 and len(set(c)) == 6]
+        if validos:
+            hist = np.unique(combos.ranks(np.sort(np.array(validos, dtype=np.int64), axis=1)))
+        else:
+            hist = np.zeros(0, dtype=np.uint64)
+        chave = (w.tobytes(), hist.tobytes())
+        if chave != self._chave:
+            logw = np.log(np.where(w > 0, w, np.finfo(np.float64).tiny))
+            # posições (na tabela) dos concursos já sorteados: peso zero
+            pos = np.searchsorted(self.ranks, hist)
+            dentro = pos < len(self.ranks)
+            pos, hist = pos[dentro], hist[dentro]
+            pos = pos[self.ranks[pos] == hist]
+            cum = np.empty(len(self.ranks), dtype=np.float64)
+            soma = 0.0
+            for ini in range(0, len(self.ranks), _BLOCO):
+                jogos = combos.unranks(self.ranks[ini:ini + _BLOCO])
+                pw = np.exp(logw[jogos.astype(np.intp) - 1].sum(axis=1))
+                zerar = pos[(pos >= ini) & (pos < ini + len(pw))] - ini
+                pw[zerar] = 0.0
+                np.cumsum(pw, out=cum[ini:ini + len(pw)])
+                cum[ini:ini + len(pw)] += soma
+                soma = cum[ini + len(pw) - 1]
+            self._acumulado, self._chave = cum, chave
+        return self._acumulado
+
+    def sorteia(self, n, pesos, historico=(), rng=None):
+        """Sorteia `n` jogos (array (n, 6) uint8) com probabilidade proporcional a prod(pesos)."""
+        rng = rng if rng is not None else np.random.default_rng()
+        cum = self.acumulado(pesos, historico)
+        u = rng.random(n) * cum[-1]
+        idx = np.minimum(np.searchsorted(cum, u, side='right'), len(cum) - 1)
+        return combos.unranks(self.ranks[idx])
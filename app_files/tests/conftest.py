@@ -0,0 +1,39 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+# permite `from src.core import ...` rodando o pytest de app_files/ ou da raiz
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def historico_sintetico(n, seed=7):
+    """`n` concursos de 6 dezenas distintas, ordenadas, reprodutíveis por `seed`."""
+    rng = random.Random(seed)
+    return [sorted(rng.sample(range(1, 61), 6)) for _ in range(n)]
+
+
+@pytest.fixture
+def historico():
+    return historico_sintetico(600)
+
+
+@pytest.fixture
+def motor(tmp_path, monkeypatch, historico):
+    """engine com DATA_DIR temporário já contendo `historico` em mega_cache.json e
+    sem nenhum estado de módulo (cache em memória, filtros, tabela, registro, stats)."""
+    from src.core import engine
+    monkeypatch.setattr(engine, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(engine, 'CACHE', str(tmp_path / 'mega_cache.json'))
+    monkeypatch.setattr(engine, 'CACHE_BIN', str(tmp_path / 'mega_cache.bin'))
+    monkeypatch.setattr(engine, 'CACHE_HTTP', str(tmp_path / 'mega_cache.http.json'))
+    monkeypatch.setattr(engine, 'FILTROS', str(tmp_path / 'filtros.json'))
+    monkeypatch.setattr(engine, 'URL_HIST', 'http://127.0.0.1:9/indisponivel.zip')
+    for nome in ('ESTADO', '_ARMAZEM', '_PIPELINE', '_TABELA', 'DEDUP', 'STATS'):
+        monkeypatch.setattr(engine, nome, None)
+    monkeypatch.setattr(engine, '_DATA_DIR_OK', False)
+    with open(engine.CACHE, 'w') as f:
+        json.dump(historico, f)
+    return engine
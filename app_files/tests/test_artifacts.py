@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Artefatos derivados: gerados na primeira vez, intocados quando o histórico não
+muda e refeitos só os que dependem do que mudou (ou que sumiram do disco)."""
+import csv
+import json
+import os
+
+import pytest
+
+from src.core import artifacts
+
+from conftest import historico_sintetico
+
+TODOS = set(artifacts.ARTEFATOS)
+
+
+def _historico(n=250):
+    concursos = historico_sintetico(n)
+    return concursos, list(range(1, n + 1)), [f'{(i % 28) + 1:02d}/01/2000' for i in range(n)]
+
+
+def _gerados(estado):
+    return {nome for nome, s in estado.items() if s == 'gerado'}
+
+
+def test_so_refaz_os_defasados(tmp_path):
+    concursos, numeros, datas = _historico()
+    assert _gerados(artifacts.atualiza(tmp_path, concursos, numeros, datas)) == TODOS
+    mtimes = {n: os.stat(tmp_path / n).st_mtime_ns for n in TODOS}
+    assert _gerados(artifacts.atualiza(tmp_path, [list(c) for c in concursos], numeros, list(datas))) == set()
+    assert {n: os.stat(tmp_path / n).st_mtime_ns for n in TODOS} == mtimes
+
+    # data de um concurso antigo: só o CSV completo depende dela
+    datas[3] = '31/12/1999'
+    assert _gerados(artifacts.atualiza(tmp_path, concursos, numeros, datas)) == {'mega_full_from_local.csv'}
+    # dezenas de um concurso fora dos recentes: tudo menos a frequência recente
+    concursos[0] = [d for d in range(1, 61) if d not in concursos[0]][:6]
+    assert _gerados(artifacts.atualiza(tmp_path, concursos, numeros, datas)) == TODOS - {'mega_freq_recent.csv'}
+    # concurso novo: todos
+    assert _gerados(artifacts.atualiza(tmp_path, concursos + [[1, 2, 3, 4, 5, 6]], numeros + [251],
+                                       datas + ['01/02/2000'])) == TODOS
+
+
+def test_arquivo_apagado_e_forcar(tmp_path):
+    concursos, numeros, datas = _historico()
+    artifacts.atualiza(tmp_path, concursos, numeros, datas)
+    os.remove(tmp_path / 'mega_freq_from_local.csv')
+    assert _gerados(artifacts.atualiza(tmp_path, concursos, numeros, datas)) == {'mega_freq_from_local.csv'}
+    assert _gerados(artifacts.atualiza(tmp_path, concursos, numeros, datas, forcar=True, workers=1)) == TODOS
+
+
+def test_conteudo(tmp_path):
+    concursos, numeros, datas = _historico()
+    artifacts.atualiza(tmp_path, concursos, numeros, datas)
+    with open(tmp_path / 'mega_full_from_local.csv', encoding='utf8') as f:
+        linhas = list(csv.reader(f, delimiter=';'))
+    assert linhas[0] == ['Concurso', 'Data', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6']
+    assert linhas[1] == [str(numeros[0]), datas[0]] + [str(d) for d in concursos[0]] and len(linhas) == 251
+    with open(tmp_path / 'mega_freq_recent.csv', encoding='utf8') as f:
+        recente = {int(d): int(n) for d, n in list(csv.reader(f, delimiter=';'))[1:]}
+    assert recente == {d: sum(d in c for c in concursos[-artifacts.RECENTES:]) for d in range(1, 61)}
+    with open(tmp_path / 'mega_summary.json', encoding='utf8') as f:
+        resumo = json.load(f)
+    assert resumo['total_concursos'] == 250 and resumo['ultima_concurso'] == 250
+    assert resumo['ultima_data'] == datas[-1] and len(resumo['top10']) == 10
+
+
+def test_motor_atualiza_artefatos(motor, tmp_path, monkeypatch):
+    assert _gerados(motor.atualiza_artefatos()) == TODOS
+    assert _gerados(motor.atualiza_artefatos()) == set()
+    vazio = tmp_path / 'vazio'
+    monkeypatch.setattr(motor, 'CACHE', str(vazio / 'mega_cache.json'))
+    monkeypatch.setattr(motor, 'CACHE_BIN', str(vazio / 'mega_cache.bin'))
+    monkeypatch.setattr(motor, '_ARMAZEM', None)
+    monkeypatch.setattr(motor, 'DATA_DIR', vazio)
+    with pytest.raises(FileNotFoundError):
+        motor.atualiza_artefatos()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Backtest walk-forward: acumuladores incrementais iguais ao recálculo sobre o
+prefixo, mesma distribuição de acertos que pontuar o prefixo a cada passo,
+resultado igual com workers e especificações/grades de estratégia."""
+import csv
+from collections import Counter
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import backtest, engine  # noqa: E402
+from src.core.sweep import matriz_sorteios  # noqa: E402
+
+from conftest import historico_sintetico  # noqa: E402
+
+
+def _distribuicao_recalculada(concursos, inicio, ordena):
+    dist = Counter()
+    for t in range(inicio, len(concursos)):
+        prefixo = concursos[:t]
+        escolha = [d for d, _ in ordena(prefixo, engine.frequencia(prefixo))[:6]]
+        dist[len(set(escolha) & set(concursos[t]))] += 1
+    return {str(h): dist[h] for h in sorted(dist)}
+
+
+@pytest.mark.parametrize('spec, ordena', [
+    ('frequencia', lambda c, f: sorted(f.items(), key=lambda x: (-x[1], x[0]))),
+    ('invertido', lambda c, f: sorted(engine.pesos_invertidos(c, f).items(), key=lambda x: (-x[1], x[0]))),
+    ('combinado:recent_n=30,alpha=0.4',
+     lambda c, f: engine._ordena_params(c, f, 30, 0.4, 'linear', 0.05)),
+])
+def test_igual_ao_recalculo_por_prefixo(spec, ordena):
+    concursos = historico_sintetico(160)
+    (r,) = backtest.backtest(concursos, [spec], inicio=100)
+    assert r['passos'] == 60
+    assert r['distribuicao'] == _distribuicao_recalculada(concursos, 100, ordena)
+
+
+@pytest.mark.parametrize('recent_n, decay', [(0, 'linear'), (25, 'linear'), (25, 'exp'), (500, 'exp')])
+def test_recencia_incremental(recent_n, decay):
+    concursos = historico_sintetico(120)
+    X = matriz_sorteios(concursos)
+    rec = backtest._Recencia(recent_n, decay, 0.1)
+    for t in range(len(X)):
+        rec.adiciona(X, t)
+        s = max(0, t + 1 - recent_n) if recent_n else 0
+        if decay == 'exp':
+            pesos = np.exp(-0.1 * (t - np.arange(s, t + 1)))
+        else:
+            pesos = np.arange(s, t + 1) - s + 1.0
+        assert rec.bruta() == pytest.approx(pesos @ X[s:t + 1], rel=1e-9, abs=1e-9)
+
+
+def test_gerado_e_workers():
+    concursos = historico_sintetico(140)
+    specs = ['frequencia', 'combinado:decay=exp', 'gerado:jogos=5']
+    um = backtest.backtest(concursos, specs, inicio=100, seed=3)
+    assert backtest.backtest(concursos, specs, inicio=100, seed=3, workers=2) == um
+    gerado = um[2]
+    assert gerado['passos'] == 40 and sum(gerado['distribuicao'].values()) == 200
+
+
+def test_especificacoes(tmp_path):
+    e = backtest.estrategia('combinado:recent_n=50,decay=exp')
+    assert e['params'] == {'recent_n': 50, 'alpha': 0.6, 'decay': 'exp', 'decay_lambda': 0.05}
+    with pytest.raises(ValueError):
+        backtest.estrategia('magica')
+    with pytest.raises(ValueError):
+        backtest.estrategia('frequencia:alpha=1')
+    assert backtest.expande('combinado:recent_n=50|100,alpha=0.4|0.6') == [
+        'combinado:recent_n=50,alpha=0.4', 'combinado:recent_n=50,alpha=0.6',
+        'combinado:recent_n=100,alpha=0.4', 'combinado:recent_n=100,alpha=0.6']
+    assert backtest.expande('frequencia') == ['frequencia']
+
+    resultados = backtest.backtest(historico_sintetico(110), ['frequencia'], inicio=100)
+    caminho = str(tmp_path / 'bt.csv')
+    backtest.salva(resultados, caminho)
+    with open(caminho, encoding='utf8') as f:
+        linhas = list(csv.reader(f, delimiter=';'))
+    assert linhas[0] == ['Estrategia', 'K', 'Acertos', 'Quantidade', 'Fracao']
+    assert sum(int(l[3]) for l in linhas[1:]) == 10
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Motor vetorizado: `filtros_mask` decide igual ao `filtros_ok` jogo a jogo (com e
+sem histórico) e `gerar_jogos(lote=...)` entrega só jogos aprovados, reprodutíveis."""
+import random
+from collections import Counter
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import batch, filters  # noqa: E402
+
+from conftest import historico_sintetico  # noqa: E402
+
+
+def _classicas(jogo, concursos):
+    """As regras clássicas de `filtros_ok` escritas por extenso."""
+    j = sorted(jogo)
+    corrida = maior = 1
+    for a, b in zip(j, j[1:]):
+        corrida = corrida + 1 if b == a + 1 else 1
+        maior = max(maior, corrida)
+    return (sum(d % 2 == 0 for d in j) <= 3
+            and maior <= 2
+            and max(Counter(d % 10 for d in j).values()) <= 2
+            and len({d // 10 for d in j}) >= 4
+            and 100 <= sum(j) <= 250
+            and sum(d in filters.PRIMOS for d in j) <= 4
+            and j not in concursos)
+
+
+def _jogos(n, seed):
+    rng = random.Random(seed)
+    return [sorted(rng.sample(range(1, 61), 6)) for _ in range(n)]
+
+
+def test_mascaras():
+    m = batch.mascaras(np.array([[1, 2, 3, 4, 5, 60]]))
+    assert m.dtype == np.uint64 and int(m[0]) == 0b11111 | 1 << 59
+    assert len(batch.mascaras(np.zeros((0, 6), dtype=np.int64))) == 0
+
+
+def test_filtros_mask_igual_ao_escalar():
+    concursos = historico_sintetico(300)
+    jogos = _jogos(20_000, 1) + concursos[:50]
+    esperado = [_classicas(j, concursos) for j in jogos]
+    assert 0 < sum(esperado) < len(jogos)
+
+    pipeline = filters.Pipeline()
+    assert [pipeline.aprova(j, concursos) for j in jogos] == esperado
+    ok = batch.filtros_mask(np.array(jogos), batch.mascaras_historico(concursos))
+    assert ok.tolist() == esperado
+    # sem histórico só a regra de repetidos deixa de valer
+    sem = batch.filtros_mask(np.array(jogos))
+    assert sem.tolist() == [_classicas(j, []) for j in jogos]
+
+
+def test_rejeicoes_atribuidas_a_primeira_regra():
+    concursos = historico_sintetico(100)
+    jogos = _jogos(5000, 2)
+    ok, contagem = batch.rejeicoes_mask(np.array(jogos), batch.mascaras_historico(concursos))
+    pipeline = filters.Pipeline(adaptativo=False)
+    motivos = Counter(pipeline.motivo(j, concursos) for j in jogos)
+    assert int(ok.sum()) == motivos.pop(None)
+    assert {k: v for k, v in contagem.items() if v} == dict(motivos)
+
+
+def test_gerar_jogos_lote(motor, historico):
+    jogos = motor.gerar_jogos(500, lote=1000, seed=3)
+    assert len(jogos) == 500
+    assert all(len(set(j)) == 6 and j == sorted(j) and _classicas(j, historico) for j in jogos)
+    assert motor.gerar_jogos(500, lote=1000, seed=3) == jogos
+    assert motor.gerar_jogos(500, lote=1000, seed=4) != jogos
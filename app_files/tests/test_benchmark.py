@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""scripts/benchmark.py: entradas sintéticas lidas de volta pelo ingest e uma execução
+curta de ponta a ponta gravando (e comparando) o JSON de resultados."""
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.core import ingest
+
+SCRIPTS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.insert(0, SCRIPTS)
+
+import benchmark  # noqa: E402
+
+
+def test_historico_sintetico_reprodutivel():
+    linhas = benchmark.historico_sintetico(50)
+    assert linhas == benchmark.historico_sintetico(50)
+    assert [n for n, _, _ in linhas] == list(range(1, 51))
+    assert all(len(set(dz)) == 6 and dz == sorted(dz) for _, _, dz in linhas)
+
+
+@pytest.mark.parametrize('nome, escreve', [('h.csv', benchmark.escreve_csv),
+                                           ('h.xlsx', benchmark.escreve_xlsx_minimo)])
+def test_entradas_lidas_pelo_ingest(tmp_path, nome, escreve):
+    linhas = benchmark.historico_sintetico(120)
+    caminho = str(tmp_path / nome)
+    assert escreve(caminho, linhas) is not False
+    hist = ingest.le_historico(caminho)
+    assert [(hist.concurso(i), hist.datas[i], hist.jogo(i)) for i in range(len(hist))] == linhas
+
+
+def test_execucao_curta(tmp_path):
+    saida = tmp_path / 'bench'
+    cmd = [sys.executable, os.path.join(SCRIPTS, 'benchmark.py'), '--escalas', '150', '--quantidade', '200',
+           '--sem-memoria', '--saida', str(saida)]
+    subprocess.run(cmd, check=True, capture_output=True, timeout=300)
+    (primeiro,) = glob.glob(str(saida / '*.json'))
+    with open(primeiro, encoding='utf8') as f:
+        resultados = json.load(f)['resultados']
+    casos = {r['caso'] for r in resultados}
+    assert {'filtros_ok', 'gerar_jogos', 'carregar_arquivo_local(csv)', 'carregar_arquivo_local(xlsx)'} <= casos
+    assert all(r['escala'] == 150 and r['unidades'] > 0 and r['pico_mb'] is None for r in resultados)
+
+    os.rename(primeiro, tmp_path / 'anterior.json')
+    r = subprocess.run(cmd + ['--comparar', str(tmp_path / 'anterior.json')], check=True,
+                       capture_output=True, text=True, timeout=300)
+    assert 'Comparação com' in r.stdout and 'filtros_ok' in r.stdout.split('Comparação com')[1]
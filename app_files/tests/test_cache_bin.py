@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Cache binário: ida e volta, memory-map sem cópia, anexação e sincronização."""
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import cache_bin  # noqa: E402
+
+DEZENAS = [[4, 5, 30, 33, 41, 52], [9, 37, 39, 41, 43, 49], [10, 11, 29, 30, 36, 47]]
+
+
+def test_ida_e_volta(tmp_path):
+    caminho = str(tmp_path / 'c.bin')
+    cache_bin.grava(caminho, cache_bin.monta_registros(DEZENAS, [1, 2, None], ['11/03/1996', '1996-03-18', '']))
+    regs = cache_bin.abre(caminho)
+    assert isinstance(regs, np.memmap)
+    assert regs['dezenas'].tolist() == DEZENAS
+    assert regs['concurso'].tolist() == [1, 2, 0]
+    assert [cache_bin.dias_para_data(d) for d in regs['data']] == ['11/03/1996', '18/03/1996', None]
+
+    cache_bin.anexa(caminho, cache_bin.monta_registros([[1, 5, 6, 27, 42, 59]], [4]))
+    assert cache_bin.abre(caminho)['concurso'].tolist() == [1, 2, 0, 4]
+
+
+def test_json_ida_e_volta(tmp_path):
+    js, b = str(tmp_path / 'c.json'), str(tmp_path / 'c.bin')
+    with open(js, 'w') as f:
+        json.dump(DEZENAS, f)
+    cache_bin.importa_json(js, b)
+    assert cache_bin.exporta_json(b, str(tmp_path / 'volta.json')) == 3
+    with open(tmp_path / 'volta.json') as f:
+        assert json.load(f) == DEZENAS
+
+
+@pytest.mark.parametrize('dezenas', [
+    DEZENAS + [[1, 2, 3, 4, 5]],
+    [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]],  # 12 dezenas: o reshape para (2, 6) passaria
+    [[0, 1, 2, 3, 4, 5]],
+    [[1, 2, 3, 4, 5, 61]],
+])
+def test_concurso_invalido_e_rejeitado(dezenas):
+    with pytest.raises(ValueError):
+        cache_bin.monta_registros(dezenas)
+
+
+def test_sincroniza_reaproveita_prefixo_e_rejeita_linha_ruim(tmp_path):
+    caminho = str(tmp_path / 'c.bin')
+    cache_bin.sincroniza(caminho, DEZENAS[:2], [1, 2], ['11/03/1996', '18/03/1996'])
+    regs = cache_bin.sincroniza(caminho, DEZENAS)  # nº e datas do prefixo vêm do arquivo antigo
+    assert regs['concurso'].tolist() == [1, 2, 0]
+    assert cache_bin.dias_para_data(regs['data'][1]) == '18/03/1996'
+    with pytest.raises(ValueError):
+        cache_bin.sincroniza(caminho, DEZENAS + [[1, 2, 3]])
+    assert len(cache_bin.abre(caminho)) == 3
+
+
+def test_arquivo_estranho_e_cache_invalido(tmp_path):
+    caminho = tmp_path / 'c.bin'
+    caminho.write_bytes(b'nada disso' * 10)
+    with pytest.raises(cache_bin.CacheInvalido):
+        cache_bin.abre(str(caminho))
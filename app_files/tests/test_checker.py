@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Conferência em massa: tabela de prêmios por tamanho de aposta, CSV em blocos
+contra sorteio e histórico, e popcount sem `np.bitwise_count`."""
+import json
+import random
+from itertools import combinations
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import checker, filters  # noqa: E402
+
+
+def _premios_forca_bruta(aposta, sorteio):
+    """{k: prêmios} contando cada jogo de 6 contido na aposta."""
+    premios = dict.fromkeys(checker.FAIXAS.values(), 0)
+    for jogo in combinations(aposta, 6):
+        h = len(set(jogo) & set(sorteio))
+        if h in premios:
+            premios[h] += 1
+    return premios
+
+
+@pytest.mark.parametrize('q', [6, 7, 8, 10])
+def test_tabela_de_premios(q):
+    sorteio = list(range(1, 7))
+    for h in range(7):
+        if q - h > 54:
+            continue
+        aposta = list(range(1, h + 1)) + list(range(60, 60 - (q - h), -1))
+        esperado = _premios_forca_bruta(aposta, sorteio)
+        for k in checker.FAIXAS.values():
+            assert checker.PREMIOS[k][q, h] == esperado[k], (q, h, k)
+
+
+def test_confere_csv_em_blocos(tmp_path, monkeypatch):
+    rng = random.Random(5)
+    historico = [sorted(rng.sample(range(1, 61), 6)) for _ in range(40)]
+    sorteio = historico[-1]
+    bilhetes = [sorted(rng.sample(range(1, 61), rng.choice((6, 7, 8)))) for _ in range(97)]
+    bilhetes[3] = sorted(sorteio)
+    bilhetes[4] = sorted(sorteio[:5] + [d for d in range(1, 61) if d not in sorteio][:2])
+    csv_path = tmp_path / 'b.csv'
+    largura = max(map(len, bilhetes))
+    linhas = ['Numero;' + ';'.join(f'D{i}' for i in range(1, largura + 1))]
+    linhas += [f'{i};' + ';'.join(map(str, b)) for i, b in enumerate(bilhetes, 1)]
+    csv_path.write_text('\n'.join(linhas) + '\n')
+    monkeypatch.setattr(checker, 'CELULAS', 64)  # vários sub-blocos bilhetes x concursos
+
+    resumo = checker.confere(str(csv_path), sorteio, checker.mascaras(np.array(historico)),
+                             saida=str(tmp_path / 'saida.csv'), resumo=str(tmp_path / 'r.json'), bloco=10)
+
+    acertos = [len(set(b) & set(sorteio)) for b in bilhetes]
+    assert resumo['bilhetes'] == 97
+    assert resumo['acertos_sorteio'] == {str(h): acertos.count(h) for h in range(7)}
+    for nome, k in checker.FAIXAS.items():
+        assert resumo['premios_sorteio'][nome] == sum(_premios_forca_bruta(b, sorteio)[k] for b in bilhetes)
+        assert resumo['premios_historico'][nome] == sum(
+            _premios_forca_bruta(b, c)[k] for b in bilhetes for c in historico)
+    melhor = [max(len(set(b) & set(c)) for c in historico) for b in bilhetes]
+    assert resumo['melhor_historico'] == {str(h): melhor.count(h) for h in range(7)}
+    with open(tmp_path / 'r.json') as f:
+        assert json.load(f) == resumo
+
+    saida = (tmp_path / 'saida.csv').read_text().splitlines()
+    assert saida[0].split(';')[:3] == ['Arquivo', 'Numero', 'Acertos']
+    assert [int(l.split(';')[2]) for l in saida[1:]] == acertos
+
+
+def test_popcount_swar():
+    rng = np.random.default_rng(1)
+    x = rng.integers(0, 2 ** 63, size=(50, 40), dtype=np.uint64) | np.uint64(1 << 63)
+    x[0, :3] = [0, 2 ** 64 - 1, 1]
+    esperado = np.vectorize(lambda v: bin(int(v)).count('1'))(x)
+    r = filters._popcount_swar(x)
+    assert r.dtype == np.uint8 and r.shape == x.shape
+    assert (r == esperado).all()
+    assert (filters.popcount_np(x) == esperado).all()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Coocorrência/atrasos: atualização incremental igual à reconstrução e
+reconstrução quando o histórico já processado muda."""
+import random
+from itertools import combinations
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import cooccurrence  # noqa: E402
+
+
+def _historico(n, seed=0):
+    rng = random.Random(seed)
+    return [sorted(rng.sample(range(1, 61), 6)) for _ in range(n)]
+
+
+def _iguais(a, b):
+    assert a.n == b.n
+    for campo in ('pares', 'trios', 'freq', 'primeiro', 'ultimo', 'maior_atraso'):
+        assert np.array_equal(getattr(a, campo), getattr(b, campo)), campo
+
+
+def _cheia(concursos):
+    c = cooccurrence.Coocorrencia(trios=True)
+    c.atualiza(concursos)
+    return c
+
+
+def test_consultas_batem_com_contagem_direta():
+    concursos = _historico(300)
+    c = cooccurrence.Coocorrencia(trios=True)
+    assert c.atualiza(concursos) == 300
+    assert c.par(concursos[0][0], concursos[0][1]) == sum(
+        1 for j in concursos if concursos[0][0] in j and concursos[0][1] in j)
+    a, b, t = concursos[5][:3]
+    assert c.trio(a, b, t) == sum(1 for j in concursos if {a, b, t} <= set(j))
+    for d in (1, 30, 60):
+        aparicoes = [i for i, j in enumerate(concursos) if d in j]
+        assert c.atraso(d) == 299 - aparicoes[-1]
+        assert int(c.freq[d - 1]) == len(aparicoes)
+    assert sorted(cooccurrence.rank_trio(*t) for t in combinations(range(1, 61), 3)) == \
+        list(range(cooccurrence.NUM_TRIOS))
+
+
+def test_incremental_igual_a_reconstrucao(tmp_path):
+    concursos = _historico(500, seed=1)
+    caminho = str(tmp_path / 'cooc.npz')
+    cooccurrence.sincroniza(caminho, concursos[:400], trios=True)
+    inc = cooccurrence.sincroniza(caminho, concursos, trios=True)
+    _iguais(inc, _cheia(concursos))
+    assert cooccurrence.Coocorrencia.carrega(caminho).atualiza(concursos) == 0
+
+
+def test_concurso_do_meio_alterado_reconstroi():
+    concursos = _historico(200, seed=2)
+    c = _cheia(concursos)
+    alterado = [list(j) for j in concursos] + _historico(10, seed=3)
+    # primeiro e último processados iguais, um do meio corrigido
+    alterado[100] = sorted(set(range(1, 61)) - set(alterado[100]))[:6]
+    assert c.atualiza(alterado) == len(alterado)
+    _iguais(c, _cheia(alterado))
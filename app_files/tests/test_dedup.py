@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Registro de apostas: inéditos dentro do lote e entre execuções, log + compactação
+sem perder ranks de outra instância, e o gerador registrando só o que entrega."""
+from itertools import islice
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import dedup  # noqa: E402
+
+
+def _registro(tmp_path):
+    return dedup.RegistroApostas(dedup.nome_base(tmp_path))
+
+
+def test_registra_lote(tmp_path):
+    r = _registro(tmp_path)
+    a, b = [1, 2, 3, 4, 5, 6], [60, 50, 40, 30, 20, 10]
+    assert r.registra_lote([a, b, a, sorted(b)]).tolist() == [True, True, False, False]
+    assert r.registra_lote([b, [7, 8, 9, 10, 11, 12]]).tolist() == [False, True]
+    assert len(r) == 3 and r.contem(sorted(b)) and not r.contem([7, 8, 9, 10, 11, 13])
+    # jogos sem 6 dezenas distintas em 1..60 passam sempre e não são registrados
+    invalidos = [[1, 1, 2, 3, 4, 5], [0, 1, 2, 3, 4, 5], [1, 2, 3, 4, 5, 61]]
+    assert r.registra_lote(invalidos).all() and r.registra_lote(invalidos).all()
+    assert r.registra_lote([[1, 2, 3, 4, 5, 6, 7]]).all()
+    assert len(r) == 3
+
+
+def test_ineditos_lote_nao_marca(tmp_path):
+    r = _registro(tmp_path)
+    r.registra([1, 2, 3, 4, 5, 6])
+    jogos = [[1, 2, 3, 4, 5, 6], [2, 3, 4, 5, 6, 7], [2, 3, 4, 5, 6, 7]]
+    assert r.ineditos_lote(jogos).tolist() == [False, True, False]
+    assert r.ineditos_lote(jogos).tolist() == [False, True, False]
+    assert not r.contem([2, 3, 4, 5, 6, 7])
+    assert r.ineditos_lote([]).tolist() == []
+
+
+def test_persistencia_e_compactacao(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, 'COMPACTA', 8)
+    rng = np.random.default_rng(1)
+    jogos = np.sort(np.array([rng.choice(60, 6, replace=False) + 1 for _ in range(30)]), axis=1)
+    r1, r2 = _registro(tmp_path), _registro(tmp_path)
+    r1.registra_lote(jogos[:5])
+    assert not _registro(tmp_path).contem_lote(jogos[:5]).any()  # só depois de salva
+    r1.salva()
+    r2.registra_lote(jogos[5:7])
+    r2.salva()  # 7 entradas no log: ainda sem compactar
+    assert len(np.fromfile(r1.caminho_log, dtype=np.uint32)) == 7
+    r1.registra_lote(jogos[7:12])
+    r1.salva()  # passou de COMPACTA: log fundido ao arquivo ordenado
+    assert len(np.fromfile(r1.caminho_log, dtype=np.uint32)) == 0
+    ranks = np.fromfile(r1.caminho_ranks, dtype=np.uint32)
+    assert (np.diff(ranks.astype(np.int64)) > 0).all() and len(ranks) == len({tuple(j) for j in jogos[:12].tolist()})
+
+    novo = _registro(tmp_path)
+    assert novo.contem_lote(jogos[:12]).all() and not novo.contem_lote(jogos[12:]).any()
+    novo.registra_lote(jogos[12:14])
+    novo.compacta()
+    assert _registro(tmp_path).contem_lote(jogos[:14]).all()
+
+
+def test_gerador_registra_so_o_entregue(motor):
+    registro = motor.ativa_dedup()
+    try:
+        jogos = motor.iter_jogos(50, seed=1)
+        primeiros = list(islice(jogos, 3))
+        jogos.close()
+        assert len(registro) == 3 and registro.contem_lote(primeiros).all()
+
+        lote = motor.gerar_jogos(200, lote=1000, seed=2)
+        assert len({tuple(j) for j in lote}) == 200
+        assert len(registro) == 203
+        # mesma seed de novo: nada do que já saiu se repete
+        repetido = motor.gerar_jogos(200, lote=1000, seed=2)
+        assert not {tuple(j) for j in repetido} & {tuple(j) for j in lote + primeiros}
+
+        jogo = motor.recomendar_numeros(seed=3)
+        assert registro.contem(jogo) and len(registro) == 404
+    finally:
+        motor.desativa_dedup()
+    # outra execução (novo registro sobre o mesmo DATA_DIR) vê tudo o que foi entregue
+    assert motor.ativa_dedup().contem_lote(lote + repetido + primeiros + [jogo]).all()
+    motor.desativa_dedup()
+
+
+def test_csv_registra_sem_filtrar(motor, tmp_path):
+    registro = motor.ativa_dedup()
+    try:
+        jogo = [1, 12, 23, 34, 45, 56]
+        registro.registra(jogo)
+        caminho = str(tmp_path / 'c.csv')
+        motor.salva_csv([jogo, [2, 13, 24, 35, 46, 57], list(range(1, 8))], caminho)
+        with open(caminho) as f:
+            assert len(f.read().splitlines()) == 4  # cabeçalho + 3 apostas, nenhuma descartada
+        assert registro.contem([2, 13, 24, 35, 46, 57]) and len(registro) == 2
+    finally:
+        motor.desativa_dedup()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Download condicional (ETag/If-Modified-Since) e anexação incremental do histórico,
+contra um servidor HTTP local que imita o ZIP da Caixa."""
+import io
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.core import download, engine
+
+CONCURSOS = [
+    (1, '11/03/1996', [4, 5, 30, 33, 41, 52]),
+    (2, '18/03/1996', [9, 37, 39, 41, 43, 49]),
+    (3, '25/03/1996', [10, 11, 29, 30, 36, 47]),
+    (4, '01/04/1996', [1, 5, 6, 27, 42, 59]),
+    (5, '08/04/1996', [1, 2, 6, 16, 19, 46]),
+]
+
+
+def _zip(concursos):
+    linhas = ['Concurso;Data do Sorteio;Bola1;Bola2;Bola3;Bola4;Bola5;Bola6']
+    linhas += [f'{n};{data};' + ';'.join(map(str, dz)) for n, data, dz in concursos]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as z:
+        z.writestr('MEGA.CSV', '\r\n'.join(linhas).encode('ISO-8859-1'))
+    return buf.getvalue()
+
+
+class Caixa:
+    """Estado do servidor: corpo atual, sua ETag e contagem de respostas."""
+
+    def __init__(self):
+        self.publica(CONCURSOS[:3], '"v1"')
+        self.respostas = {200: 0, 304: 0}
+
+    def publica(self, concursos, etag):
+        self.corpo = _zip(concursos)
+        self.etag = etag
+
+
+@pytest.fixture
+def servidor():
+    caixa = Caixa()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == caixa.etag:
+                caixa.respostas[304] += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            caixa.respostas[200] += 1
+            self.send_response(200)
+            self.send_header('ETag', caixa.etag)
+            self.send_header('Last-Modified', 'Mon, 01 Apr 1996 00:00:00 GMT')
+            self.send_header('Content-Length', str(len(caixa.corpo)))
+            self.end_headers()
+            self.wfile.write(caixa.corpo)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    caixa.url = f'http://127.0.0.1:{httpd.server_address[1]}/D_megase.zip'
+    try:
+        yield caixa
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture
+def motor(tmp_path, monkeypatch, servidor):
+    """engine apontado para um DATA_DIR temporário e para o servidor local."""
+    monkeypatch.setattr(engine, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(engine, 'CACHE', str(tmp_path / 'mega_cache.json'))
+    monkeypatch.setattr(engine, 'CACHE_BIN', str(tmp_path / 'mega_cache.bin'))
+    monkeypatch.setattr(engine, 'CACHE_HTTP', str(tmp_path / 'mega_cache.http.json'))
+    monkeypatch.setattr(engine, 'URL_HIST', servidor.url)
+    monkeypatch.setattr(engine, 'ESTADO', None)
+    monkeypatch.setattr(engine, '_ARMAZEM', None)
+    monkeypatch.setattr(engine, '_DATA_DIR_OK', False)
+    return engine
+
+
+def test_busca_condicional_responde_304(servidor, tmp_path):
+    meta = str(tmp_path / 'meta.json')
+    resposta = download.busca(servidor.url, meta)
+    with resposta:
+        assert [n for n, _, _ in download.iter_concursos(resposta.arquivo)] == [1, 2, 3]
+        download.salva_meta(meta, servidor.url, resposta)
+    assert resposta.etag == '"v1"'
+
+    assert download.busca(servidor.url, meta) is None
+    assert servidor.respostas == {200: 1, 304: 1}
+    # sem `condicional` o corpo vem de novo
+    with download.busca(servidor.url, meta, condicional=False):
+        pass
+    assert servidor.respostas[200] == 2
+
+
+def test_baixa_hist_anexa_so_os_novos(servidor, motor, monkeypatch):
+    pytest.importorskip('numpy')
+    assert len(motor.baixa_hist()) == 3
+
+    # nada mudou: um único 304, cache intacto
+    assert len(motor.baixa_hist()) == 3
+    assert servidor.respostas == {200: 1, 304: 1}
+
+    anexados = []
+    anexa = motor._anexa_cache
+    monkeypatch.setattr(motor, '_anexa_cache', lambda novos, *a: (anexados.append(novos), anexa(novos, *a)))
+    servidor.publica(CONCURSOS, '"v2"')
+    concursos = motor.baixa_hist()
+
+    assert anexados == [[dz for _, _, dz in CONCURSOS[3:]]]
+    assert list(concursos) == [dz for _, _, dz in CONCURSOS]
+    assert list(motor._le_cache()) == [dz for _, _, dz in CONCURSOS]
+    regs = motor.carrega_array()
+    assert regs['concurso'].tolist() == [1, 2, 3, 4, 5]
+    assert servidor.respostas == {200: 2, 304: 1}
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Pipeline declarativo de filtros: config (dict/JSON, null desliga, chave errada
+falha), regras compiladas iguais às escritas por extenso, reordenação adaptativa
+sem mudar a decisão e as regras do DATA_DIR/filtros.json no motor."""
+import json
+import pickle
+import random
+from collections import Counter
+
+import pytest
+
+from src.core import filters
+
+CONFIGS = [
+    {},
+    {'pares_max': 1, 'sequencia_max': 0, 'finais_max': 1, 'decadas_min': 5, 'soma_min': 150, 'soma_max': 200,
+     'primos_max': 1},
+    {'pares_max': None, 'sequencia_max': 4, 'finais_max': 7, 'decadas_min': None, 'soma_min': None,
+     'soma_max': 180, 'primos_max': 6},
+]
+
+
+def _por_extenso(jogo, config):
+    j = sorted(jogo)
+    corrida = maior = 1
+    for a, b in zip(j, j[1:]):
+        corrida = corrida + 1 if b == a + 1 else 1
+        maior = max(maior, corrida)
+    checks = {
+        'pares_max': lambda v: sum(d % 2 == 0 for d in j) <= v,
+        'sequencia_max': lambda v: maior <= v,
+        'finais_max': lambda v: max(Counter(d % 10 for d in j).values()) <= v,
+        'decadas_min': lambda v: len({d // 10 for d in j}) >= v,
+        'soma_min': lambda v: sum(j) >= v,
+        'soma_max': lambda v: sum(j) <= v,
+        'primos_max': lambda v: sum(d in filters.PRIMOS for d in j) <= v,
+    }
+    return all(checks[k](v) for k, v in config.items() if k in checks and v is not None)
+
+
+def _jogos(n, seed=1):
+    rng = random.Random(seed)
+    return [sorted(rng.sample(range(1, 61), 6)) for _ in range(n)]
+
+
+@pytest.mark.parametrize('config', CONFIGS)
+def test_regras_compiladas(config):
+    config = dict(config, historico=False)
+    pipeline = filters.Pipeline(config)
+    completa = pipeline.config
+    jogos = _jogos(5000)
+    esperado = [_por_extenso(j, completa) for j in jogos]
+    assert [pipeline.aprova(j) for j in jogos] == esperado
+    np = pytest.importorskip('numpy')
+    ok = np.ones(len(jogos), dtype=bool)
+    for _, m in pipeline.regras_mask(np.array(jogos)):
+        ok &= m
+    assert ok.tolist() == esperado
+
+
+def test_config(tmp_path):
+    assert filters.carrega_config() == filters.PADRAO
+    with pytest.raises(ValueError, match='somas'):
+        filters.carrega_config({'somas': 1})
+    caminho = tmp_path / 'filtros.json'
+    caminho.write_text(json.dumps({'soma_min': None, 'soma_max': None, 'historico': False}))
+    pipeline = filters.Pipeline(str(caminho))
+    assert 'soma' not in [r.nome for r in pipeline.ordem] and not pipeline.usa_historico
+    assert not pipeline.padrao and filters.Pipeline().padrao
+    assert filters.Pipeline({'historico': False}).chave == filters.Pipeline().chave
+
+
+def test_reordena_sem_mudar_a_decisao(monkeypatch):
+    monkeypatch.setattr(filters, 'REORDENA', 500)
+    fixa = filters.Pipeline(adaptativo=False)
+    adaptativa = filters.Pipeline()
+    jogos = _jogos(3000, seed=2)
+    assert [adaptativa.aprova(j) for j in jogos] == [fixa.aprova(j) for j in jogos]
+    # a ordem clássica começa por pares; a adaptativa põe a regra mais seletiva por custo na frente
+    assert [r.nome for r in fixa.ordem][0] == 'pares'
+    assert sorted(r.nome for r in adaptativa.ordem) == sorted(r.nome for r in fixa.ordem)
+    taxas = fixa.taxas()
+    assert adaptativa.ordem[0].nome == max(fixa.ordem, key=lambda r: taxas[r.nome] / r.custo).nome
+
+
+def test_pickle_recompila():
+    pipeline = filters.Pipeline({'soma_min': 170, 'historico': False}, adaptativo=False)
+    copia = pickle.loads(pickle.dumps(pipeline))
+    assert copia.config == pipeline.config and not copia.adaptativo
+    jogos = _jogos(500, seed=3)
+    assert [copia.aprova(j) for j in jogos] == [pipeline.aprova(j) for j in jogos]
+
+
+def test_motor_usa_filtros_json(motor):
+    with open(motor.FILTROS, 'w') as f:
+        json.dump({'soma_min': 200, 'soma_max': None, 'historico': False}, f)
+    jogos = motor.gerar_jogos(50, seed=1)
+    assert all(sum(j) >= 200 for j in jogos)
+    assert not motor.filtros_ok([1, 12, 23, 34, 45, 57], [])  # soma 172
+    motor.configura_filtros(None)
+    assert motor.pipeline_filtros().padrao
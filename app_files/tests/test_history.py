@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Índice de pertinência do histórico: mesma resposta que `jogo in concursos`,
+índice em dia depois de cada mutação da lista e preservado no pickle."""
+import pickle
+import random
+
+import pytest
+
+from src.core.history import Concursos, IndiceHistorico, indexa, mascara
+
+from conftest import historico_sintetico
+
+
+def test_pertinencia_igual_a_busca_linear():
+    concursos = historico_sintetico(500)
+    indice = IndiceHistorico(concursos)
+    rng = random.Random(1)
+    jogos = concursos[::7] + [sorted(rng.sample(range(1, 61), 6)) for _ in range(2000)]
+    assert [j in indice for j in jogos] == [j in concursos for j in jogos]
+    assert all(indice.contem_mascara(mascara(c)) for c in concursos)
+    assert len(indice) == len({tuple(c) for c in concursos})
+
+
+def test_so_concursos_de_6_dezenas_distintas():
+    indice = IndiceHistorico([[1, 2, 3, 4, 5, 6], [1, 1, 2, 3, 4, 5], [1, 2, 3, 4, 5]])
+    assert len(indice) == 1
+    assert [1, 2, 3, 4, 5, 6] in indice
+    assert [1, 1, 2, 3, 4, 5] not in indice
+    assert [1, 2, 3, 4, 5, 6, 7] not in indice  # aposta maior contém o concurso, mas não é ele
+
+
+def test_indice_acompanha_mutacoes():
+    a, b, c, d = [1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12], [13, 14, 15, 16, 17, 18], [19, 20, 21, 22, 23, 24]
+    concursos = Concursos([a])
+    concursos.append(b)
+    concursos.extend(iter([c]))
+    concursos += [d]
+    assert all(x in concursos.indice for x in (a, b, c, d))
+    concursos.pop()
+    assert d not in concursos.indice
+    del concursos[0]
+    assert a not in concursos.indice
+    concursos[0] = d
+    assert b not in concursos.indice and d in concursos.indice
+    concursos.remove(c)
+    assert c not in concursos.indice
+    concursos.insert(0, a)
+    assert concursos == [a, d] and a in concursos.indice
+    concursos.clear()
+    assert len(concursos.indice) == 0
+
+
+def test_pickle_e_indexa():
+    concursos = Concursos(historico_sintetico(50))
+    copia = pickle.loads(pickle.dumps(concursos))
+    assert isinstance(copia, Concursos) and copia == concursos
+    assert all(c in copia.indice for c in concursos)
+    assert indexa(concursos) is concursos
+    assert isinstance(indexa(list(concursos)), Concursos)
+
+
+def test_array_ordenado():
+    np = pytest.importorskip('numpy')
+    concursos = historico_sintetico(200)
+    arr = IndiceHistorico(concursos + concursos[:10]).array()
+    assert arr.dtype == np.uint64 and (np.diff(arr.astype(object)) > 0).all()
+    assert sorted(map(int, arr)) == sorted({mascara(c) for c in concursos})
+
+
+def test_carrega_concursos_traz_o_indice(motor, historico):
+    concursos = motor.carrega_concursos()
+    assert isinstance(concursos, Concursos) and concursos == historico
+    assert all(c in concursos.indice for c in historico)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Importação de vários arquivos: expansão de diretórios/globs, fusão por nº do
+concurso com conflitos (maioria; empate = primeiro arquivo), relatório de arquivos
+ruins e de concursos faltando, e o mesmo resultado com 1 ou N workers."""
+import pytest
+
+from src.core import importer
+
+
+def _csv(caminho, linhas):
+    with open(caminho, 'w', encoding='utf8') as f:
+        f.write('Concurso;Data Sorteio;Bola1;Bola2;Bola3;Bola4;Bola5;Bola6\n')
+        for n, d, dz in linhas:
+            f.write(f'{n};{d};' + ';'.join(map(str, dz)) + '\n')
+
+
+def _linha(n, dz=None, data=''):
+    return n, data, dz or [n, n + 1, n + 2, n + 3, n + 4, n + 5]
+
+
+@pytest.fixture
+def arquivos(tmp_path):
+    pasta = tmp_path / 'exportacoes'
+    pasta.mkdir()
+    a, b, c = str(pasta / 'a_1996.csv'), str(pasta / 'b_1997.csv'), str(pasta / 'c_fonte2.csv')
+    _csv(a, [_linha(1, data='11/03/1996'), _linha(2), _linha(3, [1, 2, 3, 4, 5, 6])])
+    _csv(b, [_linha(2, data='18/03/1996'), _linha(3, [7, 8, 9, 10, 11, 12]), _linha(4, [9, 8, 7, 6, 5, 4]),
+             ('', '', [1, 2, 3, 4, 5, 7])])
+    _csv(c, [_linha(3, [7, 8, 9, 10, 11, 12]), _linha(4, [20, 21, 22, 23, 24, 25]), _linha(7)])
+    (pasta / 'leia-me.txt').write_text('ignorado')
+    (pasta / 'quebrado.xlsx').write_bytes(b'isto nao e um zip')
+    return pasta, a, b, c
+
+
+def test_expande(arquivos, tmp_path):
+    pasta, a, b, c = arquivos
+    quebrado = str(pasta / 'quebrado.xlsx')
+    assert importer.expande(str(pasta)) == [a, b, c, quebrado]
+    assert importer.expande([c, str(pasta / '*.csv')]) == [c, a, b]
+    with pytest.raises(FileNotFoundError):
+        importer.expande(str(tmp_path / 'nao_existe.csv'))
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_fusao_e_relatorio(arquivos, workers):
+    pasta, a, b, c = arquivos
+    imp = importer.importa(str(pasta), workers=workers)
+    assert imp.numeros == [1, 2, 3, 4, 7]
+    assert imp.concursos == [[1, 2, 3, 4, 5, 6], [2, 3, 4, 5, 6, 7], [7, 8, 9, 10, 11, 12],
+                             [4, 5, 6, 7, 8, 9], [7, 8, 9, 10, 11, 12]]
+    assert imp.datas[:2] == ['11/03/1996', '18/03/1996']  # data do primeiro arquivo que a tem
+    r = imp.relatorio()
+    assert r['sem_numero'] == 1 and r['faltando'] == 2 and r['faltando_exemplos'] == [5, 6]
+    conflitos = {x['concurso']: x for x in r['conflitos']}
+    assert set(conflitos) == {3, 4}
+    # 3: a versão de b e c (2 arquivos) vence a de a; 4: empate, vale o primeiro arquivo (b)
+    assert conflitos[3]['escolhido'] == [7, 8, 9, 10, 11, 12]
+    assert [v['arquivos'] for v in conflitos[3]['versoes']] == [[a], [b, c]]
+    assert conflitos[4]['escolhido'] == [4, 5, 6, 7, 8, 9]
+    (ruim,) = [x for x in r['arquivos'] if x['erro']]
+    assert ruim['arquivo'].endswith('quebrado.xlsx') and ruim['linhas'] == 0
+    assert [x['linhas'] for x in r['arquivos'] if not x['erro']] == [3, 4, 3]
+
+
+def test_motor_importar_arquivos(motor, arquivos):
+    pasta, a, b, c = arquivos
+    imp = motor.importar_arquivos([a, b], workers=1)
+    assert motor.carrega_concursos() == imp.concursos and len(imp.concursos) == 4
+    with pytest.raises(ValueError):
+        motor.importar_arquivos(str(pasta / 'quebrado.xlsx'))
+    assert motor.carrega_concursos() == imp.concursos  # importação vazia não apaga o cache
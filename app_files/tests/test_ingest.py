@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Leitura em fluxo de CSV/XLSX: inferência das colunas (pelo cabeçalho ou pelo
+conteúdo de uma amostra), leitura coluna a coluna do .xlsx igual à linha a linha,
+e arquivos fechados mesmo quando a inferência desiste."""
+import gc
+import os
+import warnings
+import zipfile
+from contextlib import closing
+
+import pytest
+
+from src.core import ingest
+
+DADOS = [
+    [1, '11/03/1996', 4, 5, 30, 33, 41, 52],
+    [2, '18/03/1996', 9, 37, 39, 41, 43, 49],
+    [3, '25/03/1996', 10, 11, 29, 30, 36, 47],
+    [4, '01/04/1996', 1, 5, 6, 27, 42, 59],
+    [5, '08/04/1996', 1, 2, 6, 16, 19, 46],
+]
+CABECALHO = ['Concurso', 'Data Sorteio', 'Bola1', 'Bola2', 'Bola3', 'Bola4', 'Bola5', 'Bola6']
+
+
+def _xlsx(caminho, linhas):
+    """.xlsx com strings compartilhadas, data como serial com estilo de data, células
+    ausentes, uma coluna extra e uma célula repetida na mesma linha."""
+    compartilhadas = CABECALHO + ['obs']
+    ns = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    xml = [f'<worksheet xmlns="{ns}"><sheetData>']
+    xml.append('<row r="1">' + ''.join(f'<c r="{chr(65 + j)}1" t="s"><v>{j}</v></c>' for j in range(8))
+               + '<c r="J1" t="s"><v>8</v></c></row>')
+    for i, linha in enumerate(linhas, 2):
+        celulas = []
+        for j, v in enumerate(linha):
+            ref = f'{chr(65 + j)}{i}'
+            if v is None:
+                continue  # célula ausente
+            if j == 1:
+                d, m, a = map(int, v.split('/'))
+                import datetime
+                serial = (datetime.date(a, m, d) - datetime.date(1899, 12, 30)).days
+                celulas.append(f'<c r="{ref}" s="1"><v>{serial}</v></c>')
+            else:
+                celulas.append(f'<c r="{ref}"><v>{v}</v></c>')
+        celulas.append(f'<c r="J{i}" t="inlineStr"><is><t> nota {i} </t></is></c>')
+        if i == 3:
+            celulas.append(f'<c r="C{i}"><v>60</v></c>')  # repetida: vale a primeira
+        xml.append(f'<row r="{i}">' + ''.join(celulas) + '</row>')
+    xml.append('</sheetData></worksheet>')
+    with zipfile.ZipFile(caminho, 'w') as z:
+        z.writestr('xl/worksheets/sheet1.xml', ''.join(xml))
+        z.writestr('xl/sharedStrings.xml', f'<sst xmlns="{ns}">'
+                   + ''.join(f'<si><t>{t}</t></si>' for t in compartilhadas) + '</sst>')
+        z.writestr('xl/styles.xml', f'<styleSheet xmlns="{ns}"><cellXfs>'
+                   '<xf numFmtId="0"/><xf numFmtId="14"/></cellXfs></styleSheet>')
+
+
+def _csv(caminho, linhas):
+    with open(caminho, 'w', encoding='utf8') as f:
+        f.write(';'.join(CABECALHO) + '\n')
+        for linha in linhas:
+            f.write(';'.join('' if v is None else str(v) for v in linha) + '\n')
+
+
+def _conteudo(hist):
+    return [(hist.concurso(i), hist.datas[i], hist.jogo(i)) for i in range(len(hist))]
+
+
+def test_csv(tmp_path):
+    caminho = str(tmp_path / 'h.csv')
+    _csv(caminho, DADOS + [[6, '15/04/1996', 1, 2, 3, 4, 5, 61], [7, '', 1, 2, 3, 4, 5, None]])
+    hist = ingest.le_historico(caminho)
+    assert _conteudo(hist) == [(n, d, sorted(dz)) for n, d, *dz in DADOS]
+
+
+@pytest.mark.parametrize('bloco', [1, 2, 1000])
+def test_xlsx_colunas_igual_a_linhas(tmp_path, bloco):
+    caminho = str(tmp_path / 'h.xlsx')
+    dados = [list(l) for l in DADOS] + [[6, '15/04/1996', 7, None, 9, 10, 11, 12]]
+    _xlsx(caminho, dados)
+    hist = ingest.le_xlsx(caminho, bloco=bloco)
+    esperado = [(n, d, sorted(dz)) for n, d, *dz in DADOS]
+    assert _conteudo(hist) == esperado
+
+    header, linhas = ingest.iter_linhas(caminho)
+    with closing(linhas):
+        assert header[:8] == CABECALHO
+        assert _conteudo(ingest.historico_de_linhas(header, linhas)) == esperado
+    assert _conteudo(ingest.le_historico(caminho)) == esperado
+
+
+def test_blocos_colunas_alinhados(tmp_path):
+    caminho = str(tmp_path / 'h.xlsx')
+    _xlsx(caminho, [[1, '11/03/1996', 1, 2, None, 4, 5, 6], [2, None, 7, 8, 9, 10, 11, 12]])
+    with zipfile.ZipFile(caminho) as z:
+        (bloco,) = ingest.blocos_colunas_xlsx(z, [1, 4, 9])
+    assert bloco == [['11/03/1996', ''], ['', '9'], ['nota 2', 'nota 3']]
+
+
+@pytest.mark.parametrize('nome, escreve', [('h.csv', _csv), ('h.xlsx', _xlsx)])
+def test_arquivo_fechado_quando_nao_ha_dezenas(tmp_path, nome, escreve):
+    caminho = str(tmp_path / nome)
+    escreve(caminho, [[n, d, 'x', 'y', 'z', 'w', 'k', 'q'] for n, d, *_ in DADOS])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', ResourceWarning)
+        assert len(ingest.le_historico(caminho)) == 0
+        gc.collect()
+    os.remove(caminho)  # no Windows falharia com o arquivo ainda aberto
+
+
+def test_infere_colunas_pelo_cabecalho():
+    header = ['Concurso', 'Cidade', 'Data Sorteio', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6']
+    amostra = [['10', 'X', '01/02/2000', '1', '2', '3', '4', '5', '6']]
+    assert ingest.infere_colunas(header, amostra) == ([3, 4, 5, 6, 7, 8], 0, 2)
+
+
+def test_infere_colunas_pelo_conteudo():
+    # cabeçalho sem pistas: dezenas pelos valores em 1..60, data pelo formato, concurso pelo resto
+    header = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i']
+    amostra = [[str(1000 + i), f'{i + 1:02d}/01/2001', 'obs'] + [str(d) for d in range(i + 1, i + 7)]
+               for i in range(20)]
+    assert ingest.infere_colunas(header, amostra) == ([3, 4, 5, 6, 7, 8], 0, 1)
+    assert ingest.infere_colunas(None, []) == ([], None, None)
+
+
+def test_amostra_limitada_nao_perde_linhas(tmp_path):
+    caminho = str(tmp_path / 'h.csv')
+    _csv(caminho, [[100 + i, '11/03/1996'] + list(range(i % 50 + 1, i % 50 + 7)) for i in range(100)])
+    hist = ingest.le_historico(caminho, amostra=3)
+    assert len(hist) == 100
+    assert [hist.concurso(i) for i in hist.ordem()] == list(range(100, 200))
+
+
+def test_carregar_arquivo_local_ordena_e_grava_o_cache(motor, tmp_path):
+    caminho = str(tmp_path / 'h.csv')
+    _csv(caminho, list(reversed(DADOS)) + [[9, '', 'x', 2, 3, 4, 5, 6]])
+    esperado = [sorted(dz) for _, _, *dz in DADOS]
+    assert motor.carregar_arquivo_local(caminho) == esperado
+    assert motor.carrega_concursos() == esperado
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Journal do histórico: anexos lidos em cadeia sobre o snapshot, linha final
+rasgada ignorada, compactação que preserva o journal de quem leu o snapshot
+antigo, versões anteriores/restauração e escritores concorrentes sem perdas."""
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from src.core import journal
+from src.core.journal import Armazem
+
+from conftest import historico_sintetico
+
+
+def _anexa_varios(data_dir, inicio, n):
+    a = Armazem(data_dir)
+    for i in range(inicio, inicio + n):
+        a.anexa([[i % 55 + 1, i % 55 + 2, i % 55 + 3, i % 55 + 4, i % 55 + 5, i % 55 + 6]], numeros=[i])
+
+
+def test_anexa_e_le(tmp_path):
+    a = Armazem(tmp_path)
+    base = historico_sintetico(10)
+    a.grava(base)
+    chamadas = []
+    a.anexa([[1, 2, 3, 4, 5, 6]], numeros=[11], datas=['01/01/2000'], apos=chamadas.append)
+    a.anexa([[7, 8, 9, 10, 11, 12], [13, 14, 15, 16, 17, 18]], apos=chamadas.append)
+    a.anexa([])
+    assert chamadas == [10, 11]
+    r = a.le()
+    assert r.concursos == base + [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12], [13, 14, 15, 16, 17, 18]]
+    assert r.numeros == [None] * 10 + [11, None, None]
+    assert r.datas[10] == '01/01/2000' and r.linhas == 2
+    # o snapshot continua no formato de sempre
+    with open(a.snapshot) as f:
+        assert json.load(f) == base
+
+
+def test_linha_rasgada_e_base_antiga_ignoradas(tmp_path):
+    a = Armazem(tmp_path)
+    a.grava([[1, 2, 3, 4, 5, 6]])
+    a.anexa([[7, 8, 9, 10, 11, 12]])
+    with open(a.journal, 'ab') as f:
+        f.write(b'{"base": "x", "n0": 2, "conc')  # escritor interrompido no meio do write
+    assert a.le().concursos == [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12]]
+    a.anexa([[13, 14, 15, 16, 17, 18]])
+    assert a.le().concursos[-1] == [13, 14, 15, 16, 17, 18] and a.le().linhas == 2
+    # substituir o histórico deixa as linhas antigas sem efeito
+    a.grava([[20, 21, 22, 23, 24, 25]])
+    assert a.le().concursos == [[20, 21, 22, 23, 24, 25]] and a.le().linhas == 0
+
+
+def test_compactacao_preserva_leitor_do_snapshot_antigo(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, 'COMPACTA', 3)
+    a = Armazem(tmp_path)
+    a.grava([[1, 2, 3, 4, 5, 6]])
+    with open(a.snapshot, 'rb') as f:
+        antigo = f.read()
+    _anexa_varios(tmp_path, 10, 3)  # a terceira linha dispara a compactação
+    esperado = a.le().concursos
+    assert len(esperado) == 4 and a.le().linhas == 0
+    with open(a.snapshot) as f:
+        assert json.load(f) == esperado
+    # quem leu o snapshot antigo antes da troca ainda acha as linhas que o estendem
+    monkeypatch.setattr(a, '_le_snapshot', lambda: (json.loads(antigo), journal._hash(antigo)))
+    assert a.le().concursos == esperado
+    # na compactação seguinte as linhas do snapshot antigo saem (ficam só as do substituído agora)
+    monkeypatch.undo()
+    _anexa_varios(tmp_path, 20, 1)
+    a.compacta()
+    bases = {journal._entrada(l)['base'] for l in a._linhas()}
+    assert journal._hash(antigo) not in bases and len(bases) == 1
+    assert len(a.le().concursos) == 5 and a.le().linhas == 0
+
+
+def test_versoes_e_restaura(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, 'MANTER', 2)
+    a = Armazem(tmp_path)
+    for n in (1, 2, 3, 4):
+        a.grava(historico_sintetico(n, seed=n))
+    versoes = a.versoes()
+    assert len(versoes) == 2  # só as MANTER mais recentes
+    with open(versoes[0]) as f:
+        assert json.load(f) == historico_sintetico(3, seed=3)
+    assert a.restaura(os.path.basename(versoes[1])) == historico_sintetico(2, seed=2)
+    assert a.le().concursos == historico_sintetico(2, seed=2)
+    with open(a.versoes()[0]) as f:
+        assert json.load(f) == historico_sintetico(4, seed=4)  # o estado substituído virou versão
+
+
+@pytest.mark.skipif(journal.fcntl is None, reason='escritores concorrentes testados com fork')
+def test_escritores_concorrentes(tmp_path):
+    Armazem(tmp_path).grava([])
+    ctx = multiprocessing.get_context('fork')
+    processos = [ctx.Process(target=_anexa_varios, args=(str(tmp_path), 100 * p, 15)) for p in range(4)]
+    for p in processos:
+        p.start()
+    for p in processos:
+        p.join(60)
+        assert p.exitcode == 0
+    r = Armazem(tmp_path).le()
+    assert sorted(r.numeros) == sorted(100 * p + i for p in range(4) for i in range(15))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Geração em shards: a mesma seed dá a mesma saída para qualquer nº de workers,
+shards cobrem a quantidade exata e regras customizadas chegam aos workers."""
+import pytest
+
+from src.core import filters, parallel
+
+from conftest import historico_sintetico
+
+
+def test_shards(monkeypatch):
+    monkeypatch.setattr(parallel, 'SHARD', 4)
+    assert parallel.shards(10, 9) == [(9, 0, 4), (9, 1, 4), (9, 2, 2)]
+    assert parallel.shards(0, 9) == []
+
+
+@pytest.mark.parametrize('lote', [None, 64])
+def test_mesma_saida_para_qualquer_numero_de_workers(monkeypatch, lote):
+    if lote:
+        pytest.importorskip('numpy')
+    monkeypatch.setattr(parallel, 'SHARD', 50)
+    concursos = historico_sintetico(200)
+    pesos = {d: 1.0 + d % 7 for d in range(1, 61)}
+    saidas = [parallel.gerar_jogos_paralelo(230, concursos, pesos, workers=w, seed=11, lote=lote)
+              for w in (1, 2, 3)]
+    assert saidas[0] == saidas[1] == saidas[2]
+    jogos = saidas[0]
+    assert len(jogos) == 230 and len({tuple(j) for j in jogos}) > 200
+    assert all(filters.padrao().aprova(j, concursos) for j in jogos)
+    assert parallel.gerar_jogos_paralelo(230, concursos, pesos, workers=2, seed=12, lote=lote) != jogos
+
+
+def test_pipeline_customizado_nos_workers(monkeypatch):
+    monkeypatch.setattr(parallel, 'SHARD', 20)
+    pipeline = filters.Pipeline({'soma_min': 200, 'soma_max': None, 'historico': False})
+    jogos = parallel.gerar_jogos_paralelo(60, [], None, workers=2, seed=1, pipeline=pipeline)
+    assert len(jogos) == 60 and all(sum(j) >= 200 for j in jogos)
+
+
+def test_engine_com_workers(motor):
+    assert motor.gerar_jogos(40, seed=3, workers=2) == motor.gerar_jogos(40, seed=3, workers=1)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Partida rápida: importar o motor não carrega numpy/argparse/rede nem os módulos
+irmãos, não cria DATA_DIR nem mexe no logging; a CLI (rodada como script) mostra
+o perfil de partida com --profile-startup."""
+import json
+import os
+import subprocess
+import sys
+
+from conftest import historico_sintetico
+
+APP = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PESADOS = ('numpy', 'argparse', 'csv', 'socket', 'urllib.request', 'zipfile', 'fpdf')
+
+SONDA = f'''
+import json, logging, sys
+from src.core import engine
+print(json.dumps({{
+    'pesados': [m for m in {PESADOS!r} if m in sys.modules],
+    'core': sorted(m for m in sys.modules if m.startswith('src.core.')),
+    'handlers': len(logging.getLogger().handlers),
+}}))
+'''
+
+
+def _roda(args, data_dir, **kw):
+    env = dict(os.environ, CARTELA_DATA_DIR=str(data_dir), PYTHONPATH=APP)
+    return subprocess.run([sys.executable] + args, cwd=APP, env=env, capture_output=True, text=True,
+                          timeout=120, check=True, **kw)
+
+
+def test_importar_nao_tem_efeitos(tmp_path):
+    data_dir = tmp_path / 'data'
+    r = json.loads(_roda(['-c', SONDA], data_dir).stdout)
+    assert r == {'pesados': [], 'core': ['src.core.engine'], 'handlers': 0}
+    assert not data_dir.exists()
+
+
+def test_cli_como_script_com_profile_startup(tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    (data_dir / 'mega_cache.json').write_text(json.dumps(historico_sintetico(300)))
+    r = _roda([os.path.join('src', 'core', 'engine.py'), '5', '--profile-startup'], data_dir)
+    assert len([l for l in r.stdout.splitlines() if l.strip()]) == 5
+    assert 'Perfil de partida' in r.stderr
+    for etapa in ('importação de engine', 'carga do histórico', 'primeiro resultado', 'total'):
+        assert etapa in r.stderr
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Carteira sob orçamento: bitsets de cobertura iguais à contagem por conjuntos,
+escolha gulosa preguiçosa igual à gulosa completa (cada aposta tem o melhor
+ganho/custo do passo) e orçamento respeitado com tamanhos misturados."""
+import random
+from itertools import combinations
+from math import comb
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import batch, portfolio  # noqa: E402
+
+
+def _custo(q):
+    return 6 * comb(q, 6) if 6 <= q <= 20 else 0
+
+
+def _cobertos(apostas, r):
+    return {c for a in apostas for c in combinations(sorted(a), r)}
+
+
+def _ganho(aposta, apostas, pp=1.0, pt=1.0):
+    novos_pares = {c for c in combinations(sorted(aposta), 2)} - _cobertos(apostas, 2)
+    novos_trios = {c for c in combinations(sorted(aposta), 3)} - _cobertos(apostas, 3)
+    return pp * len(novos_pares) + pt * len(novos_trios)
+
+
+def test_cobertura_e_ganho():
+    rng = random.Random(1)
+    apostas = [sorted(rng.sample(range(1, 61), q)) for q in (6, 8, 6, 7)]
+    cob = portfolio.Cobertura()
+    candidatos = np.array([sorted(rng.sample(range(1, 61), 6)) for _ in range(200)])
+    for i, a in enumerate(apostas):
+        ganho = cob.ganho(candidatos - 1, batch.mascaras(candidatos), 1.0, 2.0)
+        assert ganho.tolist() == [_ganho(c, apostas[:i], 1.0, 2.0) for c in candidatos.tolist()]
+        cob.adiciona(np.array(a) - 1)
+    assert cob.pares() == len(_cobertos(apostas, 2))
+    assert cob.trios() == len(_cobertos(apostas, 3))
+    assert portfolio.Cobertura(trios=False).trios() is None
+
+
+@pytest.mark.parametrize('lote', [4, 1024])
+def test_gulosa_preguicosa_igual_a_completa(lote):
+    rng = np.random.default_rng(2)
+    candidatos = {6: np.sort(np.array([rng.choice(60, 6, replace=False) + 1 for _ in range(300)]), axis=1),
+                  7: np.sort(np.array([rng.choice(60, 7, replace=False) + 1 for _ in range(100)]), axis=1)}
+    orcamento = 6 * 20 + 42 * 3
+    r = portfolio.otimiza(candidatos, orcamento, _custo, lote=lote)
+    assert r['custo'] == sum(_custo(len(a)) for a in r['apostas']) <= orcamento
+    assert r['pares'] == len(_cobertos(r['apostas'], 2)) and r['trios'] == len(_cobertos(r['apostas'], 3))
+    # reexecuta a gulosa completa: cada escolha tem o maior ganho/custo entre os que ainda cabem
+    todos = [c for q in candidatos for c in map(list, {tuple(x) for x in candidatos[q].tolist()})]
+    feitas, gasto = [], 0
+    for aposta in r['apostas']:
+        cabem = [c for c in todos if c not in feitas and _custo(len(c)) <= orcamento - gasto]
+        melhor = max(_ganho(c, feitas) / _custo(len(c)) for c in cabem)
+        assert _ganho(aposta, feitas) / _custo(len(aposta)) == pytest.approx(melhor)
+        feitas.append(aposta)
+        gasto += _custo(len(aposta))
+
+
+def test_motor_monta_carteira(motor, historico):
+    carteira = motor.monta_carteira(200, n_candidatos=2000, tamanhos=(6, 7), seed=1)
+    assert 0 < carteira['custo'] <= 200
+    assert carteira['custo'] == sum(motor.custo_aposta(len(a)) for a in carteira['apostas'])
+    assert {len(a) for a in carteira['apostas']} <= {6, 7}
+    assert not any(a in historico for a in carteira['apostas'] if len(a) == 6)
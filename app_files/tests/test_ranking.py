@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Ranking de Mahalanobis: características e distâncias iguais ao cálculo direto,
+top-k em fluxo igual a ordenar todas as candidatas e o mesmo top-k com 1 ou N workers."""
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import ranking  # noqa: E402
+from src.core.filters import PRIMOS  # noqa: E402
+
+
+def _caracteristicas(c):
+    c = sorted(c)
+    return [sum(c), sum(d % 2 == 0 for d in c), sum(d in PRIMOS for d in c), sum(d <= 30 for d in c),
+            len({(d - 1) // 10 for d in c}), len({(d - 1) % 10 for d in c}),
+            sum(b == a + 1 for a, b in zip(c, c[1:])), c[-1] - c[0]]
+
+
+def _todas(modelo, B, k):
+    """Top-k por força bruta: ordena por (distância, ordem) e descarta cartelas repetidas."""
+    d = modelo.distancias(B)
+    vistas, top = set(), []
+    for i in np.lexsort((np.arange(len(d)), d)):
+        c = tuple((np.flatnonzero(B[i]) + 1).tolist())
+        if c not in vistas:
+            vistas.add(c)
+            top.append((list(c), float(d[i])))
+        if len(top) == k:
+            break
+    return top
+
+
+def test_caracteristicas():
+    rng = random.Random(1)
+    cartelas = [rng.sample(range(1, 61), q) for q in (25, 25, 6, 60, 1)]
+    X = ranking.caracteristicas(ranking.pertinencia(cartelas))
+    assert X.tolist() == [_caracteristicas(c) for c in cartelas]
+
+
+def test_distancias_iguais_a_formula():
+    ref = ranking.sorteia(np.random.default_rng(1), 5000)
+    modelo = ranking.Modelo(ref)
+    X = ranking.caracteristicas(ref)
+    cov = np.cov(X, rowvar=False)
+    cov += np.eye(len(cov)) * max(1e-9, 1e-9 * np.trace(cov))
+    B = ranking.sorteia(np.random.default_rng(2), 300)
+    Z = ranking.caracteristicas(B) - X.mean(axis=0)
+    esperado = np.einsum('ij,jk,ik->i', Z, np.linalg.inv(cov), Z)
+    assert modelo.distancias(B) == pytest.approx(esperado, rel=1e-8)
+    alvo = list(range(1, 26))
+    assert ranking.Modelo(ref, alvo).distancias(ranking.pertinencia([alvo]))[0] == pytest.approx(0, abs=1e-12)
+
+
+def test_top_k_em_blocos_igual_a_forca_bruta():
+    modelo = ranking.modelo_padrao(amostra=3000)
+    B = ranking.sorteia(np.random.default_rng(3), 5000, 8)
+    B[4000:4100] = B[:100]  # repetidas não ocupam duas vagas
+    blocos = [B[i:i + 700] for i in range(0, len(B), 700)]
+    assert ranking.ranqueia_blocos(modelo, blocos, k=15) == _todas(modelo, B, 15)
+
+
+def test_ranqueia_igual_para_qualquer_numero_de_workers(monkeypatch):
+    monkeypatch.setattr(ranking, 'SHARD', 1000)
+    modelo = ranking.modelo_padrao(amostra=3000)
+    um = ranking.ranqueia(modelo, 3500, k=12, seed=5, workers=1)
+    assert ranking.ranqueia(modelo, 3500, k=12, seed=5, workers=3) == um
+    # as mesmas candidatas, sorteadas shard a shard, ordenadas de uma vez
+    partes = []
+    for indice, ini in enumerate(range(0, 3500, 1000)):
+        rng = np.random.default_rng(np.random.SeedSequence(5, spawn_key=(indice,)))
+        partes.append(ranking.sorteia(rng, min(1000, 3500 - ini)))
+    assert um == _todas(modelo, np.concatenate(partes), 12)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Escritores em blocos: formato do texto/CSV, largura fixa do CSV com apostas de
+tamanhos variados e fechamento de todas as saídas quando uma falha."""
+import csv
+import io
+
+import pytest
+
+from src.core import saida
+
+
+def _linhas_csv(caminho):
+    with open(caminho, newline='', encoding='utf8') as f:
+        return list(csv.reader(f, delimiter=';'))
+
+
+class Registra:
+    """Saída falsa que guarda os blocos recebidos e se fecha (ou falha ao escrever)."""
+
+    def __init__(self, falha_em=None):
+        self.blocos = []
+        self.fechada = False
+        self.falha_em = falha_em
+
+    def escreve(self, inicio, jogos):
+        if inicio == self.falha_em:
+            raise RuntimeError('disco cheio')
+        self.blocos.append((inicio, list(jogos)))
+
+    def fecha(self):
+        self.fechada = True
+
+
+def test_texto_e_csv_em_blocos(tmp_path):
+    jogos = [[i, i + 1, i + 2, i + 3, i + 4, i + 5] for i in range(1, 26)]
+    texto = io.StringIO()
+    registro = Registra()
+    caminho = str(tmp_path / 'j.csv')
+    total = saida.escreve_em_blocos(iter(jogos), [saida.SaidaTexto(texto), saida.SaidaCSV(caminho), registro],
+                                    bloco=10)
+    assert total == 25
+    assert [(i, len(b)) for i, b in registro.blocos] == [(1, 10), (11, 10), (21, 5)]
+    assert registro.fechada
+    assert texto.getvalue().splitlines()[0] == '01: 01 - 02 - 03 - 04 - 05 - 06'
+    linhas = _linhas_csv(caminho)
+    assert linhas[0] == ['Numero', 'D1', 'D2', 'D3', 'D4', 'D5', 'D6']
+    assert linhas[25] == ['25', '25', '26', '27', '28', '29', '30']
+
+
+def test_csv_com_apostas_maiores_depois_do_primeiro_bloco(tmp_path):
+    caminho = str(tmp_path / 'c.csv')
+    apostas = [list(range(1, 7))] * 3 + [list(range(1, 9)), list(range(1, 8))]
+    saida.escreve_em_blocos(apostas, [saida.SaidaCSV(caminho, largura=8)], bloco=2)
+    linhas = _linhas_csv(caminho)
+    assert linhas[0] == ['Numero'] + [f'D{i}' for i in range(1, 9)]
+    assert {len(l) for l in linhas} == {9}
+    assert linhas[1][-2:] == ['', ''] and linhas[4][-1] == '08'
+
+
+def test_csv_recusa_aposta_mais_larga_que_o_cabecalho(tmp_path):
+    caminho = str(tmp_path / 'c.csv')
+    with pytest.raises(ValueError):
+        saida.escreve_em_blocos([list(range(1, 7)), list(range(1, 10))], [saida.SaidaCSV(caminho)], bloco=1)
+    assert {len(l) for l in _linhas_csv(caminho)} == {7}
+
+
+def test_salva_csv_de_carteira_usa_a_maior_aposta(motor, tmp_path):
+    np = pytest.importorskip('numpy')
+    from src.core import checker
+    caminho = str(tmp_path / 'carteira.csv')
+    apostas = [list(range(1, 7)), list(range(10, 20)), list(range(30, 37))]
+    motor.salva_csv(apostas, caminho)
+    assert len(_linhas_csv(caminho)[0]) == 11
+    # o conferidor lê as linhas completadas com campos vazios
+    (numeros, M, tamanhos), = checker.le_bilhetes(caminho)
+    assert tamanhos.tolist() == [6, 10, 7]
+    assert (M == checker.codifica(apostas)[0]).all() and M.dtype == np.uint64
+
+
+def test_todas_as_saidas_fecham_quando_uma_falha():
+    boa, ruim = Registra(), Registra(falha_em=3)
+    with pytest.raises(RuntimeError):
+        saida.escreve_em_blocos([[1, 2, 3, 4, 5, 6]] * 5, [ruim, boa], bloco=2)
+    assert boa.fechada and ruim.fechada
+    assert [i for i, _ in boa.blocos] == [1]
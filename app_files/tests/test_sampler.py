@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Amostrador ponderado sem reposição: dezenas distintas em 1..60 mesmo com pesos
+extremos, pesos zero só depois dos positivos e distribuição do sorteio sucessivo."""
+import random
+from collections import Counter
+
+import pytest
+
+from src.core.sampler import AmostradorPonderado
+
+PESOS_DESIGUAIS = [
+    [10.0 ** e for e in range(-295, 300, 10)],          # 60 ordens de grandeza
+    [10.0 ** e for e in range(300, -295, -10)],
+    [1e300] * 6 + [1e-300] * 54,
+    [1e16] * 6 + [1.0] * 54,
+    [1.0] + [0.0] * 59,
+    [0.0] * 59 + [1.0],
+    [0.0, 1e-300] * 30,
+]
+
+
+@pytest.mark.parametrize('pesos', PESOS_DESIGUAIS)
+@pytest.mark.parametrize('k', [6, 15, 60])
+def test_dezenas_distintas_com_pesos_extremos(pesos, k):
+    a = AmostradorPonderado(pesos)
+    rng = random.Random(k)
+    for _ in range(300):
+        jogo = a.sorteia(k, rng)
+        assert len(jogo) == k and len(set(jogo)) == k
+        assert jogo == sorted(jogo) and 1 <= jogo[0] and jogo[-1] <= 60
+
+
+def test_pesos_zero_so_depois_dos_positivos():
+    pesos = [0.0] * 60
+    positivas = (3, 17, 41)
+    for d in positivas:
+        pesos[d - 1] = 1.0
+    a = AmostradorPonderado(pesos)
+    rng = random.Random(1)
+    for _ in range(200):
+        assert set(a.sorteia(3, rng)) == set(positivas)
+        assert set(positivas) <= set(a.sorteia(6, rng))
+
+
+def test_pesos_grandes_saem_primeiro():
+    a = AmostradorPonderado([1e300] * 6 + [1e-300] * 54)
+    rng = random.Random(2)
+    assert all(a.sorteia(6, rng) == list(range(1, 7)) for _ in range(100))
+    # depois das seis pesadas, as leves são sorteadas (e não sempre a última dezena)
+    extras = Counter(d for _ in range(600) for d in a.sorteia(7, rng) if d > 6)
+    assert len(extras) > 30
+
+
+def test_k_invalido():
+    with pytest.raises(ValueError):
+        AmostradorPonderado().sorteia(61)
+
+
+def test_distribuicao_do_primeiro_sorteio():
+    pesos = [float(d) for d in range(1, 61)]
+    a = AmostradorPonderado(pesos)
+    rng = random.Random(3)
+    n = 60_000
+    contagem = Counter(a.sorteia(1, rng)[0] for _ in range(n))
+    total = sum(pesos)
+    for d in (1, 30, 60):
+        esperado = n * pesos[d - 1] / total
+        assert abs(contagem[d] - esperado) < 5 * esperado ** 0.5 + 5
+
+
+def test_lote_distinto_e_com_a_mesma_marginal():
+    np = pytest.importorskip('numpy')
+    pesos = [1.0] * 30 + [4.0] * 30
+    a = AmostradorPonderado(pesos)
+    bloco = a.sorteia_lote(np.random.default_rng(4), 20_000)
+    assert bloco.shape == (20_000, 6)
+    assert (np.diff(bloco, axis=1) > 0).all() and bloco.min() >= 1 and bloco.max() <= 60
+    rng = random.Random(4)
+    escalar = sum(d > 30 for _ in range(20_000) for d in a.sorteia(6, rng)) / 120_000
+    assert abs((bloco > 30).mean() - escalar) < 0.01
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Modo serviço: rotas, agrupamento de pedidos e respostas de erro, com o servidor
+asyncio de verdade numa porta livre (executores em threads, `workers=0`)."""
+import asyncio
+import json
+from urllib.parse import urlencode
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.core import service  # noqa: E402
+
+
+async def _http(porta, bruto):
+    """Envia `bruto` e lê uma resposta: (status, corpo JSON)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+    try:
+        writer.write(bruto)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        cabecalhos = {}
+        while (linha := await reader.readline()) not in (b'\r\n', b''):
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            cabecalhos[nome.strip().lower()] = valor.strip()
+        corpo = await reader.readexactly(int(cabecalhos['content-length']))
+        return status, json.loads(corpo)
+    finally:
+        writer.close()
+
+
+def _get(rota, **params):
+    alvo = rota + ('?' + urlencode(params) if params else '')
+    return f'GET {alvo} HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n'.encode()
+
+
+def _post(rota, dados, content_length=None):
+    corpo = json.dumps(dados).encode()
+    tamanho = len(corpo) if content_length is None else content_length
+    return (f'POST {rota} HTTP/1.1\r\nHost: x\r\nConnection: close\r\n'
+            f'Content-Length: {tamanho}\r\n\r\n').encode() + corpo
+
+
+def _no_servico(*pedidos):
+    """Sobe o serviço, faz os pedidos concorrentemente e devolve as respostas na ordem."""
+    async def roda():
+        srv = service.Servico(porta=0, workers=0, janela=0.05)
+        await srv.inicia()
+        try:
+            return await asyncio.gather(*(_http(srv.porta, p) for p in pedidos))
+        finally:
+            await srv.fecha()
+    return asyncio.run(roda())
+
+
+def test_rotas(motor, historico):
+    sorteio = historico[-1]
+    saude, jogos, mesmos, top, rec, conf = _no_servico(
+        _get('/saude'), _get('/jogos', quantidade=5, seed=3), _get('/jogos', quantidade=5, seed=3),
+        _get('/top', n=5), _get('/recomendacao', qtd=8),
+        _post('/confere', {'jogos': [sorteio, list(range(1, 7))], 'historico': True}))
+    assert saude == (200, {'concursos': len(historico), 'versao': 1, 'workers': 0})
+    assert jogos[0] == 200 and len(jogos[1]['jogos']) == 5
+    assert all(len(set(j)) == 6 for j in jogos[1]['jogos'])
+    assert mesmos == jogos  # com seed o pedido roda sozinho e é reprodutível
+    assert top[0] == 200 and len(top[1]['top']) == 5
+    assert rec[0] == 200 and len(set(rec[1]['dezenas'])) == 8
+    assert conf[0] == 200
+    assert conf[1]['bilhetes'][0]['melhor_historico'] == 6
+    assert conf[1]['concursos'] == len(historico)
+
+
+def test_pedidos_concorrentes_sao_agrupados(motor, monkeypatch):
+    chamadas = []
+    gera = service._gera_agrupado
+    monkeypatch.setattr(service, '_gera_agrupado', lambda *a: (chamadas.append(a[1]), gera(*a))[1])
+    respostas = _no_servico(*(_get('/jogos', quantidade=q) for q in (1, 2, 3)))
+    assert [len(r[1]['jogos']) for r in respostas] == [1, 2, 3]
+    assert sorted(map(sorted, chamadas)) == [[1, 2, 3]]
+
+
+@pytest.mark.parametrize('pedido, status', [
+    (_get('/nada'), 404),
+    (b'PUT /saude HTTP/1.1\r\nConnection: close\r\n\r\n', 405),
+    (_get('/jogos', quantidade='muitos'), 400),
+    (_get('/jogos', quantidade=0), 400),
+    (_get('/top', decay='quadratico'), 400),
+    (_post('/confere', {'jogos': [[1, 2, 3]]}), 400),
+    (_post('/confere', {'jogos': [[1, 2, 3, 4, 5, 6]]}, content_length='abc'), 400),
+    (_post('/confere', {'jogos': [[1, 2, 3, 4, 5, 6]]}, content_length='-5'), 400),
+    (_post('/confere', {'jogos': [[1, 2, 3, 4, 5, 6]]}, content_length='\xb2'), 400),
+    (_post('/confere', {}, content_length=str(service._CORPO_MAX + 1)), 413),
+    (b'lixo\r\n\r\n', 400),
+])
+def test_erros(motor, pedido, status):
+    (resposta,) = _no_servico(pedido)
+    assert resposta[0] == status
+    assert 'erro' in resposta[1]
+
+
+@pytest.mark.parametrize('valor, esperado', [
+    (None, 0), ('', 0), ('0', 0), ('42', 42), ('-1', None), ('+1', None), (' 1', None),
+    ('1.5', None), ('5, 5', None), ('\xb2', None), ('abc', None),
+])
+def test_tamanho_corpo(valor, esperado):
+    assert service._tamanho_corpo(valor) == esperado
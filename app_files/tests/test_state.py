@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Estado memoizado do histórico: invalidação por mtime, frequência incremental e
+derivados calculados fora da trava."""
+import json
+import os
+import threading
+
+from src.core.state import EstadoHistorico
+
+
+class Cache:
+    """Arquivo JSON de concursos observado pelo estado; conta as cargas."""
+
+    def __init__(self, caminho, concursos):
+        self.caminho = str(caminho)
+        self.cargas = 0
+        self.grava(concursos)
+
+    def grava(self, concursos):
+        with open(self.caminho, 'w') as f:
+            json.dump(concursos, f)
+        st = os.stat(self.caminho)
+        os.utime(self.caminho, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # mtime sempre muda
+
+    def carrega(self):
+        self.cargas += 1
+        with open(self.caminho) as f:
+            return json.load(f)
+
+    def estado(self):
+        return EstadoHistorico(self.carrega, lambda: [self.caminho])
+
+
+def test_memoiza_ate_o_arquivo_mudar(tmp_path):
+    cache = Cache(tmp_path / 'c.json', [[1, 2, 3, 4, 5, 6]])
+    estado = cache.estado()
+    calculos = []
+    soma = lambda c, f: calculos.append(1) or sum(map(sum, c))  # noqa: E731
+    assert estado.derivado('soma', soma) == 21
+    assert estado.derivado('soma', soma) == 21
+    assert estado.concursos() == [[1, 2, 3, 4, 5, 6]]
+    assert (cache.cargas, len(calculos)) == (1, 1)
+
+    cache.grava([[1, 2, 3, 4, 5, 6], [1, 7, 8, 9, 10, 11]])
+    assert estado.derivado('soma', soma) == 67
+    assert estado.frequencia()[1] == 2
+    assert (cache.cargas, len(calculos), estado.versao) == (2, 2, 2)
+
+
+def test_frequencia_reconstruida_quando_nao_e_so_anexacao(tmp_path):
+    cache = Cache(tmp_path / 'c.json', [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12]])
+    estado = cache.estado()
+    assert estado.frequencia()[7] == 1
+    cache.grava([[1, 2, 3, 4, 5, 6], [13, 14, 15, 16, 17, 18], [7, 8, 9, 10, 11, 12]])
+    freq = estado.frequencia()
+    assert (freq[7], freq[13], freq[1]) == (1, 1, 1)
+
+    cache.grava([[1, 2, 3, 4, 5, 6], [13, 14, 15, 16, 17, 18], [7, 8, 9, 10, 11, 12], [1, 20, 30, 40, 50, 60]])
+    assert (estado.frequencia()[1], estado.frequencia()[7]) == (2, 1)
+
+
+def test_calculo_nao_segura_a_trava_do_estado(tmp_path):
+    cache = Cache(tmp_path / 'c.json', [[1, 2, 3, 4, 5, 6]])
+    estado = cache.estado()
+    estado.concursos()
+    dentro, libera = threading.Event(), threading.Event()
+    calculos = []
+
+    def lento(c, f):
+        calculos.append(1)
+        dentro.set()
+        assert libera.wait(10)
+        return 'lento'
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(estado.derivado('lento', lento)))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    assert dentro.wait(10)
+    # com um cálculo em andamento, outras leituras e outras chaves não esperam
+    assert estado.concursos() == [[1, 2, 3, 4, 5, 6]]
+    assert estado.derivado('rapido', lambda c, f: 'rapido') == 'rapido'
+    libera.set()
+    for t in threads:
+        t.join(10)
+    assert resultados == ['lento'] * 3
+    assert len(calculos) == 1
+
+
+def test_valor_calculado_sobre_historico_velho_nao_fica_guardado(tmp_path):
+    cache = Cache(tmp_path / 'c.json', [[1, 2, 3, 4, 5, 6]])
+    estado = cache.estado()
+
+    def grava_no_meio(c, f):
+        cache.grava([[7, 8, 9, 10, 11, 12]])
+        estado.concursos()  # outra thread recarrega enquanto este cálculo roda
+        return c[0][0]
+
+    assert estado.derivado('primeira', grava_no_meio) == 1
+    assert estado.derivado('primeira', lambda c, f: c[0][0]) == 7
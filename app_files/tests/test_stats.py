@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Instrumentação opcional: contadores por filtro fecham com candidatos/aceitos nos
+modos sequencial e em lote, e os tempos por etapa aparecem no relatório JSON."""
+import json
+
+import pytest
+
+from src.core.stats import Estatisticas
+
+
+def test_contadores():
+    st = Estatisticas()
+    for motivo in (None, 'soma', 'soma', 'pares', None):
+        st.avalia(motivo)
+    st.avalia_lote(10, {'soma': 3, 'historico': 0}, descartados=2)
+    with st.mede('geracao'):
+        pass
+    r = json.loads(st.json())
+    assert r['candidatos'] == 15 and r['aceitos'] == 2 + 5
+    assert r['rejeicoes_por_filtro'] == {'soma': 5, 'pares': 1}
+    assert r['candidatos_por_jogo'] == round(15 / 7, 4)
+    assert r['chamadas'] == {'geracao': 1} and r['tempo_s']['geracao'] >= 0
+    assert Estatisticas().relatorio()['candidatos_por_jogo'] is None
+
+
+def _fecha(st, aceitos):
+    r = st.relatorio()
+    assert r['aceitos'] == aceitos
+    assert r['candidatos'] == aceitos + sum(r['rejeicoes_por_filtro'].values())
+    assert r['rejeicoes_por_filtro']  # o histórico sintético rejeita bastante
+    return r
+
+
+def test_modo_sequencial(motor):
+    assert motor.STATS is None
+    st = motor.ativa_estatisticas()
+    try:
+        motor.gerar_jogos(200, seed=1)
+        r = _fecha(st, 200)
+        assert 'pontuacao' in r['tempo_s'] and 'carrega_concursos' in r['tempo_s']
+    finally:
+        assert motor.desativa_estatisticas() is st
+    assert motor.STATS is None
+
+
+def test_modo_lote_conta_so_os_entregues(motor):
+    pytest.importorskip('numpy')
+    st = motor.ativa_estatisticas()
+    try:
+        # o último bloco aprova mais do que falta; os cortados não contam como aceitos
+        motor.gerar_jogos(333, lote=1000, seed=2)
+        r = st.relatorio()
+        assert r['aceitos'] == 333 and r['rejeicoes_por_filtro']
+        assert r['candidatos'] > 333 + sum(r['rejeicoes_por_filtro'].values())
+    finally:
+        motor.desativa_estatisticas()
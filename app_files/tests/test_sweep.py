@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Varredura vetorizada: cada ponto da grade dá o mesmo ranking que
+`top_dezenas_params` com os mesmos parâmetros, inclusive janelas vazias/maiores
+que o histórico e somas feitas em vários blocos."""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import sweep  # noqa: E402
+
+
+def _confere(motor, tabela, n):
+    for ponto in tabela:
+        lam = 0.05 if ponto['decay_lambda'] is None else ponto['decay_lambda']
+        esperado = motor.top_dezenas_params(n, ponto['recent_n'], ponto['alpha'], ponto['decay'], lam)
+        assert [d for d, _ in ponto['ranking']] == [d for d, _ in esperado], ponto
+        assert [s for _, s in ponto['ranking']] == pytest.approx([s for _, s in esperado], abs=1e-9)
+
+
+def test_grade_igual_ponto_a_ponto(motor, monkeypatch):
+    monkeypatch.setattr(sweep, '_BLOCO', 64)  # várias fatias por segmento
+    grade = dict(recent_n=(0, 1, 50, 100, 5000), alpha=(0.0, 0.35, 1.0), decay=('linear', 'exp'),
+                 decay_lambda=(0.01, 0.2))
+    tabela = motor.varredura_params(n=60, **grade)
+    assert len(tabela) == 5 * 3 + 5 * 3 * 2
+    assert all(p['decay_lambda'] is None for p in tabela if p['decay'] == 'linear')
+    _confere(motor, tabela, 60)
+
+
+def test_top_n(motor):
+    tabela = motor.varredura_params(recent_n=(30,), alpha=(0.6,), n=10)
+    (ponto,) = tabela
+    assert len(ponto['ranking']) == 10
+    _confere(motor, tabela, 10)
+
+
+def test_matriz_sorteios():
+    X = sweep.matriz_sorteios([[1, 2, 3, 4, 5, 60], [60, 61, 0, 7]])
+    assert X.shape == (2, 60) and X.dtype == np.uint8
+    assert X[0].sum() == 6 and X[1].tolist() == [0] * 6 + [1] + [0] * 52 + [1]
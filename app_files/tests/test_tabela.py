@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Tabela de jogos válidos: rank/unrank colex, construção igual à filtragem jogo a
+jogo e sorteio só de jogos da tabela, proporcional aos pesos e sem os já sorteados."""
+import random
+from collections import Counter
+from itertools import combinations
+from math import comb
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.core import combos, filters, tabela  # noqa: E402
+
+
+def test_rank_unrank():
+    rng = random.Random(1)
+    jogos = [sorted(rng.sample(range(1, 61), 6)) for _ in range(2000)]
+    jogos += [[1, 2, 3, 4, 5, 6], [55, 56, 57, 58, 59, 60]]
+    rs = [combos.rank(j) for j in jogos]
+    assert combos.rank([1, 2, 3, 4, 5, 6]) == 0 and combos.rank([55, 56, 57, 58, 59, 60]) == combos.TOTAL - 1
+    assert [combos.unrank(r) for r in rs] == jogos
+    assert combos.ranks(np.array(jogos)).tolist() == rs
+    assert combos.unranks(np.array(rs, dtype=np.uint64)).tolist() == jogos
+
+
+def test_colex_em_ordem_de_rank():
+    c = combos.colex(9, 4)
+    assert len(c) == comb(9, 4)
+    assert combos.ranks(c.astype(np.int64) + 1).tolist() == list(range(len(c)))
+
+
+def test_constroi_igual_a_filtragem(tmp_path, monkeypatch):
+    # universo reduzido (dezenas 1..24) para a construção caber no teste
+    monkeypatch.setattr(combos, 'N', 24)
+    monkeypatch.setattr(tabela, '_BLOCO', 1000)  # vários blocos por dezena máxima
+    caminho = str(tmp_path / 't.npy')
+    pipeline = filters.Pipeline({'decadas_min': 2, 'soma_min': 60, 'historico': False})
+    validos = tabela.constroi(caminho, pipeline)
+    esperado = sorted(combos.rank(j) for j in combinations(range(1, 25), 6) if pipeline.aprova(list(j)))
+    assert 1000 < len(esperado) < comb(24, 6)
+    assert validos.dtype == np.uint32 and validos.tolist() == esperado
+    assert np.load(caminho).tolist() == esperado
+
+
+def test_sorteia_so_da_tabela_e_proporcional_aos_pesos(tmp_path, monkeypatch):
+    monkeypatch.setattr(tabela, '_BLOCO', 3)  # soma acumulada atravessa blocos
+    jogos = [[1, 12, 23, 34, 45, 56], [2, 13, 24, 35, 46, 57], [3, 14, 25, 36, 47, 58],
+             [4, 15, 26, 37, 48, 59]]
+    ranks = np.array(sorted(combos.rank(j) for j in jogos), dtype=np.uint32)
+    np.save(tabela.nome_arquivo(tmp_path), ranks)
+    tb = tabela.TabelaJogos(tmp_path)
+    assert len(tb) == 4
+
+    pesos = {d: 1.0 for d in range(1, 61)}
+    pesos[1] = 3.0  # o primeiro jogo pesa 3x
+    rng = np.random.default_rng(5)
+    contagem = Counter(map(tuple, tb.sorteia(60_000, pesos, rng=rng).tolist()))
+    assert set(contagem) == set(map(tuple, jogos))
+    assert abs(contagem[tuple(jogos[0])] / 60_000 - 0.5) < 0.01
+
+    # concursos já sorteados nunca saem
+    sorteados = tb.sorteia(5000, pesos, historico=[jogos[0], list(reversed(jogos[2]))], rng=rng)
+    assert set(map(tuple, sorteados.tolist())) == {tuple(jogos[1]), tuple(jogos[3])}
+
+
+def test_nome_arquivo_por_regras(tmp_path):
+    assert tabela.nome_arquivo(tmp_path) == tabela.nome_arquivo(tmp_path, filters.Pipeline())
+    outro = filters.Pipeline({'soma_min': 120})
+    assert tabela.nome_arquivo(tmp_path, outro) != tabela.nome_arquivo(tmp_path)
+    assert outro.chave in tabela.nome_arquivo(tmp_path, outro)